@@ -0,0 +1,157 @@
+"""
+Memory and throughput benchmark of ExtractedEntry at the scale of a long
+listing history, compared with the plain class it used to be: the memory of the
+loaded entries and the set difference that finds the new entries of a run.
+Loading the entries from their stored JSON lines and encoding them for the
+store are reported too, both are bound by the JSON parsing and encoding.
+
+Usage: python -m benchmarks.bench_entries [--entries 100000 300000]
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from benchmarks.mock_site import listing_entry
+from constants.objects import ExtractedEntry, ExtractedEntryEncoder
+from url.url import URL
+
+QUERIES = 20
+
+
+# pylint: disable=too-many-instance-attributes, too-few-public-methods
+class PlainEntry:
+    """
+    The ExtractedEntry before it was slotted: a __dict__ per instance and a
+    hash of a new tuple on every call.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        location: str,
+        square_footage: float,
+        price: float,
+        link: str,
+        origin_url: str,
+        built_year: Optional[int] = None,
+        price_per_m2: Optional[int] = None,
+        author: Optional[str] = None,
+    ):
+        self.location = location
+        self.square_footage = square_footage
+        self.price = price
+        self.link = link
+        self.built_year = built_year
+        self.origin_url = origin_url
+        self.price_per_m2 = (
+            int(round(price / (square_footage * 0.95), 0))
+            if price_per_m2 is None
+            else price_per_m2
+        )
+        self.author = author
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the entry to a dictionary.
+        """
+        return dict(self.__dict__)
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (
+            self.link,
+            self.location,
+            self.square_footage,
+            self.price,
+            self.built_year,
+            self.origin_url,
+            self.author,
+        )
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __eq__(self, other: object) -> bool:
+        # pylint: disable=protected-access
+        return isinstance(other, PlainEntry) and self._key() == other._key()
+
+
+def stored_lines(entries: int) -> List[str]:
+    """
+    Returns `entries` stored entries spread over QUERIES queries as JSON
+    lines, as they are read from the store.
+    """
+    origins = [
+        str(URL("prodaja", "ljubljana-mesto", "stanovanje", size_from=index))
+        for index in range(QUERIES)
+    ]
+    return [
+        json.dumps(listing_entry(7_000_000 + index, origins[index % QUERIES]).to_dict())
+        for index in range(entries)
+    ]
+
+
+def timed(function: Callable[[], Any]) -> Tuple[Any, float]:
+    """
+    Returns the result of `function` and the seconds it took.
+    """
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def measure(
+    name: str, build: Callable[[Dict[str, Any]], Any], lines: List[str]
+) -> None:
+    """
+    Prints the memory and throughput of the entry type built by `build`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    existing = {build(json.loads(line)) for line in lines}
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Timed again without tracemalloc, which slows down every allocation
+    existing, load_seconds = timed(lambda: {build(json.loads(line)) for line in lines})
+
+    # A run finds half of the stored entries again, 100 of them with a new price
+    data = [json.loads(line) for line in lines[::2]]
+    collected: Set[Any] = {build(item) for item in data[100:]}
+    collected.update(build({**item, "price": item["price"] + 1}) for item in data[:100])
+    new, diff_seconds = timed(lambda: collected - existing)
+    assert len(new) == 100
+    _, encode_seconds = timed(
+        lambda: json.dumps(
+            [entry.to_dict() for entry in existing],
+            cls=ExtractedEntryEncoder,
+            ensure_ascii=False,
+        )
+    )
+    count = len(lines)
+    print(
+        f"{name:<8} {count:>7} entries {memory / count:>7.0f} B/entry "
+        f"load {count / load_seconds:>9.0f}/s "
+        f"diff {len(collected) / diff_seconds:>10.0f}/s "
+        f"encode {count / encode_seconds:>9.0f}/s"
+    )
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--entries", type=int, nargs="+", default=[100000])
+    args = arg_parser.parse_args()
+
+    for entries in args.entries:
+        lines = stored_lines(entries)
+        measure("plain", lambda item: PlainEntry(**item), lines)
+        measure("slotted", ExtractedEntry.from_dict, lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark of the browser-free extractors on the saved page corpus in
+extractor/fixtures, without network access.
+
+Usage: python -m benchmarks.bench_extractor [--rounds 200]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, List
+
+from extractor.card_extractor import extract_cards
+from extractor.corpus import fixture_names, read_fixture
+from extractor.html_extractor import entry_from_html
+
+
+def load_pages(pattern: str) -> List[str]:
+    """
+    Reads the saved pages matching `pattern`.
+    """
+    return [read_fixture(name) for name in fixture_names(pattern)]
+
+
+def measure(
+    name: str, extract: Callable[[str], Any], pages: List[str], rounds: int
+) -> None:
+    """
+    Runs `extract` on every page `rounds` times and prints its throughput.
+    """
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            extract(page)
+    elapsed = time.perf_counter() - started
+    parsed = len(pages) * rounds
+    kib = sum(len(page) for page in pages) * rounds / 1024
+    print(
+        f"{name:<8} {parsed:>7} pages {elapsed:>8.3f}s "
+        f"{parsed / elapsed:>10.1f} pages/s {kib / elapsed:>10.1f} KiB/s"
+    )
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    measure(
+        "detail",
+        lambda page: entry_from_html(page, "link", "origin"),
+        load_pages("detail_*.html"),
+        args.rounds,
+    )
+    measure("listing", extract_cards, load_pages("listing_*.html"), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
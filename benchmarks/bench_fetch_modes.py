@@ -0,0 +1,93 @@
+"""
+Benchmark comparing the HTTP fast path against the browser path on the saved
+detail pages in extractor/fixtures.
+
+Usage: python -m benchmarks.bench_fetch_modes [--rounds 5] [--skip-browser]
+"""
+
+import argparse
+import time
+from typing import Callable, List
+
+from benchmarks.fixture_server import serve_directory
+from browser.pool import BrowserPool
+from browser.readiness import DETAIL_READY_TIMEOUTS_MS, wait_until_ready
+from constants.objects import ExtractedEntry
+from extractor.corpus import FIXTURES_DIR, fixture_names
+from extractor.html_extractor import entry_from_html
+from fetcher.http_fetcher import HttpFetcher
+from fetcher.rate_limiter import RateLimiter
+from scraper import Scraper
+
+
+def fetch_http(urls: List[str]) -> List[ExtractedEntry]:
+    """
+    Downloads and parses every page over a pooled HTTP session.
+    """
+    entries = []
+    with HttpFetcher(rate_limiter=RateLimiter(0, 0)) as fetcher:
+        for url in urls:
+            content = fetcher.fetch(url)
+            assert content is not None, f"{url} was blocked"
+            entries.append(entry_from_html(content, url, url))
+    return entries
+
+
+def fetch_browser(urls: List[str]) -> List[ExtractedEntry]:
+    """
+    Renders and extracts every page in a pooled browser.
+    """
+    entries = []
+    with BrowserPool() as pool:
+        for url in urls:
+            scraper = Scraper(url, pool)
+            with pool.page() as page:
+                pool.goto(page, url, wait_until="domcontentloaded")
+                wait_until_ready(page, DETAIL_READY_TIMEOUTS_MS)
+                # pylint: disable=protected-access
+                entries.append(scraper._extract_entry(page, url))
+    return entries
+
+
+def measure(
+    name: str, fetch: Callable[[List[str]], List[ExtractedEntry]], urls: List[str]
+) -> List[ExtractedEntry]:
+    """
+    Runs `fetch` and prints its throughput.
+    """
+    started = time.perf_counter()
+    entries = fetch(urls)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<8} {len(urls):>6} pages {elapsed:>8.3f}s {len(urls) / elapsed:>10.1f} pages/s"
+    )
+    return entries
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    arg_parser.add_argument("--skip-browser", action="store_true")
+    args = arg_parser.parse_args()
+
+    pages = fixture_names("detail_*.html")
+    with serve_directory(FIXTURES_DIR) as base_url:
+        urls = [f"{base_url}/{page}" for page in pages] * args.rounds
+        http_entries = measure("http", fetch_http, urls)
+        if not args.skip_browser:
+            browser_entries = measure("browser", fetch_browser, urls)
+            mismatches = [
+                (http_entry, browser_entry)
+                for http_entry, browser_entry in zip(http_entries, browser_entries)
+                if http_entry != browser_entry
+            ]
+            print(f"Entries differing between the modes: {len(mismatches)}")
+            for http_entry, browser_entry in mismatches[: len(pages)]:
+                print(f"  http:    {http_entry}\n  browser: {browser_entry}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+End-to-end benchmark of the scraper, run with --replay against a synthetic site
+served from a local replay server, at several scales. Reports the wall time and
+throughput of the run and the time of every stage the scraper records in its
+metrics, and writes them as JSON, so runs can be compared across commits.
+
+Usage: python -m benchmarks.bench_pipeline [--queries 1 10 100]
+       [--listings 10 1000 10000] [--output bench_pipeline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+import scraper
+from benchmarks.mock_site import build_site, query_urls
+from constants.constants import REPLAY_EMAIL_FILE, STORE_FILE
+from constants.objects import ExtractedEntry
+from metrics.metrics import METRICS
+from replay.archive import ResponseArchive
+from store.listing_store import ListingStore
+
+# Stages timed by the scraper in stage_duration_seconds, the extraction runs
+# within detail_fetch. A replayed run does not write the store, results_write
+# is timed on a copy of it.
+STAGES = [
+    "config_parse",
+    "link_fetch",
+    "detail_fetch",
+    "extraction",
+    "diff",
+    "email_render",
+    "results_write",
+]
+
+
+def write_config(path: str, queries: int) -> None:
+    """
+    Writes a config file with `queries` queries matching the synthetic site.
+    """
+    config = {
+        "nastavitev": {
+            "mail_from": "bench@example.com",
+            "smtp_server": "smtp.example.com",
+            "smtp_port": 465,
+            "mail_to": ["bench@example.com"],
+        },
+        "poizvedbe": [
+            {
+                "ime": f"query{index}",
+                "posredovanje": "prodaja",
+                "regija": "ljubljana-mesto",
+                "m2_od": index,
+            }
+            for index in range(queries)
+        ],
+    }
+    with open(path, "w", encoding="UTF8") as file:
+        yaml.safe_dump(config, file, allow_unicode=True)
+
+
+def write_store(path: str, entries_by_url: Dict[str, List[ExtractedEntry]]) -> None:
+    """
+    Fills the listing store at `path` with every other listing of the site.
+    """
+    with ListingStore(path) as store:
+        store.upsert(
+            entry.with_origin_url(url)
+            for url, entries in entries_by_url.items()
+            for entry in entries[::2]
+        )
+
+
+def write_results(
+    directory: str, entries_by_url: Dict[str, List[ExtractedEntry]]
+) -> None:
+    """
+    Stores the listings of the site in a copy of the listing store in
+    `directory`, as a run that is not replayed does.
+    """
+    with tempfile.TemporaryDirectory() as store_directory:
+        copy_path = os.path.join(store_directory, STORE_FILE)
+        with ListingStore(os.path.join(directory, STORE_FILE)) as store:
+            store.backup(copy_path)
+            stored = store.entries()
+        collected = {
+            entry.with_origin_url(url)
+            for url, entries in entries_by_url.items()
+            for entry in entries
+        }
+        with ListingStore(copy_path) as copy:
+            scraper.store_results(copy, store_directory, collected, set(), stored)
+
+
+def stage_timings(seconds: float) -> Dict[str, Dict[str, float]]:
+    """
+    Returns the total time, call count and share of the `seconds` of the run
+    of every stage the scraper recorded in METRICS.
+    """
+    timings = {}
+    for (name, labels), histogram in METRICS.histograms.items():
+        if name == "stage_duration_seconds":
+            timings[dict(labels)["stage"]] = {
+                "seconds": round(histogram.sum, 6),
+                "calls": histogram.count,
+                "share": round(histogram.sum / seconds, 3) if seconds else 0,
+            }
+    return timings
+
+
+def run_pipeline(directory: str, queries: int, listings: int) -> Dict[str, Any]:
+    """
+    Runs the scraper once with --replay on a synthetic site with `queries`
+    queries and `listings` listings recorded in `directory`, stores its
+    listings in a copy of the store and returns the timings of the run and
+    its stages.
+    """
+    entries_by_url = build_site(
+        ResponseArchive(directory), query_urls(queries), listings
+    )
+    write_config(os.path.join(directory, "config.yaml"), queries)
+    write_store(os.path.join(directory, STORE_FILE), entries_by_url)
+
+    METRICS.reset()
+    started = time.perf_counter()
+    scraper.main(["--replay", directory, "--fetch-mode", "http"])
+    write_results(directory, entries_by_url)
+    seconds = time.perf_counter() - started
+
+    stored_links = {
+        entry.link for found in entries_by_url.values() for entry in found[::2]
+    }
+    site_links = {entry.link for found in entries_by_url.values() for entry in found}
+    new_entries = METRICS.counter("new_entries_total")
+    assert new_entries == len(site_links - stored_links), "extraction does not match"
+    assert os.path.exists(os.path.join(directory, REPLAY_EMAIL_FILE)), "no email"
+    return {
+        "queries": queries,
+        "listings": listings,
+        "new_entries": int(new_entries),
+        "total_seconds": round(seconds, 6),
+        "listings_per_second": round(len(site_links) / seconds, 1),
+        "kib_per_second": round(
+            METRICS.counter("bytes_downloaded_total", source="http") / 1024 / seconds,
+            1,
+        ),
+        "stages": stage_timings(seconds),
+    }
+
+
+def git_commit() -> Optional[str]:
+    """
+    Returns the commit of the benchmarked tree, if it is a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run: Dict[str, Any]) -> None:
+    """
+    Prints the stage timings of a single run.
+    """
+    print(
+        f"{run['queries']} queries, {run['listings']} listings "
+        f"({run['new_entries']} new): {run['total_seconds']:.3f}s, "
+        f"{run['listings_per_second']:.1f} listings/s, "
+        f"{run['kib_per_second']:.1f} KiB/s"
+    )
+    for name in STAGES:
+        stage = run["stages"].get(name, {"seconds": 0, "calls": 0, "share": 0})
+        print(
+            f"  {name:<14} {stage['seconds']:>9.3f}s {stage['calls']:>7.0f} calls "
+            f"{stage['share']:>7.1%} of the run"
+        )
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--queries", type=int, nargs="+", default=[1, 10, 100])
+    arg_parser.add_argument(
+        "--listings", type=int, nargs="+", default=[10, 1000, 10000]
+    )
+    arg_parser.add_argument("--output", default="bench_pipeline.json")
+    args = arg_parser.parse_args()
+
+    runs = []
+    for queries in args.queries:
+        for listings in args.listings:
+            with tempfile.TemporaryDirectory() as directory:
+                run = run_pipeline(directory, queries, listings)
+            print_run(run)
+            runs.append(run)
+
+    with open(args.output, "w", encoding="UTF8") as file:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "runs": runs,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Micro-benchmark counting the Playwright round trips needed to extract a
+detail page: the former per-field queries against the single page.evaluate
+extraction script.
+
+Usage: python -m benchmarks.bench_round_trips [--rounds 5]
+"""
+
+import argparse
+import time
+from typing import Any, Callable, List, Optional
+
+from playwright.sync_api import Page
+
+from benchmarks.fixture_server import serve_directory
+from browser.pool import BrowserPool
+from constants.objects import ExtractedEntry
+from extractor.corpus import FIXTURES_DIR, fixture_names
+from extractor.page_script import EXTRACT_FIELDS_SCRIPT, fields_from_result
+from extractor.parsing import (
+    AUTHOR_SELECTOR,
+    DESCRIPTION_SELECTOR,
+    LOCATION_SELECTOR,
+    PRICE_SELECTOR,
+    RawFields,
+    entry_from_fields,
+)
+
+# Methods of Page and ElementHandle that cross the IPC boundary
+ROUND_TRIP_METHODS = frozenset(
+    ["query_selector", "query_selector_all", "inner_text", "evaluate"]
+)
+
+
+# pylint: disable=too-few-public-methods
+class CountingProxy:
+    """
+    Wraps a Page or ElementHandle and counts the round trips made through it
+    and through the element handles it returns.
+    """
+
+    def __init__(self, target: Any, counter: List[int]):
+        self._target = target
+        self._counter = counter
+
+    def _wrap(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._wrap(item) for item in value]
+        if hasattr(value, "inner_text"):
+            return CountingProxy(value, self._counter)
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._target, name)
+        if name not in ROUND_TRIP_METHODS:
+            return attribute
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            self._counter[0] += 1
+            return self._wrap(attribute(*args, **kwargs))
+
+        return call
+
+
+def _text(page: Any, selector: str) -> Optional[str]:
+    element = page.query_selector(selector)
+    return element.inner_text() if element else None
+
+
+def extract_per_field(page: Any) -> RawFields:
+    """
+    Reads the raw fields with the per-field queries the engines used before,
+    including the repeated description queries.
+    """
+    price_element = page.query_selector(PRICE_SELECTOR)
+    price = (
+        price_element.evaluate("el => el.childNodes[0].nodeValue")
+        if price_element
+        else None
+    )
+    attributes: List[str] = []
+    attributes_element = page.query_selector("#atributi")
+    if attributes_element:
+        for element in attributes_element.query_selector_all("li"):
+            # The size attribute was read twice, once for the match and once to parse it
+            element.inner_text()
+            attributes.append(element.inner_text())
+    description = _text(page, DESCRIPTION_SELECTOR)
+    _text(page, DESCRIPTION_SELECTOR)
+    return {
+        "price": price,
+        "location": _text(page, LOCATION_SELECTOR),
+        "attributes": attributes,
+        "description": description,
+        "author": _text(page, AUTHOR_SELECTOR),
+    }
+
+
+def extract_single_evaluate(page: Any) -> RawFields:
+    """
+    Reads the raw fields with the single extraction script.
+    """
+    return fields_from_result(page.evaluate(EXTRACT_FIELDS_SCRIPT))
+
+
+def measure(
+    name: str, extract: Callable[[Any], RawFields], pages: List[Page], urls: List[str]
+) -> List[ExtractedEntry]:
+    """
+    Runs `extract` on every loaded page and prints its round trips and time.
+    """
+    counter = [0]
+    entries = []
+    started = time.perf_counter()
+    for page, url in zip(pages, urls):
+        fields = extract(CountingProxy(page, counter))
+        entries.append(entry_from_fields(fields, url, url))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<16} {counter[0] / len(pages):>6.1f} round trips/page "
+        f"{elapsed / len(pages) * 1000:>8.2f} ms/page"
+    )
+    return entries
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    names = fixture_names("detail_*.html")
+    with serve_directory(FIXTURES_DIR) as base_url, BrowserPool() as pool:
+        urls = [f"{base_url}/{name}" for name in names]
+        for _ in range(args.rounds):
+            with pool.page() as first:
+                # Every fixture is loaded once, so both extractions read the same DOM
+                pages = [first] + [first.context.new_page() for _ in urls[1:]]
+                for page, url in zip(pages, urls):
+                    pool.goto(page, url)
+                before = measure("per-field", extract_per_field, pages, urls)
+                after = measure("single evaluate", extract_single_evaluate, pages, urls)
+                if before != after:
+                    print("Entries differ between the extractions:")
+                    for old, new in zip(before, after):
+                        print(f"  per-field: {old}\n  evaluate:  {new}")
+
+
+if __name__ == "__main__":
+    main()
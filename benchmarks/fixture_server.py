@@ -0,0 +1,28 @@
+"""
+Module for serving saved pages from a local HTTP server during benchmarks.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+from typing import Any, Iterator
+
+from replay.server import serve_local
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """
+    Request handler that does not log every request to stderr.
+    """
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=W0622
+        pass
+
+
+@contextmanager
+def serve_directory(directory: str) -> Iterator[str]:
+    """
+    Serves `directory` on a free local port and yields the base URL.
+    """
+    with serve_local(partial(QuietHandler, directory=directory)) as base_url:
+        yield base_url
@@ -0,0 +1,136 @@
+"""
+Module for generating a synthetic copy of the site at a chosen scale, recorded
+in a ResponseArchive so it can be served by the replay server.
+"""
+
+import random
+from html import escape
+from typing import Dict, List
+
+from constants.constants import SITE_URL
+from constants.objects import ExtractedEntry
+from replay.archive import ResponseArchive
+from url.url import URL
+
+DISTRICTS = ["BEŽIGRAD", "ŠIŠKA", "VIČ", "CENTER", "MOSTE", "POLJE"]
+STREETS = ["MUCHEJEVA", "DRAVLJE", "ROŽNA DOLINA", "TRNOVO", "FUŽINE", "KOSEZE"]
+AUTHORS = ["ABC Nepremičnine d.o.o.", "Gradbinec d.d.", None]
+# Every fifth listing of a query also shows up in the results of the next query
+SHARED_LISTING_EVERY = 5
+
+
+def _format_number(value: float) -> str:
+    return f"{value:,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+
+
+def listing_link(listing_id: int) -> str:
+    """
+    Returns the link of the synthetic listing `listing_id`.
+    """
+    return f"{SITE_URL}/oglasi-prodaja/ljubljana-stanovanje_{listing_id}/"
+
+
+def listing_entry(listing_id: int, origin_url: str) -> ExtractedEntry:
+    """
+    Returns the entry the scraper extracts from the detail page of the
+    synthetic listing `listing_id`.
+    """
+    rng = random.Random(listing_id)
+    square_footage = round(rng.uniform(20, 150), 1)
+    return ExtractedEntry(
+        location=f"LJ. {rng.choice(DISTRICTS)}, {rng.choice(STREETS)}",
+        square_footage=square_footage,
+        price=float(round(square_footage * rng.uniform(2500, 6000), -3)),
+        link=listing_link(listing_id),
+        origin_url=origin_url,
+        built_year=rng.randrange(1950, 2025),
+        author=rng.choice(AUTHORS),
+    )
+
+
+def detail_page(entry: ExtractedEntry) -> str:
+    """
+    Renders the detail page of `entry`, with the markup of the real site.
+    """
+    author = (
+        f'<div class="kontakt"><div class="prodajalec"><h2>{escape(entry.author)}</h2>'
+        "</div></div>"
+        if entry.author is not None
+        else ""
+    )
+    return f"""<!DOCTYPE html>
+<html lang="sl">
+<head><meta charset="utf-8"><title>{escape(entry.location)}</title></head>
+<body>
+  <div class="cena clearfix"><span>{_format_number(entry.price)} €</span></div>
+  <div id="opis">
+    <div class="kratek" itemprop="description">
+      <strong class="rdeca">{escape(entry.location)}</strong>,
+      {_format_number(entry.square_footage)} m2, zgrajeno l. {entry.built_year},
+      Prodamo stanovanje.
+    </div>
+  </div>
+  <div id="atributi">
+    <ul>
+      <li>Vrsta: Stanovanje</li>
+      <li>Velikost: {_format_number(entry.square_footage)} m<sup>2</sup></li>
+    </ul>
+  </div>
+  {author}
+</body>
+</html>
+"""
+
+
+def listing_page(entries: List[ExtractedEntry]) -> str:
+    """
+    Renders a search results page with a card for each of `entries`.
+    """
+    cards = "".join(f"""
+      <div class="property-box" itemprop="item">
+        <a href="{entry.link}" class="url-title-d"><h2>{escape(entry.location)}</h2></a>
+        <p itemprop="description">{_format_number(entry.square_footage)} m2</p>
+        <ul><li>{entry.built_year}</li><li>{_format_number(entry.square_footage)} m2</li></ul>
+        <h6>{_format_number(entry.price)} €</h6>
+      </div>""" for entry in entries)
+    return f"""<!DOCTYPE html>
+<html lang="sl">
+<head><meta charset="utf-8"><title>Stanovanja - prodaja</title></head>
+<body><div id="vsebina"><div class="seznam">{cards}
+</div></div></body>
+</html>
+"""
+
+
+def query_urls(queries: int) -> List[URL]:
+    """
+    Returns `queries` distinct search URLs.
+    """
+    return [
+        URL("prodaja", "ljubljana-mesto", "stanovanje", size_from=index)
+        for index in range(queries)
+    ]
+
+
+def build_site(
+    archive: ResponseArchive, urls: List[URL], listings: int
+) -> Dict[str, List[ExtractedEntry]]:
+    """
+    Records a search results page for every URL of `urls` and the detail pages
+    of `listings` listings spread round-robin across them in `archive`. Returns
+    the entries of every search URL, each attributed to the first URL that
+    lists it.
+    """
+    entries_by_url: Dict[str, List[ExtractedEntry]] = {str(url): [] for url in urls}
+    origins = list(entries_by_url)
+    for index in range(listings):
+        listing_id = 7_000_000 + index
+        origin_url = origins[index % len(origins)]
+        entry = listing_entry(listing_id, origin_url)
+        archive.record(entry.link, 200, {}, detail_page(entry))
+        entries_by_url[origin_url].append(entry)
+        if index % SHARED_LISTING_EVERY == 0 and len(origins) > 1:
+            entries_by_url[origins[(index + 1) % len(origins)]].append(entry)
+    for url, entries in entries_by_url.items():
+        archive.record(url, 200, {}, listing_page(entries))
+    return entries_by_url
@@ -0,0 +1,365 @@
+"""
+Asyncio based scraping engine that fetches detail pages concurrently.
+"""
+
+# The AsyncScraper mirrors the Scraper class method by method
+# pylint: disable=duplicate-code
+
+import asyncio
+import time
+from contextlib import asynccontextmanager, nullcontext
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from playwright.async_api import async_playwright, Browser, Page, Response
+
+from browser.consent import ConsentStore
+from browser.interception import ResourceBlocker
+from browser.readiness import (
+    DETAIL_READY_TIMEOUTS_MS,
+    LISTING_READY_TIMEOUTS_MS,
+    wait_until_ready_async,
+)
+from constants.constants import DEFAULT_CONCURRENCY, USER_AGENT
+from constants.objects import ExtractedEntry
+from extractor.card_extractor import CardFields, extract_cards
+from extractor.html_extractor import extract_fields
+from extractor.page_script import EXTRACT_FIELDS_SCRIPT, fields_from_result
+from extractor.parsing import entry_from_fields, extract_links, fields_complete
+from fetcher.rate_limiter import RateLimiter
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+from runner.dedup import QueryResult, QueryResults, fan_out, merge_links
+from runner.incremental import serve_links
+from runner.options import ScrapeOptions
+from url.url import URL, request_url
+
+logger = setup_logger("async_engine")
+
+
+# pylint: disable=too-many-instance-attributes, too-few-public-methods
+class AsyncEntryFetcher:
+    """
+    Async counterpart of the EntryFetcher class: fetches the entries of detail
+    page links concurrently, bounded by the shared `semaphore`, for any query.
+    The entries are attributed to `origin_url`, none (empty) for the links of
+    several queries, which fan_out then assigns to every query that found them.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        browser: Browser,
+        semaphore: asyncio.Semaphore,
+        blocker: Optional[ResourceBlocker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        consent: Optional[ConsentStore] = None,
+        options: ScrapeOptions = ScrapeOptions(),
+        cards: Optional[Dict[str, CardFields]] = None,
+        origin_url: str = "",
+    ):
+        self.browser = browser
+        self.semaphore = semaphore
+        self.blocker = blocker
+        self.known_entries = (
+            options.known_entries if options.known_entries is not None else {}
+        )
+        self.revalidate_percent = options.revalidate_percent
+        self.fresh_links = options.fresh_links
+        self.cards = cards
+        self.rate_limiter = rate_limiter
+        self.consent = consent if consent is not None else ConsentStore()
+        self.cache = options.cache
+        self.archive = options.archive
+        self.traces = options.traces
+        self.checkpoint = options.checkpoint
+        self.origin_url = origin_url
+
+    @asynccontextmanager
+    async def _new_page(self) -> AsyncIterator[Page]:
+        context = await self.browser.new_context(
+            user_agent=USER_AGENT, **self.consent.context_options()
+        )
+        if self.traces is not None:
+            await self.traces.start_async(context)
+        started = time.perf_counter()
+        page = await context.new_page()
+        blocker = self.blocker
+        counters = await blocker.install_async(page) if blocker is not None else None
+        try:
+            yield page
+        finally:
+            if blocker is not None and counters is not None:
+                blocker.finish_page(page.url, counters)
+            if self.traces is not None:
+                seconds = time.perf_counter() - started
+                await self.traces.stop_async(context, page.url, seconds)
+            await context.close()
+
+    def _slot(self, url: str) -> AsyncContextManager[None]:
+        """
+        Returns the rate limiter slot for a request to `url`, if there is one.
+        """
+        if self.rate_limiter is None:
+            return nullcontext()
+        return self.rate_limiter.slot(url)
+
+    async def _goto(self, page: Page, url: str) -> Optional[Response]:
+        """
+        Navigates `page` to `url` through the rate limiter, if there is one, and
+        records the response in the archive, if there is one.
+        """
+        async with self._slot(url):
+            started = time.perf_counter()
+            status: Optional[int] = None
+            try:
+                response = await page.goto(
+                    request_url(url), wait_until="domcontentloaded"
+                )
+                status = response.status if response is not None else 200
+            finally:
+                elapsed = time.perf_counter() - started
+                if self.rate_limiter is not None:
+                    self.rate_limiter.record(url, status, elapsed)
+                METRICS.observe("stage_duration_seconds", elapsed, stage="navigation")
+                METRICS.record_fetch("browser", status)
+        if self.archive is not None and response is not None:
+            self.archive.record(
+                url, response.status, response.headers, await response.text()
+            )
+        return response
+
+    def _cache_page(self, url: str, content: str, response: Optional[Response]) -> None:
+        """
+        Stores a rendered page in the cache, if there is one.
+        """
+        if self.cache is not None:
+            headers = response.headers if response is not None else {}
+            self.cache.put_response(url, content, headers)
+
+    async def _fetch_entry(self, link: str) -> ExtractedEntry:
+        """
+        Fetches a single detail page, unless it is cached, and extracts the
+        entry from it.
+        """
+        content = self.cache.get(link) if self.cache is not None else None
+        if content is not None:
+            with METRICS.timer("extraction"):
+                cached_fields = extract_fields(content)
+            if fields_complete(cached_fields):
+                return entry_from_fields(cached_fields, link, self.origin_url)
+        async with self.semaphore, self._new_page() as page:
+            logger.info("Going to page at [%s]...", link)
+            response = await self._goto(page, link)
+
+            await wait_until_ready_async(page, DETAIL_READY_TIMEOUTS_MS)
+            await self.consent.accept_async(page)
+
+            with METRICS.timer("extraction"):
+                fields = fields_from_result(await page.evaluate(EXTRACT_FIELDS_SCRIPT))
+            if self.cache is not None:
+                self._cache_page(link, await page.content(), response)
+            return entry_from_fields(fields, link, self.origin_url)
+
+    async def _fetch_and_record(self, link: str) -> ExtractedEntry:
+        """
+        Fetches a single entry and records it in the checkpoint, if there is
+        one. The record is written and synced off the event loop.
+        """
+        entry = await self._fetch_entry(link)
+        if self.checkpoint is not None:
+            await asyncio.to_thread(self.checkpoint.record_entry, entry)
+        return entry
+
+    async def _fetch_entries(
+        self, links: Set[str]
+    ) -> Tuple[List[ExtractedEntry], Set[str]]:
+        """
+        Fetches entries from the list of links, keeping the order of `links`.
+        Returns the entries and the links that failed, which do not affect the
+        other links.
+        """
+        ordered = list(links)
+        results = await asyncio.gather(
+            *(self._fetch_and_record(link) for link in ordered), return_exceptions=True
+        )
+        entries: List[ExtractedEntry] = []
+        failed_links: Set[str] = set()
+        for link, result in zip(ordered, results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to fetch [%s]: %s", link, result)
+                failed_links.add(link)
+            else:
+                entries.append(result)
+        return entries, failed_links
+
+    async def fetch_entries(
+        self, links: Set[str]
+    ) -> Tuple[List[ExtractedEntry], Set[str]]:
+        """
+        Returns the entries of `links`, serving known links from their search
+        result card or from the store, and the links whose detail page failed.
+        """
+        served, links_to_fetch = serve_links(
+            links,
+            self.known_entries,
+            self.origin_url,
+            self.revalidate_percent,
+            self.cards,
+            self.fresh_links,
+        )
+        entries, failed_links = await self._fetch_entries(links_to_fetch)
+        return served + entries, failed_links
+
+
+class AsyncScraper(AsyncEntryFetcher):
+    """
+    Async counterpart of the Scraper class.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        start_url: str,
+        browser: Browser,
+        semaphore: asyncio.Semaphore,
+        blocker: Optional[ResourceBlocker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        consent: Optional[ConsentStore] = None,
+        options: ScrapeOptions = ScrapeOptions(),
+        cards: Optional[Dict[str, CardFields]] = None,
+    ):
+        super().__init__(
+            browser,
+            semaphore,
+            blocker,
+            rate_limiter,
+            consent,
+            options,
+            cards,
+            start_url,
+        )
+        self.start_url = start_url
+
+    async def _fetch_links(self, url: str) -> Set[str]:
+        """
+        Fetches the page content and extracts all relevant links.
+        """
+        content = self.cache.get(url) if self.cache is not None else None
+        if content is None:
+            async with self.semaphore, self._new_page() as page:
+                logger.info("Going to page at %s...", url)
+                response = await self._goto(page, url)
+
+                await wait_until_ready_async(page, LISTING_READY_TIMEOUTS_MS)
+                await self.consent.accept_async(page)
+
+                content = await page.content()
+                self._cache_page(url, content, response)
+
+        if self.cards is not None:
+            self.cards.update(extract_cards(content))
+        return extract_links(content)
+
+    async def collect_links(self) -> Set[str]:
+        """
+        Returns the links of all listings matching the query.
+        """
+        unique_links = await self._fetch_links(self.start_url)
+        logger.info("Found %d unique links: %s", len(unique_links), unique_links)
+        return unique_links
+
+    async def run(self) -> QueryResult:
+        """
+        Runs the scraper and returns the extracted entries.
+        """
+        entries, failed_links = await self.fetch_entries(await self.collect_links())
+        return QueryResult(entries, frozenset(failed_links))
+
+
+# pylint: disable=too-many-locals
+async def scrape_queries(
+    queries: Dict[str, URL],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    blocker: Optional[ResourceBlocker] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    options: ScrapeOptions = ScrapeOptions(),
+) -> QueryResults:
+    """
+    Runs an AsyncScraper for every query on a single browser, with at most
+    `concurrency` pages open at the same time and their navigations going
+    through `rate_limiter`. Links of all queries are collected first, so every
+    listing is fetched once. Queries whose listing page fails are left out of
+    the results. See ScrapeOptions for the `options` of the run.
+    """
+    cards: Optional[Dict[str, CardFields]] = {} if options.use_cards else None
+    # One store for all scrapers, so the consent is accepted once per run
+    consent = ConsentStore(options.consent_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with async_playwright() as playwright:
+        with METRICS.timer("browser_launch"):
+            browser = await playwright.chromium.launch(headless=True)
+        try:
+            scrapers = {
+                query_name: AsyncScraper(
+                    str(url),
+                    browser,
+                    semaphore,
+                    blocker,
+                    rate_limiter,
+                    consent,
+                    options,
+                    cards,
+                )
+                for query_name, url in queries.items()
+            }
+            with METRICS.timer("link_fetch"):
+                collected = await asyncio.gather(
+                    *(scraper.collect_links() for scraper in scrapers.values()),
+                    return_exceptions=True,
+                )
+            links_by_query: Dict[str, Set[str]] = {}
+            for query_name, links in zip(scrapers, collected):
+                if isinstance(links, BaseException):
+                    logger.error("Query [%s] failed: %s", query_name, links)
+                else:
+                    links_by_query[query_name] = links
+
+            # Entries are attributed to their queries by fan_out
+            entry_fetcher = AsyncEntryFetcher(
+                browser, semaphore, blocker, rate_limiter, consent, options, cards
+            )
+            with METRICS.timer("detail_fetch"):
+                entries, failed_links = await entry_fetcher.fetch_entries(
+                    merge_links(links_by_query)
+                )
+        finally:
+            await browser.close()
+    return fan_out(
+        links_by_query,
+        {query_name: scraper.start_url for query_name, scraper in scrapers.items()},
+        entries,
+        failed_links,
+    )
+
+
+def run_async_engine(
+    queries: Dict[str, URL],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    blocker: Optional[ResourceBlocker] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    options: ScrapeOptions = ScrapeOptions(),
+) -> QueryResults:
+    """
+    Synchronous entry point for the async engine.
+    """
+    return asyncio.run(
+        scrape_queries(queries, concurrency, blocker, rate_limiter, options)
+    )
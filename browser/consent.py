@@ -0,0 +1,95 @@
+"""
+Module for accepting the cookie consent once and reusing it in later
+contexts and runs through the context storage_state.
+"""
+
+import json
+import os
+from contextlib import suppress
+from typing import Any, Dict, Optional
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Page
+
+from browser.readiness import accept_cookies, accept_cookies_async
+from file_utils.atomic import atomic_write
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+
+logger = setup_logger("consent")
+
+
+class ConsentStore:
+    """
+    Holds the storage_state of a context in which the cookie consent was
+    accepted, persisted to `path` if given. New contexts are created with it,
+    so the consent dialog is not shown again. If the dialog shows up anyway
+    the stored state is stale and replaced by the state after accepting.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.state: Optional[Dict[str, Any]] = self._load()
+        self.accepted = 0
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if self.path is None or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="UTF8") as file:
+                state: Dict[str, Any] = json.load(file)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable consent state %s: %s", self.path, exc)
+            return None
+        logger.debug("Loaded the consent state from %s.", self.path)
+        return state
+
+    def context_options(self) -> Dict[str, Any]:
+        """
+        Returns the new_context keyword arguments that restore the consent.
+        """
+        return {"storage_state": self.state} if self.state is not None else {}
+
+    def invalidate(self) -> None:
+        """
+        Drops the stored state, in memory and on disk.
+        """
+        self.state = None
+        if self.path is not None:
+            with suppress(FileNotFoundError):
+                os.remove(self.path)
+
+    def _store(self, state: Dict[str, Any]) -> None:
+        self.state = state
+        self.accepted += 1
+        if self.path is None:
+            return
+        # Worker processes of --processes may save the state at the same time
+        with atomic_write(self.path) as file:
+            json.dump(state, file)
+        logger.info("Saved the consent state to %s.", self.path)
+
+    def _dialog_shown(self) -> None:
+        if self.state is not None:
+            logger.info("Cookie dialog shown despite the stored consent, renewing it.")
+            self.invalidate()
+
+    def accept(self, page: Page) -> None:
+        """
+        Accepts the cookie dialog if `page` shows it and stores the new state.
+        """
+        with METRICS.timer("consent"):
+            accepted = accept_cookies(page)
+        if accepted:
+            self._dialog_shown()
+            self._store(dict(page.context.storage_state()))
+
+    async def accept_async(self, page: AsyncPage) -> None:
+        """
+        Async counterpart of accept.
+        """
+        with METRICS.timer("consent"):
+            accepted = await accept_cookies_async(page)
+        if accepted:
+            self._dialog_shown()
+            self._store(dict(await page.context.storage_state()))
@@ -0,0 +1,174 @@
+"""
+Module for aborting the page requests the scraper does not need.
+"""
+
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from playwright.async_api import (
+    Page as AsyncPage,
+    Request as AsyncRequest,
+    Route as AsyncRoute,
+)
+from playwright.sync_api import Page, Request, Route
+
+from constants.constants import (
+    DEFAULT_ALLOWED_DOMAINS,
+    DEFAULT_BLOCKED_RESOURCE_TYPES,
+    ESTIMATED_RESOURCE_BYTES,
+)
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+
+logger = setup_logger("interception")
+
+
+def content_length(headers: Dict[str, str]) -> Optional[int]:
+    """
+    Returns the body size announced by the content-length header, if any.
+    """
+    try:
+        return int(headers["content-length"])
+    except (KeyError, ValueError):
+        return None
+
+
+class TrafficCounters:
+    """
+    Request counters of a single page, or the totals of a run.
+    """
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.blocked: int = 0
+        self.bytes_avoided: int = 0
+        self.bytes_loaded: int = 0
+
+    def add(self, other: "TrafficCounters") -> None:
+        """
+        Adds the counters of `other` to these counters.
+        """
+        self.requests += other.requests
+        self.blocked += other.blocked
+        self.bytes_avoided += other.bytes_avoided
+        self.bytes_loaded += other.bytes_loaded
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the counters.
+        """
+        return (
+            f"blocked {self.blocked} of {self.requests} requests "
+            f"(~{self.bytes_avoided / 1024:.0f} KiB avoided, "
+            f"{self.bytes_loaded / 1024:.0f} KiB loaded)"
+        )
+
+
+class ResourceBlocker:
+    """
+    Aborts requests for unneeded resource types and for domains outside of
+    `allowed_domains` through page.route, counting what was avoided.
+    """
+
+    def __init__(
+        self,
+        blocked_resource_types: Optional[Iterable[str]] = None,
+        allowed_domains: Optional[Iterable[str]] = None,
+    ):
+        self.blocked_resource_types = frozenset(
+            DEFAULT_BLOCKED_RESOURCE_TYPES
+            if blocked_resource_types is None
+            else blocked_resource_types
+        )
+        self.allowed_domains = tuple(
+            DEFAULT_ALLOWED_DOMAINS if allowed_domains is None else allowed_domains
+        )
+        self.totals = TrafficCounters()
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """
+        Decides whether a request is aborted.
+        """
+        if resource_type in self.blocked_resource_types:
+            return True
+        if not self.allowed_domains or not url.startswith("http"):
+            return False
+        host = urlsplit(url).hostname or ""
+        return not any(
+            host == domain or host.endswith(f".{domain}")
+            for domain in self.allowed_domains
+        )
+
+    def _count(self, counters: TrafficCounters, url: str, resource_type: str) -> bool:
+        counters.requests += 1
+        if not self.should_block(url, resource_type):
+            return False
+        counters.blocked += 1
+        counters.bytes_avoided += ESTIMATED_RESOURCE_BYTES.get(resource_type, 5_000)
+        return True
+
+    @staticmethod
+    def _count_loaded(counters: TrafficCounters, size: int) -> None:
+        counters.bytes_loaded += size
+        METRICS.inc("bytes_downloaded_total", size, source="browser")
+
+    def install(self, page: Page) -> TrafficCounters:
+        """
+        Installs the interception on a sync page and returns its counters.
+        """
+        counters = TrafficCounters()
+
+        def handle(route: Route) -> None:
+            request = route.request
+            if self._count(counters, request.url, request.resource_type):
+                route.abort()
+            else:
+                route.continue_()
+
+        def count_finished(request: Request) -> None:
+            response = request.response()
+            if response is None:
+                return
+            size = content_length(response.headers)
+            if size is None:
+                # Chunked responses have no content-length, the sizes are
+                # only known once the request finished
+                size = request.sizes()["responseBodySize"]
+            self._count_loaded(counters, size)
+
+        page.route("**/*", handle)
+        page.on("requestfinished", count_finished)
+        return counters
+
+    async def install_async(self, page: AsyncPage) -> TrafficCounters:
+        """
+        Installs the interception on an async page and returns its counters.
+        """
+        counters = TrafficCounters()
+
+        async def handle(route: AsyncRoute) -> None:
+            request = route.request
+            if self._count(counters, request.url, request.resource_type):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        async def count_finished(request: AsyncRequest) -> None:
+            response = await request.response()
+            if response is None:
+                return
+            size = content_length(response.headers)
+            if size is None:
+                size = (await request.sizes())["responseBodySize"]
+            self._count_loaded(counters, size)
+
+        await page.route("**/*", handle)
+        page.on("requestfinished", count_finished)
+        return counters
+
+    def finish_page(self, url: str, counters: TrafficCounters) -> None:
+        """
+        Logs the counters of a finished page and adds them to the run totals.
+        """
+        self.totals.add(counters)
+        logger.info("Page [%s]: %s", url, counters.summary())
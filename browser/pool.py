@@ -0,0 +1,259 @@
+"""
+Module for sharing a single Playwright browser between all pages of a run.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from playwright.sync_api import sync_playwright, Browser, Page, Playwright, Response
+
+from browser.consent import ConsentStore
+from browser.interception import ResourceBlocker
+from browser.tracing import SlowPageTraces
+from constants.constants import DEFAULT_BROWSER_MAX_PAGES, USER_AGENT
+from fetcher.rate_limiter import RateLimiter
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+from replay.archive import ResponseArchive
+from url.url import request_url
+
+logger = setup_logger("browser_pool")
+
+
+def process_tree_rss_mb(root_pid: Optional[int] = None) -> Optional[float]:
+    """
+    Returns the summed resident set size (in MB) of all descendants of `root_pid`
+    (the Playwright driver and Chromium processes), or None if /proc is unavailable.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+
+    root_pid = os.getpid() if root_pid is None else root_pid
+    children: Dict[int, List[int]] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="UTF8") as file:
+                stat = file.read()
+        except OSError:
+            continue
+        # Fields after the executable name: state, ppid, ... , rss (24th field)
+        fields = stat.rsplit(")", 1)[1].split()
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss_pages[pid] = int(fields[21])
+
+    total_pages = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        total_pages += rss_pages.get(pid, 0)
+        stack.extend(children.get(pid, []))
+
+    return total_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+class PoolStats:
+    """
+    Timings collected by the BrowserPool, used to compare browser startup
+    cost against the time actually spent loading pages.
+    """
+
+    def __init__(self) -> None:
+        self.launches: int = 0
+        self.launch_seconds: float = 0.0
+        self.recycles: int = 0
+        self.pages: int = 0
+        self.navigations: int = 0
+        self.navigation_seconds: float = 0.0
+
+    def record_launch(self, seconds: float) -> None:
+        """
+        Records a single browser launch.
+        """
+        self.launches += 1
+        self.launch_seconds += seconds
+
+    def record_navigation(self, seconds: float) -> None:
+        """
+        Records a single page.goto call.
+        """
+        self.navigations += 1
+        self.navigation_seconds += seconds
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the collected timings.
+        """
+        avg_launch = self.launch_seconds / self.launches if self.launches else 0.0
+        avg_navigation = (
+            self.navigation_seconds / self.navigations if self.navigations else 0.0
+        )
+        return (
+            f"Browser launches: {self.launches} ({self.launch_seconds:.2f}s total, "
+            f"{avg_launch:.2f}s avg, {self.recycles} recycles), "
+            f"pages served: {self.pages}, "
+            f"navigations: {self.navigations} ({self.navigation_seconds:.2f}s total, "
+            f"{avg_navigation:.2f}s avg)"
+        )
+
+
+# pylint: disable=too-many-instance-attributes
+class BrowserPool:
+    """
+    Keeps one Chromium instance alive for the whole run and hands out a fresh
+    context/page per link. The browser is restarted after `max_pages` pages or
+    when the browser processes grow over `max_rss_mb` megabytes. Navigations
+    go through `rate_limiter`, if given, and every context is created with the
+    cookie consent of `consent`. Navigation responses are recorded in `archive`,
+    if given, and the Playwright traces of the slowest pages are kept by `traces`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        max_pages: int = DEFAULT_BROWSER_MAX_PAGES,
+        max_rss_mb: Optional[int] = None,
+        headless: bool = True,
+        blocker: Optional[ResourceBlocker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        consent: Optional[ConsentStore] = None,
+        archive: Optional[ResponseArchive] = None,
+        traces: Optional[SlowPageTraces] = None,
+    ):
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.headless = headless
+        self.blocker = blocker
+        self.rate_limiter = rate_limiter
+        self.consent = consent if consent is not None else ConsentStore()
+        self.archive = archive
+        self.traces = traces
+        self.stats = PoolStats()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._pages_since_launch = 0
+
+    def __enter__(self) -> "BrowserPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Starts the Playwright driver. The browser itself is launched lazily.
+        """
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+
+    def close(self) -> None:
+        """
+        Closes the browser and stops the Playwright driver.
+        """
+        self._close_browser()
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def _launch_browser(self) -> Browser:
+        self.start()
+        assert self._playwright is not None
+        started = time.perf_counter()
+        with METRICS.timer("browser_launch"):
+            browser = self._playwright.chromium.launch(headless=self.headless)
+        self.stats.record_launch(time.perf_counter() - started)
+        logger.debug("Launched a new browser instance.")
+        self._pages_since_launch = 0
+        return browser
+
+    def _close_browser(self) -> None:
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:  # pylint: disable=broad-except
+                logger.debug("Browser was already closed.")
+            self._browser = None
+
+    def _get_browser(self) -> Browser:
+        if self._browser is None or not self._browser.is_connected():
+            self._close_browser()
+            self._browser = self._launch_browser()
+        return self._browser
+
+    def _should_recycle(self) -> bool:
+        if self._pages_since_launch >= self.max_pages:
+            logger.debug(
+                "Browser served %d pages, recycling.", self._pages_since_launch
+            )
+            return True
+        if self.max_rss_mb is not None:
+            rss_mb = process_tree_rss_mb()
+            if rss_mb is not None and rss_mb > self.max_rss_mb:
+                logger.debug("Browser RSS is %.0f MB, recycling.", rss_mb)
+                return True
+        return False
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        """
+        Yields a page in a fresh browser context. The context is closed on exit,
+        also when opening the page failed, and the browser is recycled if one
+        of the limits was reached.
+        """
+        context = self._get_browser().new_context(
+            user_agent=USER_AGENT, **self.consent.context_options()
+        )
+        started = time.perf_counter()
+        page: Optional[Page] = None
+        counters = None
+        try:
+            if self.traces is not None:
+                self.traces.start(context)
+            page = context.new_page()
+            if self.blocker is not None:
+                counters = self.blocker.install(page)
+            yield page
+        finally:
+            # The page is None when the context failed to open it
+            url = page.url if page is not None else "about:blank"
+            if self.blocker is not None and counters is not None:
+                self.blocker.finish_page(url, counters)
+            try:
+                if self.traces is not None:
+                    self.traces.stop(context, url, time.perf_counter() - started)
+                context.close()
+            except Exception:  # pylint: disable=broad-except
+                logger.debug("Browser context was already closed.")
+            self.stats.pages += 1
+            self._pages_since_launch += 1
+            if self._should_recycle():
+                self.stats.recycles += 1
+                self._close_browser()
+
+    def goto(self, page: Page, url: str, **kwargs: Any) -> Optional[Response]:
+        """
+        Navigates `page` to `url`, recording the time spent on navigation.
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(url)
+        started = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            response = page.goto(request_url(url), **kwargs)
+            status = response.status if response is not None else 200
+            if self.archive is not None and response is not None:
+                self.archive.record(url, status, response.headers, response.text())
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stats.record_navigation(elapsed)
+            METRICS.observe("stage_duration_seconds", elapsed, stage="navigation")
+            METRICS.record_fetch("browser", status)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record(url, status, elapsed)
@@ -0,0 +1,90 @@
+"""
+Module for waiting until a page holds the elements we extract, instead of
+waiting for the network to go idle.
+"""
+
+from typing import Dict, List
+
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Error as PlaywrightError, Page
+
+from extractor.card_extractor import CARD_SELECTOR
+from extractor.parsing import DESCRIPTION_SELECTOR, PRICE_SELECTOR
+from logger.logger import setup_logger
+
+logger = setup_logger("readiness")
+
+# Selector -> milliseconds it may take to appear. The listing attributes are
+# missing on some pages, so they get a short timeout.
+DETAIL_READY_TIMEOUTS_MS: Dict[str, int] = {
+    PRICE_SELECTOR: 10_000,
+    DESCRIPTION_SELECTOR: 10_000,
+    "#atributi": 1_000,
+}
+LISTING_READY_TIMEOUTS_MS: Dict[str, int] = {CARD_SELECTOR: 5_000}
+COOKIE_ACCEPT_SELECTOR = "button#CybotCookiebotDialogBodyButtonAccept"
+
+
+def wait_until_ready(page: Page, timeouts_ms: Dict[str, int]) -> List[str]:
+    """
+    Waits for every selector of `timeouts_ms` to be attached to the DOM and
+    returns the selectors that did not appear in time.
+    """
+    missing = []
+    for selector, timeout in timeouts_ms.items():
+        try:
+            page.wait_for_selector(selector, state="attached", timeout=timeout)
+        except PlaywrightError:
+            missing.append(selector)
+    if missing:
+        logger.debug("Page [%s] is missing %s.", page.url, missing)
+    return missing
+
+
+async def wait_until_ready_async(
+    page: AsyncPage, timeouts_ms: Dict[str, int]
+) -> List[str]:
+    """
+    Async counterpart of wait_until_ready.
+    """
+    missing = []
+    for selector, timeout in timeouts_ms.items():
+        try:
+            await page.wait_for_selector(selector, state="attached", timeout=timeout)
+        except PlaywrightError:
+            missing.append(selector)
+    if missing:
+        logger.debug("Page [%s] is missing %s.", page.url, missing)
+    return missing
+
+
+def accept_cookies(page: Page) -> bool:
+    """
+    Accepts cookies if the modal is already shown, without waiting for it.
+    """
+    try:
+        button = page.query_selector(COOKIE_ACCEPT_SELECTOR)
+        if button is None:
+            return False
+        button.click()
+        logger.debug("Accepted cookies.")
+        return True
+    except PlaywrightError:
+        logger.debug("Could not accept cookies.")
+        return False
+
+
+async def accept_cookies_async(page: AsyncPage) -> bool:
+    """
+    Async counterpart of accept_cookies.
+    """
+    try:
+        button = await page.query_selector(COOKIE_ACCEPT_SELECTOR)
+        if button is None:
+            return False
+        await button.click()
+        logger.debug("Accepted cookies.")
+        return True
+    except PlaywrightError:
+        logger.debug("Could not accept cookies.")
+        return False
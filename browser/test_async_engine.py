@@ -0,0 +1,181 @@
+"""
+This module contains tests for the async scraping engine.
+"""
+
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Set
+from unittest import mock
+from constants.objects import ExtractedEntry
+from url.url import URL
+from .async_engine import AsyncEntryFetcher, scrape_queries
+
+LINK = "https://www.nepremicnine.net/oglasi-prodaja/lj-stanovanje_{}/"
+# What EXTRACT_FIELDS_SCRIPT returns for a detail page
+FIELDS = {
+    "price": "150.000,00 €",
+    "location": "LJ. CENTER",
+    "attributes": ["Velikost: 50,00 m2"],
+    "description": "LJ. CENTER, 50,00 m2, zgrajeno l. 2000",
+    "author": None,
+}
+
+
+async def _fetch_entry(link: str) -> ExtractedEntry:
+    if link.endswith("_2/"):
+        raise TimeoutError("Timeout 30000ms exceeded")
+    return ExtractedEntry("LJ. CENTER", 50.0, 150000.0, link, "")
+
+
+class FakeResponse:  # pylint: disable=too-few-public-methods
+    """
+    Navigation response with a fixed status.
+    """
+
+    status = 200
+    headers: Dict[str, str] = {}
+
+
+class FakePage:
+    """
+    Detail page that takes a while to load.
+    """
+
+    url = "about:blank"
+
+    async def goto(self, url: str, **_: Any) -> FakeResponse:
+        """
+        Navigates to `url`.
+        """
+        await asyncio.sleep(0.01)
+        self.url = url
+        return FakeResponse()
+
+    async def wait_for_selector(self, selector: str, **_: Any) -> None:
+        """
+        Returns once `selector` is on the page.
+        """
+
+    async def query_selector(self, selector: str) -> None:
+        """
+        Returns None, the page has no cookie dialog.
+        """
+
+    async def evaluate(self, _script: str) -> Dict[str, Any]:
+        """
+        Returns the fields of the page.
+        """
+        return FIELDS
+
+
+class FakeBrowser:
+    """
+    Browser recording the most pages it had open at the same time.
+    """
+
+    def __init__(self) -> None:
+        self.open_pages = 0
+        self.max_open_pages = 0
+
+    async def new_context(self, **_: Any) -> "FakeBrowser":
+        """
+        Returns a new browser context, the browser itself.
+        """
+        return self
+
+    async def new_page(self) -> FakePage:
+        """
+        Opens a new page.
+        """
+        self.open_pages += 1
+        self.max_open_pages = max(self.max_open_pages, self.open_pages)
+        return FakePage()
+
+    async def close(self) -> None:
+        """
+        Closes a context, or the browser.
+        """
+        self.open_pages -= 1
+
+
+@asynccontextmanager
+async def _fake_playwright() -> AsyncIterator[Any]:
+    playwright = mock.Mock()
+    playwright.chromium.launch = mock.AsyncMock(return_value=FakeBrowser())
+    yield playwright
+
+
+async def _fetch_links(_self: Any, url: str) -> Set[str]:
+    if "okolica" in url:
+        raise TimeoutError("Timeout 30000ms exceeded")
+    return {LINK.format(1)}
+
+
+class TestAsyncEntryFetcher(unittest.TestCase):
+    """
+    Test class for the query independent fetching of detail pages.
+    """
+
+    def test_failed_link_is_left_out(self) -> None:
+        """
+        Test if a detail page that fails does not fail the other links and
+        is returned as failed.
+        """
+        fetcher = AsyncEntryFetcher(mock.Mock(), asyncio.Semaphore(2))
+        links = {LINK.format(number) for number in range(1, 4)}
+        with mock.patch.object(fetcher, "_fetch_entry", _fetch_entry):
+            with self.assertLogs("async_engine", "ERROR") as logs:
+                entries, failed_links = asyncio.run(fetcher.fetch_entries(links))
+        self.assertEqual(
+            sorted(entry.link for entry in entries),
+            [LINK.format(1), LINK.format(3)],
+        )
+        self.assertEqual(failed_links, {LINK.format(2)})
+        self.assertIn(LINK.format(2), logs.output[0])
+
+    def test_semaphore_limits_open_pages(self) -> None:
+        """
+        Test if no more pages are open at the same time than the semaphore allows.
+        """
+        browser = FakeBrowser()
+        fetcher = AsyncEntryFetcher(browser, asyncio.Semaphore(2))  # type: ignore
+        links = {LINK.format(number) for number in range(1, 7)}
+        entries, failed_links = asyncio.run(fetcher.fetch_entries(links))
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(failed_links, set())
+        self.assertEqual(browser.max_open_pages, 2)
+        self.assertEqual(browser.open_pages, 0)
+
+
+class TestScrapeQueries(unittest.TestCase):
+    """
+    Test class for running the queries on the async engine.
+    """
+
+    def test_failed_query_is_left_out(self) -> None:
+        """
+        Test if a listing page that fails only leaves out its own query.
+        """
+        queries = {
+            "mesto": URL("prodaja", "ljubljana-mesto", "stanovanje"),
+            "okolica": URL("prodaja", "ljubljana-okolica", "stanovanje"),
+        }
+        with mock.patch(
+            "browser.async_engine.async_playwright", _fake_playwright
+        ), mock.patch(
+            "browser.async_engine.AsyncScraper._fetch_links", _fetch_links
+        ), self.assertLogs(
+            "async_engine", "ERROR"
+        ) as logs:
+            results = asyncio.run(scrape_queries(queries, concurrency=2))
+        self.assertEqual(list(results), ["mesto"])
+        self.assertEqual(
+            [entry.origin_url for entry in results["mesto"].entries],
+            [str(queries["mesto"])],
+        )
+        self.assertIn("okolica", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
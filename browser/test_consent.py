@@ -0,0 +1,129 @@
+"""
+This module contains tests for the persisted cookie consent.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from typing import Any, Dict, Optional
+from .consent import ConsentStore
+
+STATE = {"cookies": [{"name": "CookieConsent", "value": "yes"}], "origins": []}
+
+
+# pylint: disable=too-few-public-methods
+class FakeButton:
+    """
+    Cookie dialog accept button.
+    """
+
+    def __init__(self) -> None:
+        self.clicked = False
+
+    def click(self) -> None:
+        """
+        Records the click.
+        """
+        self.clicked = True
+
+
+class FakeContext:
+    """
+    Browser context returning a fixed storage state.
+    """
+
+    def storage_state(self) -> Dict[str, Any]:
+        """
+        Returns the storage state of the context.
+        """
+        return STATE
+
+
+class FakePage:
+    """
+    Page that shows the cookie dialog or not.
+    """
+
+    def __init__(self, dialog_shown: bool):
+        self.button = FakeButton() if dialog_shown else None
+        self.context = FakeContext()
+        self.url = "https://www.nepremicnine.net/"
+
+    def query_selector(self, selector: str) -> Optional[FakeButton]:
+        """
+        Returns the accept button, if the dialog is shown.
+        """
+        return self.button if "Accept" in selector else None
+
+
+class TestConsentStore(unittest.TestCase):
+    """
+    Test class for the persisted cookie consent.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.directory.name, "consent_state.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_accepted_consent_is_saved_and_reused(self) -> None:
+        """
+        Test if the state after accepting is saved and restored by a later run.
+        """
+        store = ConsentStore(self.path)
+        self.assertEqual(store.context_options(), {})
+        page = FakePage(dialog_shown=True)
+        store.accept(page)  # type: ignore[arg-type]
+        self.assertTrue(page.button is not None and page.button.clicked)
+        self.assertEqual(
+            ConsentStore(self.path).context_options(), {"storage_state": STATE}
+        )
+
+    def test_no_dialog_keeps_the_state(self) -> None:
+        """
+        Test if pages without the dialog do not touch the stored state.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            json.dump(STATE, file)
+        store = ConsentStore(self.path)
+        store.accept(FakePage(dialog_shown=False))  # type: ignore[arg-type]
+        self.assertEqual(store.state, STATE)
+        self.assertEqual(store.accepted, 0)
+
+    def test_reappearing_dialog_renews_the_state(self) -> None:
+        """
+        Test if a dialog shown despite a stored state replaces that state.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            json.dump({"cookies": [], "origins": []}, file)
+        store = ConsentStore(self.path)
+        store.accept(FakePage(dialog_shown=True))  # type: ignore[arg-type]
+        self.assertEqual(store.state, STATE)
+        self.assertEqual(ConsentStore(self.path).state, STATE)
+
+    def test_invalidate_without_a_file(self) -> None:
+        """
+        Test if a state another process already removed is dropped quietly.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            json.dump(STATE, file)
+        store = ConsentStore(self.path)
+        os.remove(self.path)
+        store.invalidate()
+        self.assertIsNone(store.state)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_unreadable_state_is_ignored(self) -> None:
+        """
+        Test if a corrupt state file starts a run without stored consent.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            file.write("{")
+        self.assertIsNone(ConsentStore(self.path).state)
+
+
+if __name__ == "__main__":
+    unittest.main()
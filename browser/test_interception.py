@@ -0,0 +1,69 @@
+"""
+This module contains tests for the request interception rules.
+"""
+
+import unittest
+from unittest import mock
+from .interception import ResourceBlocker, TrafficCounters
+
+
+class TestResourceBlocker(unittest.TestCase):
+    """
+    Test class for the request interception rules.
+    """
+
+    def test_default_rules(self) -> None:
+        """
+        Test if documents and first party scripts pass, everything else is blocked.
+        """
+        blocker = ResourceBlocker()
+        self.assertFalse(
+            blocker.should_block("https://www.nepremicnine.net/oglasi/", "document")
+        )
+        self.assertFalse(
+            blocker.should_block("https://consent.cookiebot.com/uc.js", "script")
+        )
+        self.assertTrue(
+            blocker.should_block("https://img.nepremicnine.net/a.jpg", "image")
+        )
+        self.assertTrue(
+            blocker.should_block("https://www.googletagmanager.com/gtm.js", "script")
+        )
+
+    def test_empty_configuration_blocks_nothing(self) -> None:
+        """
+        Test if empty lists from the config disable the interception.
+        """
+        blocker = ResourceBlocker(blocked_resource_types=[], allowed_domains=[])
+        self.assertFalse(blocker.should_block("https://example.com/a.png", "image"))
+
+    def test_finish_page_adds_totals(self) -> None:
+        """
+        Test if the counters of finished pages are added to the run totals.
+        """
+        blocker = ResourceBlocker()
+        counters = TrafficCounters()
+        counters.requests, counters.blocked, counters.bytes_avoided = 10, 4, 2048
+        blocker.finish_page("https://www.nepremicnine.net/", counters)
+        blocker.finish_page("https://www.nepremicnine.net/", counters)
+        self.assertEqual(blocker.totals.blocked, 8)
+        self.assertEqual(blocker.totals.bytes_avoided, 4096)
+
+    def test_loaded_bytes_without_content_length(self) -> None:
+        """
+        Test if responses without a content-length are counted by their body size.
+        """
+        blocker = ResourceBlocker()
+        page = mock.Mock()
+        counters = blocker.install(page)
+        count_finished = page.on.call_args.args[1]
+        for headers in ({"content-length": "2048"}, {"transfer-encoding": "chunked"}):
+            request = mock.Mock()
+            request.response.return_value.headers = headers
+            request.sizes.return_value = {"responseBodySize": 1024}
+            count_finished(request)
+        self.assertEqual(counters.bytes_loaded, 3072)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+"""
+This module contains tests for the shared browser pool.
+"""
+
+import unittest
+from typing import Any, List, Optional
+from unittest import mock
+from .pool import BrowserPool
+
+
+class FakeResponse:  # pylint: disable=too-few-public-methods
+    """
+    Navigation response with a fixed status.
+    """
+
+    status = 200
+    headers: dict = {}
+
+
+class FakePage:  # pylint: disable=too-few-public-methods
+    """
+    Page whose navigations always succeed.
+    """
+
+    url = "https://www.nepremicnine.net/"
+
+    def goto(self, url: str, **_: Any) -> FakeResponse:
+        """
+        Navigates to `url`.
+        """
+        self.url = url
+        return FakeResponse()
+
+
+class FakeContext:
+    """
+    Browser context handing out fake pages, recording whether it was closed.
+    """
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def new_page(self) -> FakePage:
+        """
+        Returns a new page.
+        """
+        return FakePage()
+
+    def close(self) -> None:
+        """
+        Closes the context.
+        """
+        self.closed = True
+
+
+class FailingContext(FakeContext):
+    """
+    Browser context whose pages fail to open.
+    """
+
+    def new_page(self) -> FakePage:
+        """
+        Raises like a context of a browser that crashed.
+        """
+        raise RuntimeError("Target page, context or browser has been closed")
+
+
+class FakeBrowser:
+    """
+    Chromium instance recording whether it was closed.
+    """
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def new_context(self, **_: Any) -> FakeContext:
+        """
+        Returns a new browser context.
+        """
+        return FakeContext()
+
+    def is_connected(self) -> bool:
+        """
+        Returns whether the browser is still running.
+        """
+        return not self.closed
+
+    def close(self) -> None:
+        """
+        Closes the browser.
+        """
+        self.closed = True
+
+
+class FakePlaywright:
+    """
+    Playwright driver recording every browser it launched.
+    """
+
+    def __init__(self) -> None:
+        self.browsers: List[FakeBrowser] = []
+        self.chromium = self
+        self.stopped = False
+
+    def launch(self, **_: Any) -> FakeBrowser:
+        """
+        Launches a new browser.
+        """
+        self.browsers.append(FakeBrowser())
+        return self.browsers[-1]
+
+    def stop(self) -> None:
+        """
+        Stops the driver.
+        """
+        self.stopped = True
+
+
+class TestBrowserPool(unittest.TestCase):
+    """
+    Test class for the browser pool, with a fake Playwright driver.
+    """
+
+    def setUp(self) -> None:
+        self.playwright = FakePlaywright()
+        patcher = mock.patch("browser.pool.sync_playwright")
+        patcher.start().return_value.start.return_value = self.playwright
+        self.addCleanup(patcher.stop)
+
+    def _serve_pages(
+        self, count: int, max_pages: int = 100, max_rss_mb: Optional[int] = None
+    ) -> BrowserPool:
+        with BrowserPool(max_pages=max_pages, max_rss_mb=max_rss_mb) as pool:
+            for _ in range(count):
+                with pool.page():
+                    pass
+        return pool
+
+    def test_browser_is_launched_lazily(self) -> None:
+        """
+        Test if the browser is only launched for the first page and then reused.
+        """
+        with BrowserPool() as pool:
+            self.assertEqual(self.playwright.browsers, [])
+            for _ in range(3):
+                with pool.page():
+                    pass
+            self.assertEqual(len(self.playwright.browsers), 1)
+        self.assertTrue(self.playwright.browsers[0].closed)
+        self.assertTrue(self.playwright.stopped)
+
+    def test_recycled_after_max_pages(self) -> None:
+        """
+        Test if the browser is restarted after max_pages pages.
+        """
+        pool = self._serve_pages(5, max_pages=2)
+        self.assertEqual(len(self.playwright.browsers), 3)
+        self.assertEqual(pool.stats.recycles, 2)
+        self.assertEqual(pool.stats.launches, 3)
+        self.assertEqual(pool.stats.pages, 5)
+
+    def test_recycled_over_max_rss(self) -> None:
+        """
+        Test if the browser is restarted when its processes grow over max_rss_mb.
+        """
+        with mock.patch("browser.pool.process_tree_rss_mb", return_value=600.0):
+            pool = self._serve_pages(3, max_rss_mb=500)
+        self.assertEqual(pool.stats.recycles, 3)
+        self.assertEqual(pool.stats.launches, 3)
+
+        self.playwright.browsers.clear()
+        with mock.patch("browser.pool.process_tree_rss_mb", return_value=400.0):
+            pool = self._serve_pages(3, max_rss_mb=500)
+        self.assertEqual(pool.stats.recycles, 0)
+        self.assertEqual(len(self.playwright.browsers), 1)
+
+    def test_disconnected_browser_is_relaunched(self) -> None:
+        """
+        Test if a browser that crashed is replaced on the next page.
+        """
+        with BrowserPool() as pool:
+            with pool.page():
+                pass
+            self.playwright.browsers[0].closed = True
+            with pool.page():
+                pass
+        self.assertEqual(pool.stats.launches, 2)
+        self.assertEqual(pool.stats.recycles, 0)
+
+    def test_context_closed_when_page_fails(self) -> None:
+        """
+        Test if the context is closed and counted when its page fails to open.
+        """
+        context = FailingContext()
+        with BrowserPool() as pool:
+            with mock.patch.object(
+                FakeBrowser, "new_context", return_value=context
+            ), self.assertRaises(RuntimeError):
+                with pool.page():
+                    pass
+        self.assertTrue(context.closed)
+        self.assertEqual(pool.stats.pages, 1)
+
+    def test_stats_accounting(self) -> None:
+        """
+        Test if the pages and navigations are counted in the pool stats.
+        """
+        with BrowserPool() as pool:
+            for number in range(2):
+                with pool.page() as page:
+                    for _ in range(2):
+                        pool.goto(page, f"{page.url}{number}/")
+        self.assertEqual(pool.stats.pages, 2)
+        self.assertEqual(pool.stats.navigations, 4)
+        self.assertGreaterEqual(pool.stats.navigation_seconds, 0)
+        self.assertIn("pages served: 2", pool.stats.summary())
+        self.assertIn("navigations: 4", pool.stats.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
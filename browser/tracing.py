@@ -0,0 +1,86 @@
+"""
+Module for keeping the Playwright traces of the slowest pages of a run.
+"""
+
+import heapq
+import os
+import re
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext as AsyncBrowserContext
+from playwright.sync_api import BrowserContext
+
+from constants.constants import DEFAULT_PROFILE_TRACES
+from logger.logger import setup_logger
+
+logger = setup_logger("tracing")
+
+
+class SlowPageTraces:
+    """
+    Records a Playwright trace of every browser context and keeps the traces
+    of the `keep` slowest pages in `directory`, the others are discarded.
+    Open a kept trace with `playwright show-trace <file>`.
+    """
+
+    def __init__(self, directory: str, keep: int = DEFAULT_PROFILE_TRACES):
+        self.directory = directory
+        self.keep = keep
+        # Min-heap of (seconds, path), the fastest kept trace is evicted first
+        self.kept: List[Tuple[float, str]] = []
+        self._traced = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _wants(self, seconds: float) -> bool:
+        return len(self.kept) < self.keep or seconds > self.kept[0][0]
+
+    def _path(self, url: str, seconds: float) -> str:
+        self._traced += 1
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", urlsplit(url).path).strip("_")[-60:]
+        name = f"trace_{seconds * 1000:07.0f}ms_{self._traced}_{slug or 'page'}.zip"
+        return os.path.join(self.directory, name)
+
+    def _add(self, path: str, seconds: float) -> None:
+        heapq.heappush(self.kept, (seconds, path))
+        if len(self.kept) > self.keep:
+            _, evicted = heapq.heappop(self.kept)
+            os.remove(evicted)
+        logger.debug("Kept the trace of a %.2fs page in %s.", seconds, path)
+
+    def start(self, context: BrowserContext) -> None:
+        """
+        Starts tracing `context`.
+        """
+        context.tracing.start(screenshots=True, snapshots=True)
+
+    def stop(self, context: BrowserContext, url: str, seconds: float) -> None:
+        """
+        Stops tracing `context`, whose page at `url` took `seconds`, and keeps
+        the trace if the page is one of the slowest.
+        """
+        if not self._wants(seconds):
+            context.tracing.stop()
+            return
+        path = self._path(url, seconds)
+        context.tracing.stop(path=path)
+        self._add(path, seconds)
+
+    async def start_async(self, context: AsyncBrowserContext) -> None:
+        """
+        Async counterpart of start.
+        """
+        await context.tracing.start(screenshots=True, snapshots=True)
+
+    async def stop_async(
+        self, context: AsyncBrowserContext, url: str, seconds: float
+    ) -> None:
+        """
+        Async counterpart of stop.
+        """
+        if not self._wants(seconds):
+            await context.tracing.stop()
+            return
+        path = self._path(url, seconds)
+        await context.tracing.stop(path=path)
+        self._add(path, seconds)
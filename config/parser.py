@@ -24,6 +24,17 @@ class ConfigParser:
             "smtp_server": str,
             "smtp_port": int,
             "mail_to": List[str],
+            "browser_max_pages": Optional[int],
+            "browser_max_rss_mb": Optional[int],
+            "concurrency": Optional[int],
+            "blocked_resource_types": List[str],
+            "allowed_domains": List[str],
+            "revalidate_percent": Optional[int],
+            "delay_min_ms": Optional[int],
+            "delay_max_ms": Optional[int],
+            "cache_max_mb": Optional[int],
+            "cache_ttl_listing_minutes": Optional[int],
+            "cache_ttl_detail_minutes": Optional[int],
         },
         "poizvedbe": {
             "ime": str,
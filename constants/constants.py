@@ -73,3 +73,115 @@ ALLOWED_PROPERTY_TYPES = {
     "garaza",
     "pocitniski-objekt",
 }
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# Number of pages a single Chromium instance serves before it is restarted
+DEFAULT_BROWSER_MAX_PAGES = 50
+
+# Number of detail pages the async engine loads at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Number of keep-alive connections the HTTP fetcher keeps open per host
+DEFAULT_HTTP_POOL_SIZE = 4
+
+# Markers of a page that was served instead of the content (bot check, cookie wall)
+BLOCKED_PAGE_MARKERS = (
+    "cf-browser-verification",
+    "challenge-platform",
+    "<title>Just a moment...</title>",
+    'id="CybotCookiebotDialog"',
+)
+
+# Resource types the browser does not download, we only read text from the pages
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet"]
+
+# Requests to any other domain (ads, analytics, trackers) are aborted
+DEFAULT_ALLOWED_DOMAINS = ["nepremicnine.net", "cookiebot.com"]
+
+# Typical transfer sizes, used to estimate the bytes avoided by blocked requests
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 50_000,
+}
+
+# Interval between the starts of two requests to the site, in milliseconds. The
+# rate limiter starts a run at the max and shortens it down to the min while
+# the site responds fine
+DEFAULT_DELAY_MIN_MS = 1000
+DEFAULT_DELAY_MAX_MS = 2000
+
+# Responses telling the rate limiter to back off, as does a response slower than
+# SLOW_RESPONSE_SECONDS or a failed request
+THROTTLE_STATUS_CODES = (429, 503)
+SLOW_RESPONSE_SECONDS = 10.0
+
+# The request rate drops by RATE_LIMIT_BACKOFF_FACTOR on every back off, but not
+# below RATE_LIMIT_MIN_PER_SECOND, and grows by RATE_LIMIT_INCREASE_PER_SECOND
+# with every healthy response
+RATE_LIMIT_BACKOFF_FACTOR = 0.5
+RATE_LIMIT_MIN_PER_SECOND = 0.05
+RATE_LIMIT_INCREASE_PER_SECOND = 0.05
+
+# File next to the listing store the accepted cookie consent is kept in
+CONSENT_STATE_FILE = "consent_state.json"
+
+# On-disk page cache (--cache): directory next to the listing store, size bound
+# and how long listing (search result) and detail pages are served without a request
+CACHE_DIRECTORY = ".page_cache"
+DEFAULT_CACHE_MAX_MB = 200
+DEFAULT_CACHE_TTL_LISTING_MINUTES = 15
+DEFAULT_CACHE_TTL_DETAIL_MINUTES = 360
+
+# Origin of the scraped site. Requests are sent to the origin in the SITE_URL_ENV
+# environment variable instead, if it is set (e.g. a replay server, see --replay)
+SITE_URL = "https://www.nepremicnine.net"
+SITE_URL_ENV = "NEPREMICNINE_SITE_URL"
+
+# File in a --replay archive directory the email of a replayed run is written to
+REPLAY_EMAIL_FILE = "replay_email.html"
+
+# Run metrics (--metrics-dir): name prefix, latency histogram buckets in seconds
+# and the Prometheus node-exporter textfile and JSON summary written at the end
+METRICS_PREFIX = "nepremicnine_scraper"
+METRICS_BUCKETS_SECONDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_TEXTFILE = "nepremicnine_scraper.prom"
+METRICS_JSON_FILE = "metrics.json"
+
+# Profiling (--profile DIR): files written to DIR, the interval of the stack
+# sampler and the number of slowest browser pages whose Playwright trace is kept
+PROFILE_STATS_FILE = "profile.pstats"
+PROFILE_STACKS_FILE = "profile.collapsed"
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+DEFAULT_PROFILE_TRACES = 5
+
+# Store of the listings found by previous runs, a SQLite database next to the
+# script. A query_results.json file of older versions is migrated into it once.
+# Links are looked up in chunks of STORE_LOOKUP_CHUNK (SQLite variable limit)
+STORE_FILE = "query_results.sqlite3"
+LEGACY_STORE_FILE = "query_results.json"
+STORE_LOOKUP_CHUNK = 500
+
+# File based listing store (--store journal): a JSON lines journal next to the
+# script, compacted once it holds JOURNAL_COMPACT_RATIO records per stored entry
+# and at least JOURNAL_COMPACT_MIN_LINES records
+JOURNAL_FILE = "query_results.jsonl"
+JOURNAL_COMPACT_RATIO = 4
+JOURNAL_COMPACT_MIN_LINES = 1000
+
+# Price history of every listing (a point per price change), next to the store
+PRICE_HISTORY_FILE = "price_history.sqlite3"
+
+# Checkpoint of the current run next to the store: every fetched entry and
+# finished query is appended to it, so --resume continues an interrupted run
+CHECKPOINT_FILE = "run_checkpoint.jsonl"
+
+# Listings on the first search results page of a query, the only one that is
+# read. A query merged by --plan-queries whose page is full is run unmerged.
+LISTING_PAGE_SIZE = 30
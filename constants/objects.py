@@ -3,7 +3,8 @@ This module contains the types used in the project.
 """
 
 import json
-from typing import Optional, Any, Dict
+import sys
+from typing import Optional, Any, Dict, List, NamedTuple, Tuple
 
 
 class ExtractedEntryEncoder(json.JSONEncoder):
@@ -17,15 +18,44 @@ class ExtractedEntryEncoder(json.JSONEncoder):
         return super().default(o)
 
 
+# Fields of an ExtractedEntry, in the order of its arguments
+ENTRY_FIELDS = (
+    "location",
+    "square_footage",
+    "price",
+    "link",
+    "origin_url",
+    "built_year",
+    "price_per_m2",
+    "author",
+)
+
+
 # pylint: disable=too-many-instance-attributes
 class ExtractedEntry:
     """
     ExtractedEntry represents a single entry extracted from the website.
+
+    Entries are immutable and slotted: a run keeps every stored entry in sets,
+    so the hash is computed once and the strings many entries share (query
+    URL, location, author) are interned.
     """
 
+    __slots__ = ENTRY_FIELDS + ("_hash",)
+
+    location: str
+    square_footage: float
+    price: float
+    link: str
+    origin_url: str
+    built_year: Optional[int]
+    price_per_m2: int
+    author: Optional[str]
+    _hash: int
+
     # pylint: disable=too-many-arguments
-    def __init__(
-        self,
+    def __new__(
+        cls,
         location: str,
         square_footage: float,
         price: float,
@@ -34,19 +64,57 @@ class ExtractedEntry:
         built_year: Optional[int] = None,
         price_per_m2: Optional[int] = None,
         author: Optional[str] = None,
-    ):
-        self.location: str = location
-        self.square_footage: float = square_footage
-        self.price: float = price
-        self.link: str = link
-        self.built_year: Optional[int] = built_year
-        self.origin_url: str = origin_url
-        self.price_per_m2: int = (
-            int(round(price / (square_footage * 0.95), 0))
-            if price_per_m2 is None
-            else price_per_m2
+    ) -> "ExtractedEntry":
+        location = sys.intern(location)
+        origin_url = sys.intern(origin_url)
+        author = sys.intern(author) if author is not None else None
+        if price_per_m2 is None:
+            price_per_m2 = int(round(price / (square_footage * 0.95), 0))
+        # __setattr__ rejects changes, the slots are filled around it
+        self = object.__new__(cls)
+        set_slot = object.__setattr__
+        set_slot(self, "location", location)
+        set_slot(self, "square_footage", square_footage)
+        set_slot(self, "price", price)
+        set_slot(self, "link", link)
+        set_slot(self, "origin_url", origin_url)
+        set_slot(self, "built_year", built_year)
+        set_slot(self, "price_per_m2", price_per_m2)
+        set_slot(self, "author", author)
+        set_slot(
+            self,
+            "_hash",
+            hash(
+                (link, location, square_footage, price, built_year, origin_url, author)
+            ),
+        )
+        return self
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExtractedEntry":
+        """
+        Creates the ExtractedEntry stored as `data` by to_dict.
+        """
+        return cls(
+            data["location"],
+            data["square_footage"],
+            data["price"],
+            data["link"],
+            data["origin_url"],
+            data.get("built_year"),
+            data.get("price_per_m2"),
+            data.get("author"),
         )
-        self.author: Optional[str] = author
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"ExtractedEntry is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"ExtractedEntry is immutable, cannot delete {name}")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Rebuilt through __new__, string hashes differ between processes
+        return ExtractedEntry, tuple(getattr(self, name) for name in ENTRY_FIELDS)
 
     def __str__(self) -> str:
         return (
@@ -74,21 +142,30 @@ class ExtractedEntry:
             "author": self.author,
         }
 
-    def __hash__(self) -> int:
-        return hash(
-            (
-                self.link,
-                self.location,
-                self.square_footage,
-                self.price,
-                self.built_year,
-                self.origin_url,
-                self.author,
-            )
+    def with_origin_url(self, origin_url: str) -> "ExtractedEntry":
+        """
+        Returns the same entry attributed to the query at `origin_url`.
+        """
+        if origin_url == self.origin_url:
+            return self
+        return ExtractedEntry(
+            self.location,
+            self.square_footage,
+            self.price,
+            self.link,
+            origin_url,
+            self.built_year,
+            self.price_per_m2,
+            self.author,
         )
 
+    def __hash__(self) -> int:
+        return self._hash
+
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, ExtractedEntry):
+        if self is other:
+            return True
+        if not isinstance(other, ExtractedEntry) or self._hash != other._hash:
             return False
         return (
             self.link == other.link
@@ -99,3 +176,39 @@ class ExtractedEntry:
             and self.origin_url == other.origin_url
             and self.author == other.author
         )
+
+
+class EntryChange(NamedTuple):
+    """
+    A known listing whose fields changed since the previous run.
+    """
+
+    old: ExtractedEntry
+    new: ExtractedEntry
+    fields: Tuple[str, ...]
+
+
+class EntryDiff(NamedTuple):
+    """
+    Differences between the listings of a run and the stored ones, by listing.
+    """
+
+    new: List[ExtractedEntry]
+    price_changed: List[EntryChange]
+    field_changed: List[EntryChange]
+    delisted: List[ExtractedEntry]
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.new or self.price_changed or self.field_changed or self.delisted
+        )
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the differences.
+        """
+        return (
+            f"{len(self.new)} new, {len(self.price_changed)} with a changed price, "
+            f"{len(self.field_changed)} with other changes, "
+            f"{len(self.delisted)} delisted"
+        )
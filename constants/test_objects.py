@@ -0,0 +1,69 @@
+"""
+This module contains tests for the types used in the project.
+"""
+
+import json
+import pickle
+import unittest
+from .objects import ExtractedEntry, ExtractedEntryEncoder
+from .testing import QUERY_URL, make_entry
+
+
+class TestExtractedEntry(unittest.TestCase):
+    """
+    Test class for the ExtractedEntry type.
+    """
+
+    def test_immutable_and_slotted(self) -> None:
+        """
+        Test if entries have no __dict__ and reject changes.
+        """
+        entry = make_entry()
+        self.assertFalse(hasattr(entry, "__dict__"))
+        with self.assertRaises(AttributeError):
+            entry.price = 1.0  # type: ignore[misc]
+        with self.assertRaises(AttributeError):
+            del entry.author
+
+    def test_equality_and_hash(self) -> None:
+        """
+        Test if equal entries hash equal and a changed price makes a new entry.
+        """
+        self.assertEqual(make_entry(), make_entry())
+        self.assertEqual(hash(make_entry()), hash(make_entry()))
+        self.assertNotEqual(make_entry(), make_entry(price=240000.0))
+        self.assertEqual(
+            {make_entry(), make_entry()} - {make_entry(price=1.0)}, {make_entry()}
+        )
+
+    def test_strings_are_interned(self) -> None:
+        """
+        Test if the strings shared by many entries are stored once.
+        """
+        first, second = (
+            make_entry(
+                origin_url="".join([QUERY_URL]),
+                location="".join(["LJ. ŠIŠKA, ", "DRAVLJE"]),
+                author="".join(["ABC Nepremičnine ", "d.o.o."]),
+            )
+            for _ in range(2)
+        )
+        self.assertIs(first.origin_url, second.origin_url)
+        self.assertIs(first.location, second.location)
+        self.assertIs(first.author, second.author)
+
+    def test_dict_json_and_pickle_round_trip(self) -> None:
+        """
+        Test if entries survive to_dict/from_dict, JSON and pickling.
+        """
+        entry = make_entry(author="ABC Nepremičnine d.o.o.")
+        self.assertEqual(ExtractedEntry.from_dict(entry.to_dict()), entry)
+        encoded = json.dumps([entry], cls=ExtractedEntryEncoder)
+        self.assertEqual(ExtractedEntry.from_dict(json.loads(encoded)[0]), entry)
+        self.assertEqual(pickle.loads(pickle.dumps(entry)), entry)
+        self.assertEqual(entry.with_origin_url("other").origin_url, "other")
+        self.assertIs(entry.with_origin_url(QUERY_URL), entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
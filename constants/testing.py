@@ -0,0 +1,36 @@
+"""
+This module contains the entry factory shared by the tests.
+"""
+
+from typing import Any, Union
+
+from .objects import ExtractedEntry
+
+QUERY_URL = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+
+
+def listing_link(number: int) -> str:
+    """
+    Returns the link of the detail page of the listing `number`.
+    """
+    return f"https://www.nepremicnine.net/oglasi-prodaja/lj-stanovanje_{number}/"
+
+
+def make_entry(
+    listing: Union[int, str] = 1, origin_url: str = QUERY_URL, **fields: Any
+) -> ExtractedEntry:
+    """
+    Returns an entry of the listing `listing`, a listing number or a link,
+    found by the query `origin_url`. The other `fields` replace the defaults.
+    """
+    values = {
+        "location": "LJ. BEŽIGRAD, MUCHEJEVA",
+        "square_footage": 55.5,
+        "price": 200000.0,
+        "link": listing if isinstance(listing, str) else listing_link(listing),
+        "origin_url": origin_url,
+        "built_year": 1975,
+        "author": None,
+        **fields,
+    }
+    return ExtractedEntry.from_dict(values)
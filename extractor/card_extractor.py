@@ -0,0 +1,149 @@
+"""
+Module for extracting listing fields from the cards on a search results page.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+from constants.objects import ExtractedEntry
+from extractor.html_extractor import (
+    Element,
+    SelectorParser,
+    SimpleSelector,
+    compile_selector,
+    matches,
+)
+from extractor.parsing import (
+    LISTING_URL_PATTERN,
+    parse_built_year,
+    parse_description_square_footage,
+    parse_price,
+)
+
+CARD_SELECTOR = ".property-box"
+YEAR_PATTERN = re.compile(r"\d{4}")
+
+CARD_SELECTORS: Dict[str, Tuple[SimpleSelector, ...]] = {
+    "location": compile_selector(f"{CARD_SELECTOR} h2"),
+    "price": compile_selector(f"{CARD_SELECTOR} h6"),
+    "description": compile_selector(f"{CARD_SELECTOR} p"),
+    "features": compile_selector(f"{CARD_SELECTOR} li"),
+}
+CARD = compile_selector(CARD_SELECTOR)
+
+
+class CardFields(TypedDict):
+    """
+    Raw text of a single search result card. A value is None when the card
+    does not show it.
+    """
+
+    link: str
+    location: Optional[str]
+    price: Optional[str]
+    description: Optional[str]
+    features: List[str]
+
+
+class ListingPageParser(SelectorParser):
+    """
+    Streaming parser collecting the CardFields of a search results page.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(CARD_SELECTORS)
+        self.cards: Dict[str, CardFields] = {}
+        self._card_depth: Optional[int] = None
+        self._values: Dict[str, str] = {}
+        self._features: List[str] = []
+        self._link: Optional[str] = None
+
+    def element_opened(self, attributes: Dict[str, Optional[str]]) -> None:
+        if self._card_depth is None:
+            if matches(CARD, self.stack):
+                self._card_depth = len(self.stack)
+                self._values, self._features, self._link = {}, [], None
+            return
+        href = attributes.get("href")
+        if self._link is None and href and LISTING_URL_PATTERN.fullmatch(href):
+            self._link = href
+
+    def wants(self, field: str) -> bool:
+        return self._card_depth is not None and (
+            field == "features" or field not in self._values
+        )
+
+    def captured(self, field: str, text: str) -> None:
+        if field == "features":
+            self._features.append(text)
+        else:
+            self._values[field] = text
+
+    def element_closed(self, element: Element) -> None:
+        if self._card_depth is None or len(self.stack) >= self._card_depth:
+            return
+        self._card_depth = None
+        if self._link is not None and self._link not in self.cards:
+            self.cards[self._link] = {
+                "link": self._link,
+                "location": self._values.get("location"),
+                "price": self._values.get("price"),
+                "description": self._values.get("description"),
+                "features": self._features,
+            }
+
+
+def extract_cards(html: str) -> Dict[str, CardFields]:
+    """
+    Extracts the cards of a search results page, keyed by listing link.
+    """
+    parser = ListingPageParser()
+    parser.feed(html)
+    parser.close()
+    return parser.cards
+
+
+def _card_square_footage(card: CardFields) -> Optional[float]:
+    for feature in card["features"]:
+        size = parse_description_square_footage(feature)
+        if size is not None:
+            return size
+    if card["description"] is not None:
+        return parse_description_square_footage(card["description"])
+    return None
+
+
+def _card_built_year(card: CardFields) -> Optional[int]:
+    for feature in card["features"]:
+        if YEAR_PATTERN.fullmatch(feature):
+            return int(feature)
+    if card["description"] is not None:
+        return parse_built_year(card["description"])
+    return None
+
+
+def entry_from_card(
+    card: CardFields, known: ExtractedEntry, origin_url: str
+) -> Optional[ExtractedEntry]:
+    """
+    Refreshes a known entry with the price and size shown on its card. Returns
+    None if the card is missing one of them, the detail page is needed then.
+    Fields the card does not show (author) or shows differently than the
+    detail page (location) are kept from the known entry.
+    """
+    price = parse_price(card["price"]) if card["price"] is not None else None
+    square_footage = _card_square_footage(card)
+    if price is None or square_footage is None:
+        return None
+
+    return ExtractedEntry(
+        location=known.location,
+        square_footage=square_footage,
+        price=price,
+        link=card["link"],
+        origin_url=origin_url,
+        built_year=(
+            known.built_year if known.built_year is not None else _card_built_year(card)
+        ),
+        author=known.author,
+    )
@@ -0,0 +1,28 @@
+"""
+Module for reading the saved page corpus in extractor/fixtures, shared by the
+tests and the benchmarks.
+"""
+
+import glob
+import os
+from typing import List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture_names(pattern: str) -> List[str]:
+    """
+    Returns the sorted names of the saved pages matching `pattern`.
+    """
+    return sorted(
+        os.path.basename(path)
+        for path in glob.glob(os.path.join(FIXTURES_DIR, pattern))
+    )
+
+
+def read_fixture(name: str) -> str:
+    """
+    Reads the saved page `name`.
+    """
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="UTF8") as file:
+        return file.read()
@@ -0,0 +1,296 @@
+"""
+Module for extracting the detail page fields from raw HTML, without a browser.
+"""
+
+import abc
+import re
+from html.parser import HTMLParser
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from constants.objects import ExtractedEntry
+from extractor.parsing import (
+    ATTRIBUTES_SELECTOR,
+    AUTHOR_SELECTOR,
+    DESCRIPTION_SELECTOR,
+    LOCATION_SELECTOR,
+    PRICE_SELECTOR,
+    RawFields,
+    entry_from_fields,
+)
+
+SIMPLE_SELECTOR_PATTERN = re.compile(r"([a-z0-9]*)((?:[#.][\w-]+)*)")
+ID_PATTERN = re.compile(r"#([\w-]+)")
+CLASS_PATTERN = re.compile(r"\.([\w-]+)")
+VOID_ELEMENTS = frozenset(
+    {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "wbr"}
+)
+# Elements whose text is not part of innerText
+HIDDEN_ELEMENTS = frozenset({"script", "style", "noscript", "template"})
+# Elements rendered inline, every other element separates words in innerText
+INLINE_ELEMENTS = frozenset(
+    {"a", "abbr", "b", "em", "i", "small", "span", "strong", "sub", "sup", "u"}
+)
+
+
+class SimpleSelector(NamedTuple):
+    """
+    A single compound selector, e.g. `div#opis.kratek`.
+    """
+
+    tag: Optional[str]
+    element_id: Optional[str]
+    classes: Tuple[str, ...]
+
+
+class Element(NamedTuple):
+    """
+    An open element on the parser stack.
+    """
+
+    tag: str
+    element_id: Optional[str]
+    classes: Tuple[str, ...]
+
+
+def compile_selector(selector: str) -> Tuple[SimpleSelector, ...]:
+    """
+    Compiles a descendant-only CSS selector (e.g. `#opis .kratek strong`).
+    """
+    parts = []
+    for token in selector.split():
+        match = SIMPLE_SELECTOR_PATTERN.fullmatch(token)
+        if match is None:
+            raise ValueError(f"Unsupported selector: {selector}")
+        tag, qualifiers = match.groups()
+        ids = ID_PATTERN.findall(qualifiers)
+        parts.append(
+            SimpleSelector(
+                tag=tag or None,
+                element_id=ids[0] if ids else None,
+                classes=tuple(CLASS_PATTERN.findall(qualifiers)),
+            )
+        )
+    return tuple(parts)
+
+
+def _matches_simple(selector: SimpleSelector, element: Element) -> bool:
+    return (
+        (selector.tag is None or selector.tag == element.tag)
+        and (selector.element_id is None or selector.element_id == element.element_id)
+        and all(css_class in element.classes for css_class in selector.classes)
+    )
+
+
+def matches(selector: Tuple[SimpleSelector, ...], stack: List[Element]) -> bool:
+    """
+    Checks whether the innermost element of `stack` matches `selector`.
+    """
+    if not _matches_simple(selector[-1], stack[-1]):
+        return False
+    part = len(selector) - 2
+    for element in reversed(stack[:-1]):
+        if part < 0:
+            break
+        if _matches_simple(selector[part], element):
+            part -= 1
+    return part < 0
+
+
+# pylint: disable=too-few-public-methods
+class _Capture:
+    """
+    Text collected for a single matched element.
+    """
+
+    def __init__(self, field: str, depth: int, first_text_only: bool):
+        self.field = field
+        self.depth = depth
+        self.first_text_only = first_text_only
+        self.stopped = False
+        self.chunks: List[str] = []
+
+    def text(self) -> str:
+        """
+        Returns the collected text with whitespace collapsed like innerText.
+        """
+        return " ".join("".join(self.chunks).split())
+
+
+class SelectorParser(HTMLParser, abc.ABC):
+    """
+    Streaming parser collecting the innerText of the elements matching
+    `selectors`. Subclasses decide what happens with the text in `captured`.
+    Fields in `first_text_fields` only keep the first text node of the element.
+    """
+
+    def __init__(
+        self,
+        selectors: Dict[str, Tuple[SimpleSelector, ...]],
+        first_text_fields: FrozenSet[str] = frozenset(),
+    ):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.first_text_fields = first_text_fields
+        self.stack: List[Element] = []
+        self._captures: List[_Capture] = []
+        self._hidden_depth = 0
+
+    def wants(self, field: str) -> bool:  # pylint: disable=unused-argument
+        """
+        Returns whether another match of `field` should be captured.
+        """
+        return True
+
+    @abc.abstractmethod
+    def captured(self, field: str, text: str) -> None:
+        """
+        Called with the text of every captured element once it is closed.
+        """
+
+    def element_opened(self, attributes: Dict[str, Optional[str]]) -> None:
+        """
+        Called after an element is pushed on the stack.
+        """
+
+    def element_closed(self, element: Element) -> None:
+        """
+        Called after an element and its captures are closed.
+        """
+
+    def _separate_words(self) -> None:
+        for capture in self._captures:
+            if not capture.stopped:
+                capture.chunks.append(" ")
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self._hidden_depth or tag in HIDDEN_ELEMENTS:
+            if tag not in VOID_ELEMENTS:
+                self._hidden_depth += 1
+            return
+
+        # A child element ends the first text node of its parent
+        for capture in self._captures:
+            if capture.first_text_only:
+                capture.stopped = True
+        if tag not in INLINE_ELEMENTS:
+            self._separate_words()
+
+        if tag in VOID_ELEMENTS:
+            return
+        # An unclosed <li> or <p> is closed by its next sibling
+        if tag in ("li", "p") and self.stack and self.stack[-1].tag == tag:
+            self._close_top()
+
+        attributes = dict(attrs)
+        self.stack.append(
+            Element(
+                tag=tag,
+                element_id=attributes.get("id"),
+                classes=tuple((attributes.get("class") or "").split()),
+            )
+        )
+        self._open_captures()
+        self.element_opened(attributes)
+
+    def handle_startendtag(
+        self, tag: str, attrs: List[Tuple[str, Optional[str]]]
+    ) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS and not self._hidden_depth:
+            self.handle_endtag(tag)
+
+    def _open_captures(self) -> None:
+        depth = len(self.stack)
+        for field, selector in self.selectors.items():
+            if not self.wants(field) or not matches(selector, self.stack):
+                continue
+            if not any(capture.field == field for capture in self._captures):
+                self._captures.append(
+                    _Capture(field, depth, field in self.first_text_fields)
+                )
+
+    def _close_top(self) -> None:
+        depth = len(self.stack)
+        element = self.stack.pop()
+        for capture in [c for c in self._captures if c.depth == depth]:
+            self._captures.remove(capture)
+            self.captured(capture.field, capture.text())
+        self.element_closed(element)
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._hidden_depth:
+            if tag not in VOID_ELEMENTS:
+                self._hidden_depth -= 1
+            return
+        if tag not in INLINE_ELEMENTS:
+            self._separate_words()
+        if not any(element.tag == tag for element in self.stack):
+            return
+        while self.stack and self.stack[-1].tag != tag:
+            self._close_top()
+        self._close_top()
+
+    def handle_data(self, data: str) -> None:
+        if self._hidden_depth:
+            return
+        for capture in self._captures:
+            if not capture.stopped:
+                capture.chunks.append(data)
+
+    def close(self) -> None:
+        super().close()
+        while self.stack:
+            self._close_top()
+
+
+DETAIL_SELECTORS: Dict[str, Tuple[SimpleSelector, ...]] = {
+    "price": compile_selector(PRICE_SELECTOR),
+    "location": compile_selector(LOCATION_SELECTOR),
+    "description": compile_selector(DESCRIPTION_SELECTOR),
+    "attributes": compile_selector(ATTRIBUTES_SELECTOR),
+    "author": compile_selector(AUTHOR_SELECTOR),
+}
+
+
+class DetailPageParser(SelectorParser):
+    """
+    Streaming parser collecting the RawFields of a detail page.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(DETAIL_SELECTORS, frozenset({"price"}))
+        self.values: Dict[str, str] = {}
+        self.attributes: List[str] = []
+
+    def wants(self, field: str) -> bool:
+        # Single valued fields keep the first match, like page.query_selector
+        return field == "attributes" or field not in self.values
+
+    def captured(self, field: str, text: str) -> None:
+        if field == "attributes":
+            self.attributes.append(text)
+        else:
+            self.values[field] = text
+
+
+def extract_fields(html: str) -> RawFields:
+    """
+    Extracts the RawFields from the HTML of a detail page.
+    """
+    parser = DetailPageParser()
+    parser.feed(html)
+    parser.close()
+    return {
+        "price": parser.values.get("price"),
+        "location": parser.values.get("location"),
+        "attributes": parser.attributes,
+        "description": parser.values.get("description"),
+        "author": parser.values.get("author"),
+    }
+
+
+def entry_from_html(html: str, link: str, origin_url: str) -> ExtractedEntry:
+    """
+    Builds an ExtractedEntry from the HTML of a detail page.
+    """
+    return entry_from_fields(extract_fields(html), link, origin_url)
@@ -0,0 +1,50 @@
+"""
+Module with the in-page script reading all raw fields of a detail page in a
+single page.evaluate round trip.
+"""
+
+import json
+from typing import Any
+
+from extractor.parsing import (
+    ATTRIBUTES_SELECTOR,
+    AUTHOR_SELECTOR,
+    DESCRIPTION_SELECTOR,
+    LOCATION_SELECTOR,
+    PRICE_SELECTOR,
+    RawFields,
+)
+
+# innerText is used to match the inner_text() the engines used to call per element,
+# and the price is the first text node (the primary price) of its element.
+EXTRACT_FIELDS_SCRIPT = f"""() => {{
+    const text = (selector) => {{
+        const element = document.querySelector(selector);
+        return element ? element.innerText : null;
+    }};
+    const price = document.querySelector({json.dumps(PRICE_SELECTOR)});
+    const firstNode = price ? price.childNodes[0] : undefined;
+    return {{
+        price: firstNode ? firstNode.nodeValue : null,
+        location: text({json.dumps(LOCATION_SELECTOR)}),
+        attributes: Array.from(
+            document.querySelectorAll({json.dumps(ATTRIBUTES_SELECTOR)}),
+            (element) => element.innerText,
+        ),
+        description: text({json.dumps(DESCRIPTION_SELECTOR)}),
+        author: text({json.dumps(AUTHOR_SELECTOR)}),
+    }};
+}}"""
+
+
+def fields_from_result(result: Any) -> RawFields:
+    """
+    Converts the JSON object returned by EXTRACT_FIELDS_SCRIPT into RawFields.
+    """
+    return {
+        "price": result.get("price"),
+        "location": result.get("location"),
+        "attributes": list(result.get("attributes") or []),
+        "description": result.get("description"),
+        "author": result.get("author"),
+    }
@@ -0,0 +1,158 @@
+"""
+Module with the text parsing helpers shared by all scraping engines.
+"""
+
+import re
+from typing import List, Optional, Set, TypedDict
+
+from constants.objects import ExtractedEntry
+from logger.logger import setup_logger
+
+logger = setup_logger("extractor")
+
+PRICE_SELECTOR = ".cena span"
+LOCATION_SELECTOR = "#opis .kratek strong"
+DESCRIPTION_SELECTOR = "#opis .kratek"
+ATTRIBUTES_SELECTOR = "#atributi li"
+AUTHOR_SELECTOR = ".kontakt .prodajalec h2"
+
+LISTING_URL = r"https://www\.nepremicnine\.net/oglasi-[^/]+/[^/]+-[^/]+_[0-9]+/?"
+LISTING_URL_PATTERN = re.compile(LISTING_URL)
+LINK_PATTERN = re.compile(f'href="({LISTING_URL})"')
+PRICE_CLEANUP_PATTERN = re.compile(r"[^\d,.-]")
+# Handles both comma or period decimal separators before "m2"
+SQUARE_FOOTAGE_PATTERN = re.compile(r"([0-9]+(?:[.,][0-9]+)?)\s*m2")
+BUILT_YEAR_PATTERN = re.compile(r"zgrajen[ao] l\. (\d{4})")
+LISTING_ID_PATTERN = re.compile(r"_([0-9]+)/?$")
+
+
+def extract_links(content: str) -> Set[str]:
+    """
+    Extracts all listing links from the content of a search results page.
+    """
+    return set(LINK_PATTERN.findall(content))
+
+
+def listing_id(link: str) -> Optional[int]:
+    """
+    Returns the id of the listing at `link` (the number at the end of the
+    link), or None if the link has none.
+    """
+    match = LISTING_ID_PATTERN.search(link)
+    return int(match.group(1)) if match else None
+
+
+def parse_price(price_str: str) -> Optional[float]:
+    """
+    Parses the primary price text (e.g. "cca 185.000,00 €") into a float,
+    or returns None if nothing numeric is left after the cleanup.
+    """
+    # Remove non-numeric characters like 'do', 'cca', etc.
+    price_str = PRICE_CLEANUP_PATTERN.sub("", price_str.strip())
+
+    # Clean up the price string
+    price_str = price_str.replace("€", "").strip()
+    price_str = price_str.replace(".", "").replace(",", ".")
+
+    if not price_str:
+        return None
+
+    # Convert to float and round
+    return round(float(price_str), 0)
+
+
+def parse_size_attribute(attribute_text: str) -> Optional[float]:
+    """
+    Parses the square footage from a "Velikost: 54,30 m2" attribute,
+    or returns None if the attribute is not the size attribute.
+    """
+    if "Velikost" not in attribute_text:
+        return None
+    square_footage = attribute_text.split(":")[1].strip()
+    return float(
+        square_footage.replace("m\n2", "").replace("m2", "").strip().replace(",", ".")
+    )
+
+
+def parse_description_square_footage(description: str) -> Optional[float]:
+    """
+    Extracts the first "<number> m2" occurrence from the listing description.
+    """
+    square_footage_match = SQUARE_FOOTAGE_PATTERN.search(description)
+    if square_footage_match:
+        return float(square_footage_match.group(1).replace(",", "."))
+    return None
+
+
+def parse_built_year(description: str) -> Optional[int]:
+    """
+    Extracts the built year ("zgrajeno l. <year>") from the listing description.
+    """
+    built_year_match = BUILT_YEAR_PATTERN.search(description)
+    if built_year_match:
+        return int(built_year_match.group(1))
+    return None
+
+
+class RawFields(TypedDict):
+    """
+    Raw text of the detail page elements an ExtractedEntry is parsed from.
+    A value is None when the element is not present on the page.
+    """
+
+    price: Optional[str]
+    location: Optional[str]
+    attributes: List[str]
+    description: Optional[str]
+    author: Optional[str]
+
+
+def fields_complete(fields: RawFields) -> bool:
+    """
+    Checks whether the page contained the elements every entry needs.
+    """
+    return fields["price"] is not None and fields["description"] is not None
+
+
+def entry_from_fields(fields: RawFields, link: str, origin_url: str) -> ExtractedEntry:
+    """
+    Builds an ExtractedEntry from the raw fields of a detail page.
+    """
+    price = -1.0
+    if fields["price"] is None:
+        logger.error("Price element not found on the page")
+    else:
+        parsed_price = parse_price(fields["price"])
+        if parsed_price is None:
+            logger.error("Price string is empty after cleanup")
+        else:
+            price = parsed_price
+
+    # First attempt: Try to get square footage from the attribute list
+    square_footage = -1.0
+    for attribute in fields["attributes"]:
+        size = parse_size_attribute(attribute)
+        if size is not None:
+            square_footage = size
+
+    built_year = None
+    description = fields["description"]
+    if description is not None:
+        # Fallback approach: Try to extract square footage from the description
+        if square_footage == -1.0:
+            size = parse_description_square_footage(description)
+            if size is not None:
+                square_footage = size
+        built_year = parse_built_year(description)
+
+    author = fields["author"].strip() if fields["author"] is not None else ""
+
+    return ExtractedEntry(
+        link=link,
+        price=price,
+        square_footage=square_footage,
+        built_year=built_year,
+        location=fields["location"] if fields["location"] is not None else "N/A",
+        origin_url=origin_url,
+        author=author or None,
+    )
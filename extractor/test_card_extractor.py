@@ -0,0 +1,67 @@
+"""
+This module contains tests for the search result card extractor.
+"""
+
+import unittest
+from constants.objects import ExtractedEntry
+from .card_extractor import entry_from_card, extract_cards
+from .corpus import read_fixture
+
+LINK = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-siska-stanovanje_6823456/"
+
+
+class TestCardExtractor(unittest.TestCase):
+    """
+    Test class for the search result card extractor.
+    """
+
+    def test_extract_cards(self) -> None:
+        """
+        Test if every card is keyed by its listing link.
+        """
+        cards = extract_cards(read_fixture("listing_ljubljana_mesto.html"))
+        self.assertEqual(len(cards), 3)
+        card = cards[LINK]
+        self.assertEqual(card["location"], "LJ. ŠIŠKA, DRAVLJE")
+        self.assertEqual(card["price"], "cca 129.000 €")
+        self.assertEqual(card["features"], ["1968", "45,50 m2", "1/3"])
+
+    def test_entry_from_card(self) -> None:
+        """
+        Test if a known entry gets the price and size of its card.
+        """
+        card = extract_cards(read_fixture("listing_ljubljana_mesto.html"))[LINK]
+        known = ExtractedEntry(
+            location="LJ. ŠIŠKA",
+            square_footage=45.5,
+            price=135000.0,
+            link=LINK,
+            origin_url="other",
+            author="Agencija",
+        )
+        entry = entry_from_card(card, known, "origin")
+        assert entry is not None
+        self.assertEqual(entry.price, 129000.0)
+        self.assertEqual(entry.square_footage, 45.5)
+        self.assertEqual(entry.built_year, 1968)
+        self.assertEqual(entry.location, "LJ. ŠIŠKA")
+        self.assertEqual(entry.author, "Agencija")
+        self.assertEqual(entry.origin_url, "origin")
+
+    def test_incomplete_card(self) -> None:
+        """
+        Test if a card without a price needs the detail page.
+        """
+        card = extract_cards(
+            f'<div class="property-box"><a href="{LINK}"><h2>LJ.</h2></a>'
+            "<ul><li>45,50 m2</li></ul></div>"
+        )[LINK]
+        known = ExtractedEntry(
+            location="LJ.", square_footage=45.5, price=1.0, link=LINK, origin_url="o"
+        )
+        self.assertIsNone(card["price"])
+        self.assertIsNone(entry_from_card(card, known, "o"))
+
+
+if __name__ == "__main__":
+    unittest.main()
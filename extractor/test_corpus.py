@@ -0,0 +1,75 @@
+"""
+This module contains the tests of the extractors against the saved page corpus
+and the parity tests of the card extractor with the link and detail extractors.
+"""
+
+import json
+import re
+import unittest
+from fetcher.http_fetcher import is_blocked
+from .card_extractor import entry_from_card, extract_cards
+from .corpus import fixture_names, read_fixture
+from .html_extractor import entry_from_html, extract_fields
+from .parsing import extract_links, fields_complete
+
+LISTING_ID_PATTERN = re.compile(r"_(\d+)/$")
+
+
+class TestCorpus(unittest.TestCase):
+    """
+    Test class for the extractors against the page corpus. The pages are
+    synthetic, written with the markup of the site, and the expected entries
+    are written by hand from their content.
+    """
+
+    def test_detail_pages(self) -> None:
+        """
+        Test if every saved detail page yields its expected entry.
+        """
+        expected_entries = json.loads(read_fixture("expected_entries.json"))
+        pages = fixture_names("detail_*.html")
+        self.assertEqual(pages, sorted(expected_entries))
+        for page in pages:
+            with self.subTest(page=page):
+                entry = entry_from_html(read_fixture(page), page, "origin").to_dict()
+                for field, value in expected_entries[page].items():
+                    self.assertEqual(entry[field], value, field)
+
+    def test_cards_match_links(self) -> None:
+        """
+        Test if every card of a saved listing page belongs to an extracted link.
+        """
+        for page in fixture_names("listing_*.html"):
+            with self.subTest(page=page):
+                content = read_fixture(page)
+                self.assertEqual(set(extract_cards(content)), extract_links(content))
+
+    def test_cards_match_detail_pages(self) -> None:
+        """
+        Test if a card shows the price and size of its saved detail page.
+        """
+        detail_pages = set(fixture_names("detail_*.html"))
+        for page in fixture_names("listing_*.html"):
+            for link, card in extract_cards(read_fixture(page)).items():
+                match = LISTING_ID_PATTERN.search(link)
+                assert match is not None
+                detail_page = f"detail_{match.group(1)}.html"
+                if detail_page not in detail_pages:
+                    continue
+                with self.subTest(page=page, link=link):
+                    detail = entry_from_html(read_fixture(detail_page), link, page)
+                    self.assertEqual(entry_from_card(card, detail, page), detail)
+
+    def test_blocked_pages(self) -> None:
+        """
+        Test if saved cookie walls and bot checks are detected and incomplete.
+        """
+        for page in fixture_names("blocked_*.html"):
+            with self.subTest(page=page):
+                content = read_fixture(page)
+                self.assertTrue(is_blocked(200, content))
+                self.assertFalse(fields_complete(extract_fields(content)))
+
+
+if __name__ == "__main__":
+    unittest.main()
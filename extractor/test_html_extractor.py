@@ -0,0 +1,67 @@
+"""
+This module contains tests for the browser-free HTML extractor.
+"""
+
+import unittest
+from .corpus import read_fixture
+from .html_extractor import entry_from_html, extract_fields
+from .parsing import fields_complete
+
+
+class TestHtmlExtractor(unittest.TestCase):
+    """
+    Test class for the browser-free HTML extractor.
+    """
+
+    def test_extract_fields(self) -> None:
+        """
+        Test if the raw fields are read from the right elements.
+        """
+        fields = extract_fields(read_fixture("detail_6812345.html"))
+        self.assertEqual(fields["price"], "185.000,00 €")
+        self.assertEqual(fields["location"], "LJ. BEŽIGRAD, MUCHEJEVA")
+        self.assertIn("Velikost: 61,00 m2", fields["attributes"])
+        self.assertEqual(fields["author"], "ABC Nepremičnine d.o.o.")
+        self.assertTrue(fields_complete(fields))
+
+    def test_entry_with_size_from_attributes(self) -> None:
+        """
+        Test if an entry is built from a complete detail page.
+        """
+        entry = entry_from_html(read_fixture("detail_6812345.html"), "link", "origin")
+        self.assertEqual(entry.price, 185000.0)
+        self.assertEqual(entry.square_footage, 61.0)
+        self.assertEqual(entry.built_year, 1975)
+        self.assertEqual(entry.author, "ABC Nepremičnine d.o.o.")
+
+    def test_entry_with_size_from_description(self) -> None:
+        """
+        Test if the size falls back to the description and an empty author is None.
+        """
+        entry = entry_from_html(read_fixture("detail_6823456.html"), "link", "origin")
+        self.assertEqual(entry.price, 129000.0)
+        self.assertEqual(entry.square_footage, 45.5)
+        self.assertEqual(entry.built_year, 1968)
+        self.assertIsNone(entry.author)
+
+    def test_price_uses_first_text_node(self) -> None:
+        """
+        Test if text of child elements is not part of the price.
+        """
+        entry = entry_from_html(read_fixture("detail_6834567.html"), "link", "origin")
+        self.assertEqual(entry.price, 310000.0)
+        self.assertEqual(entry.location, "LJ. VIČ, ROŽNA DOLINA")
+
+    def test_incomplete_page(self) -> None:
+        """
+        Test if a page without the listing elements is reported as incomplete.
+        """
+        fields = extract_fields(
+            "<html><body><div id='cookie-wall'></div></body></html>"
+        )
+        self.assertFalse(fields_complete(fields))
+        self.assertEqual(fields["attributes"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+This module contains tests for the single round trip extraction script.
+"""
+
+import unittest
+from .page_script import EXTRACT_FIELDS_SCRIPT, fields_from_result
+from .parsing import RawFields, entry_from_fields
+
+
+class TestPageScript(unittest.TestCase):
+    """
+    Test class for the single round trip extraction script.
+    """
+
+    def test_script_returns_every_field(self) -> None:
+        """
+        Test if the script builds a key for every raw field.
+        """
+        for field in RawFields.__annotations__:
+            self.assertIn(f"{field}:", EXTRACT_FIELDS_SCRIPT)
+
+    def test_fields_from_result(self) -> None:
+        """
+        Test if the evaluate result is parsed like the per-field queries were.
+        """
+        fields = fields_from_result(
+            {
+                "price": "cca 185.000,00 € ",
+                "location": "LJ. BEŽIGRAD",
+                "attributes": ["Velikost: 61,00 m2"],
+                "description": "zgrajeno l. 1975",
+                "author": " ",
+            }
+        )
+        entry = entry_from_fields(fields, "link", "origin")
+        self.assertEqual(entry.price, 185000.0)
+        self.assertEqual(entry.square_footage, 61.0)
+        self.assertEqual(entry.built_year, 1975)
+        self.assertIsNone(entry.author)
+
+    def test_missing_elements(self) -> None:
+        """
+        Test if elements missing from the page become None.
+        """
+        fields = fields_from_result({"price": None, "attributes": []})
+        self.assertIsNone(fields["description"])
+        self.assertEqual(fields["attributes"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
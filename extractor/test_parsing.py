@@ -0,0 +1,83 @@
+"""
+This module contains tests for the text parsing helpers.
+"""
+
+import unittest
+from .parsing import (
+    extract_links,
+    listing_id,
+    parse_built_year,
+    parse_description_square_footage,
+    parse_price,
+    parse_size_attribute,
+)
+
+
+class TestParsing(unittest.TestCase):
+    """
+    Test class for the text parsing helpers.
+    """
+
+    def test_extract_links(self) -> None:
+        """
+        Test if only listing links are extracted and duplicates are removed.
+        """
+        content = (
+            '<a href="https://www.nepremicnine.net/oglasi-prodaja/'
+            'ljubljana-siska-stanovanje_6812345/">1</a>'
+            '<a href="https://www.nepremicnine.net/oglasi-prodaja/'
+            'ljubljana-siska-stanovanje_6812345/">1</a>'
+            '<a href="https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/">x</a>'
+        )
+        self.assertEqual(
+            extract_links(content),
+            {
+                "https://www.nepremicnine.net/oglasi-prodaja/"
+                "ljubljana-siska-stanovanje_6812345/"
+            },
+        )
+
+    def test_listing_id(self) -> None:
+        """
+        Test if the listing id is taken from the end of the link.
+        """
+        self.assertEqual(
+            listing_id(
+                "https://www.nepremicnine.net/oglasi-prodaja/"
+                "ljubljana-siska-stanovanje_6812345/"
+            ),
+            6812345,
+        )
+        self.assertIsNone(listing_id("https://www.nepremicnine.net/oglasi-prodaja/"))
+
+    def test_parse_price(self) -> None:
+        """
+        Test if the price is parsed from the primary price text.
+        """
+        self.assertEqual(parse_price(" cca 185.000,00 € "), 185000.0)
+        self.assertEqual(parse_price("199.999,50 €"), 200000.0)
+        self.assertIsNone(parse_price("po dogovoru"))
+
+    def test_parse_size_attribute(self) -> None:
+        """
+        Test if the size is parsed only from the size attribute.
+        """
+        self.assertEqual(parse_size_attribute("Velikost: 54,30 m2"), 54.3)
+        self.assertEqual(parse_size_attribute("Velikost: 61 m\n2"), 61.0)
+        self.assertIsNone(parse_size_attribute("Nadstropje: 3/5"))
+
+    def test_parse_description(self) -> None:
+        """
+        Test if the size and built year are parsed from the description.
+        """
+        description = (
+            "LJ. BEŽIGRAD, 2-sobno, 62,5 m2, zgrajeno l. 1975, adaptirano l. 2010"
+        )
+        self.assertEqual(parse_description_square_footage(description), 62.5)
+        self.assertEqual(parse_built_year(description), 1975)
+        self.assertIsNone(parse_built_year("novogradnja"))
+        self.assertIsNone(parse_description_square_footage("brez velikosti"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+"""
+Module for the on-disk cache of downloaded pages.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from constants.constants import (
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CACHE_TTL_DETAIL_MINUTES,
+    DEFAULT_CACHE_TTL_LISTING_MINUTES,
+)
+from extractor.parsing import LISTING_URL_PATTERN
+from file_utils.atomic import atomic_write
+from logger.logger import setup_logger
+from metrics.metrics import METRICS, MetricsRegistry
+
+logger = setup_logger("cache")
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalizes `url` so that equal pages share a cache entry: lower case scheme
+    and host, no fragment, sorted query parameters and a trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path or "/"
+    if not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+        path += "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def page_type(url: str) -> str:
+    """
+    Returns "detail" for listing detail pages and "listing" for everything
+    else (search result pages).
+    """
+    return "detail" if LISTING_URL_PATTERN.fullmatch(url) else "listing"
+
+
+class CachedPage(NamedTuple):
+    """
+    A cached page with the validators of the response it came from.
+    """
+
+    url: str
+    content: str
+    stored_at: float
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+# pylint: disable=too-few-public-methods
+class CacheStats:
+    """
+    Counters collected by the PageCache. Every event is also counted in
+    METRICS, which merges the events of worker processes into the run totals.
+    """
+
+    EVENTS = ("hits", "misses", "revalidated", "stored", "evicted")
+
+    def __init__(self) -> None:
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidated: int = 0
+        self.stored: int = 0
+        self.evicted: int = 0
+
+    @classmethod
+    def from_metrics(cls, registry: MetricsRegistry) -> "CacheStats":
+        """
+        Returns the cache events counted in `registry` by all processes.
+        """
+        stats = cls()
+        for event in cls.EVENTS:
+            count = registry.counter("page_cache_events_total", event=event)
+            setattr(stats, event, int(count))
+        return stats
+
+    def count(self, event: str) -> None:
+        """
+        Counts one `event`, one of EVENTS.
+        """
+        setattr(self, event, getattr(self, event) + 1)
+        METRICS.inc("page_cache_events_total", event=event)
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the collected counters.
+        """
+        lookups = self.hits + self.misses
+        hit_ratio = self.hits / lookups if lookups else 0.0
+        served = self.hits + self.revalidated
+        return (
+            f"Page cache: {self.hits} hits, {self.misses} misses "
+            f"({hit_ratio:.0%} hit ratio), {self.revalidated} revalidated "
+            f"({served / lookups if lookups else 0.0:.0%} served without a "
+            f"download), {self.stored} stored, {self.evicted} evicted"
+        )
+
+
+class PageCache:
+    """
+    Keeps downloaded pages in `directory`, one file per page named by the
+    hash of its canonical URL. Pages are fresh for the TTL of their page type,
+    stale pages keep their ETag/Last-Modified for a conditional request. The
+    least recently used pages are evicted once the cache outgrows `max_mb`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_mb: int = DEFAULT_CACHE_MAX_MB,
+        ttl_minutes: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.ttl_minutes = {
+            "listing": DEFAULT_CACHE_TTL_LISTING_MINUTES,
+            "detail": DEFAULT_CACHE_TTL_DETAIL_MINUTES,
+            **(ttl_minutes or {}),
+        }
+        self.clock = clock
+        self.stats = CacheStats()
+        os.makedirs(directory, exist_ok=True)
+        # key -> (bytes on disk, last use), the LRU order
+        self._index: Dict[str, Tuple[int, float]] = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, float]]:
+        index = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    index[entry.name[: -len(".json")]] = (stat.st_size, stat.st_mtime)
+        return index
+
+    def _path(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(canonical_url(url).encode("UTF8")).hexdigest()
+        return key, os.path.join(self.directory, f"{key}.json")
+
+    def lookup(self, url: str) -> Optional[CachedPage]:
+        """
+        Returns the cached page of `url`, fresh or stale, without counting it.
+        """
+        key, path = self._path(url)
+        if key not in self._index:
+            return None
+        try:
+            with open(path, "r", encoding="UTF8") as file:
+                return CachedPage(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            # Evicted by another process, or a partial write of an old version
+            self._index.pop(key, None)
+            return None
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """
+        Checks whether `page` is younger than the TTL of its page type.
+        """
+        ttl_seconds = self.ttl_minutes[page_type(page.url)] * 60
+        return self.clock() - page.stored_at < ttl_seconds
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Returns the content of `url` if a fresh copy is cached.
+        """
+        page = self.lookup(url)
+        if page is None or not self.is_fresh(page):
+            self.stats.count("misses")
+            return None
+        self.stats.count("hits")
+        self._touch(url)
+        return page.content
+
+    def put(
+        self,
+        url: str,
+        content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Stores the content of `url` with the validators of its response.
+        """
+        self._write(CachedPage(url, content, self.clock(), etag, last_modified))
+        self.stats.count("stored")
+
+    def put_response(self, url: str, content: str, headers: Mapping[str, str]) -> None:
+        """
+        Stores the content of `url` with the validators from its response `headers`.
+        """
+        lower_headers = {name.lower(): value for name, value in headers.items()}
+        self.put(
+            url, content, lower_headers.get("etag"), lower_headers.get("last-modified")
+        )
+
+    def revalidated(self, page: CachedPage) -> str:
+        """
+        Marks a stale page as fresh again after a 304 response, returns its content.
+        """
+        self._write(page._replace(stored_at=self.clock()))
+        self.stats.count("revalidated")
+        return page.content
+
+    def _write(self, page: CachedPage) -> None:
+        key, path = self._path(page.url)
+        with atomic_write(path) as file:
+            json.dump(page._asdict(), file)
+        self._index[key] = (os.path.getsize(path), self.clock())
+        self._evict()
+
+    def _touch(self, url: str) -> None:
+        key, path = self._path(url)
+        now = self.clock()
+        self._index[key] = (self._index[key][0], now)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        total = sum(size for size, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            try:
+                os.remove(os.path.join(self.directory, f"{key}.json"))
+            except OSError:
+                pass
+            del self._index[key]
+            self.stats.count("evicted")
+            total -= size
+            if total <= self.max_bytes:
+                break
+        logger.debug("Evicted pages down to %.1f MB.", total / 1024 / 1024)
@@ -0,0 +1,164 @@
+"""
+Module for downloading pages over a pooled keep-alive HTTP session, without a browser.
+"""
+
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from constants.constants import (
+    BLOCKED_PAGE_MARKERS,
+    DEFAULT_HTTP_POOL_SIZE,
+    USER_AGENT,
+)
+from fetcher.cache import PageCache
+from fetcher.rate_limiter import RateLimiter
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+from replay.archive import ResponseArchive
+from url.url import request_url
+
+logger = setup_logger("http_fetcher")
+
+
+def is_blocked(status_code: int, content: str) -> bool:
+    """
+    Checks whether the response is a bot check or cookie wall instead of the page.
+    """
+    if status_code != 200:
+        return True
+    return any(marker in content for marker in BLOCKED_PAGE_MARKERS)
+
+
+# pylint: disable=too-few-public-methods
+class FetchStats:
+    """
+    Counters collected by the HttpFetcher.
+    """
+
+    def __init__(self) -> None:
+        self.requests: int = 0
+        self.failures: int = 0
+        self.blocked: int = 0
+        self.fallbacks: int = 0
+        self.bytes: int = 0
+        self.seconds: float = 0.0
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the collected counters.
+        """
+        return (
+            f"HTTP requests: {self.requests} ({self.seconds:.2f}s total, "
+            f"{self.bytes / 1024:.0f} KiB), failures: {self.failures}, "
+            f"blocked: {self.blocked}, browser fallbacks: {self.fallbacks}"
+        )
+
+
+class HttpFetcher:
+    """
+    Fetches pages through a requests.Session whose connections are kept alive
+    and reused for every page of the run. Requests go through `rate_limiter`.
+    Pages are stored in `cache`, and stale cached pages are revalidated with
+    a conditional request. Responses are recorded in `archive`, if given.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+        timeout: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[PageCache] = None,
+        archive: Optional[ResponseArchive] = None,
+    ):
+        self.timeout = timeout
+        self.cache = cache
+        self.archive = archive
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.stats = FetchStats()
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "User-Agent": USER_AGENT,
+                "Accept-Language": "sl-SI,sl;q=0.9,en;q=0.8",
+            }
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 504)),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "HttpFetcher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        self.session.close()
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Returns the HTML of `url`, or None if the request failed or was blocked.
+        """
+        cached = self.cache.lookup(url) if self.cache is not None else None
+        headers = {}
+        if cached is not None and cached.etag is not None:
+            headers["If-None-Match"] = cached.etag
+        if cached is not None and cached.last_modified is not None:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        self.rate_limiter.wait(url)
+        started = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            response = self.session.get(
+                request_url(url), timeout=self.timeout, headers=headers
+            )
+            status = response.status_code
+        except requests.RequestException as exc:
+            self.stats.failures += 1
+            logger.warning("HTTP request to %s failed: %s", url, exc)
+            return None
+        finally:
+            elapsed = time.perf_counter() - started
+            self.rate_limiter.record(url, status, elapsed)
+            self.stats.requests += 1
+            self.stats.seconds += elapsed
+            METRICS.observe("stage_duration_seconds", elapsed, stage="http_fetch")
+            METRICS.record_fetch("http", status)
+
+        if (
+            response.status_code == 304
+            and self.cache is not None
+            and cached is not None
+        ):
+            if self.archive is not None:
+                self.archive.record(url, 200, response.headers, cached.content)
+            return self.cache.revalidated(cached)
+        content = response.text
+        self.stats.bytes += len(response.content)
+        METRICS.inc("bytes_downloaded_total", len(response.content), source="http")
+        if self.archive is not None:
+            self.archive.record(url, response.status_code, response.headers, content)
+        if is_blocked(response.status_code, content):
+            self.stats.blocked += 1
+            if response.status_code < 400:
+                # Error statuses were already counted as failures
+                METRICS.inc("fetch_failures_total", source="http")
+            logger.info(
+                "HTTP request to %s was blocked (status %d).", url, response.status_code
+            )
+            return None
+        if self.cache is not None:
+            self.cache.put_response(url, content, response.headers)
+        return content
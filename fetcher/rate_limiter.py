@@ -0,0 +1,224 @@
+"""
+Module for the per-host rate limiter all requests of a run go through.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+from constants.constants import (
+    DEFAULT_DELAY_MAX_MS,
+    DEFAULT_DELAY_MIN_MS,
+    RATE_LIMIT_BACKOFF_FACTOR,
+    RATE_LIMIT_INCREASE_PER_SECOND,
+    RATE_LIMIT_MIN_PER_SECOND,
+    SLOW_RESPONSE_SECONDS,
+    THROTTLE_STATUS_CODES,
+)
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+
+logger = setup_logger("rate_limiter")
+
+
+# pylint: disable=too-many-instance-attributes
+class HostLimiter:
+    """
+    Token bucket and AIMD state of the host `name`. The bucket refills at
+    `rate` requests per second and holds at most one token, so requests are
+    spaced out evenly. Healthy responses increase the rate and the concurrency
+    limit additively, throttled, slow or failed ones halve both. The limits
+    and back offs are exported to METRICS with a host label.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        name: str,
+        start_rate: float,
+        max_rate: float,
+        max_concurrency: int,
+        clock: Callable[[], float],
+    ):
+        self.name = name
+        self.rate = start_rate
+        self.max_rate = max_rate
+        self.concurrency_limit = 1.0
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.backoffs = 0
+        self.waited_seconds = 0.0
+        self._tokens = 1.0
+        self._refilled_at = clock()
+        self._last_backoff: Optional[float] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._export_limits()
+
+    def _export_limits(self) -> None:
+        METRICS.set("rate_limit_requests_per_second", self.rate, host=self.name)
+        METRICS.set(
+            "rate_limit_concurrency", int(self.concurrency_limit), host=self.name
+        )
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns the seconds until the request may start. The
+        bucket goes into debt, so concurrent reservations are queued.
+        """
+        now = self.clock()
+        self._tokens = min(1.0, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        self._tokens -= 1.0
+        seconds = max(0.0, -self._tokens / self.rate)
+        self.waited_seconds += seconds
+        return seconds
+
+    def record(self, status: Optional[int], seconds: float) -> None:
+        """
+        Adjusts the rate and concurrency limit to a finished request. A
+        `status` of None is a request that failed without a response.
+        """
+        self.requests += 1
+        if status in THROTTLE_STATUS_CODES:
+            self.throttled += 1
+        if status is None or status in THROTTLE_STATUS_CODES:
+            self._back_off(f"status {status}")
+        elif seconds > SLOW_RESPONSE_SECONDS:
+            self._back_off(f"slow response ({seconds:.1f}s)")
+        else:
+            self.rate = min(self.max_rate, self.rate + RATE_LIMIT_INCREASE_PER_SECOND)
+            self.concurrency_limit = min(
+                float(self.max_concurrency),
+                self.concurrency_limit + 1 / self.concurrency_limit,
+            )
+            self._export_limits()
+
+    def _back_off(self, reason: str) -> None:
+        now = self.clock()
+        # Requests that were already in flight report the same congestion
+        if self._last_backoff is not None and now - self._last_backoff < 1 / self.rate:
+            return
+        self._last_backoff = now
+        self.backoffs += 1
+        METRICS.inc("rate_limit_backoffs_total", host=self.name)
+        self.rate = max(
+            RATE_LIMIT_MIN_PER_SECOND, self.rate * RATE_LIMIT_BACKOFF_FACTOR
+        )
+        self.concurrency_limit = max(
+            1.0, self.concurrency_limit * RATE_LIMIT_BACKOFF_FACTOR
+        )
+        self._tokens = min(self._tokens, 0.0)
+        self._export_limits()
+        logger.warning(
+            "Backing off after %s: %.2f requests/s, %d concurrent.",
+            reason,
+            self.rate,
+            int(self.concurrency_limit),
+        )
+
+    def condition(self) -> asyncio.Condition:
+        """
+        Returns the condition async requests wait on for a concurrency slot.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+
+class RateLimiter:
+    """
+    Rate limiter shared by all fetch paths of a run, with separate state per
+    host. The rate starts at one request per `delay_max_ms` and grows up to one
+    request per `delay_min_ms` while the site is healthy. The async engine
+    also gets up to `max_concurrency` requests in flight.
+    """
+
+    def __init__(
+        self,
+        delay_min_ms: int = DEFAULT_DELAY_MIN_MS,
+        delay_max_ms: int = DEFAULT_DELAY_MAX_MS,
+        max_concurrency: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if delay_min_ms > delay_max_ms:
+            raise ValueError("delay_min_ms must not be larger than delay_max_ms")
+        self.delay_min_ms = delay_min_ms
+        self.delay_max_ms = delay_max_ms
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self.hosts: Dict[str, HostLimiter] = {}
+
+    def host(self, url: str) -> HostLimiter:
+        """
+        Returns the state of the host of `url`.
+        """
+        host = urlsplit(url).hostname or ""
+        if host not in self.hosts:
+            # A delay of 0 means no limit, which 1000 requests/s is close enough to
+            self.hosts[host] = HostLimiter(
+                host,
+                start_rate=1000 / max(self.delay_max_ms, 1),
+                max_rate=1000 / max(self.delay_min_ms, 1),
+                max_concurrency=self.max_concurrency,
+                clock=self.clock,
+            )
+        return self.hosts[host]
+
+    def wait(self, url: str) -> None:
+        """
+        Blocks until a request to `url` may start.
+        """
+        seconds = self.host(url).reserve()
+        if seconds > 0:
+            logger.debug("Rate limit: waiting %.2f seconds.", seconds)
+            time.sleep(seconds)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """
+        Holds one of the host's concurrency slots while an async request to
+        `url` is in flight, after waiting for its token.
+        """
+        host = self.host(url)
+        condition = host.condition()
+        async with condition:
+            await condition.wait_for(
+                lambda: host.in_flight < int(host.concurrency_limit)
+            )
+            host.in_flight += 1
+        try:
+            seconds = host.reserve()
+            if seconds > 0:
+                logger.debug("Rate limit: waiting %.2f seconds.", seconds)
+                await asyncio.sleep(seconds)
+            yield
+        finally:
+            async with condition:
+                host.in_flight -= 1
+                condition.notify_all()
+
+    def record(self, url: str, status: Optional[int], seconds: float) -> None:
+        """
+        Feeds the outcome of a request to `url` back into its host's limits.
+        """
+        self.host(url).record(status, seconds)
+
+    def summary(self) -> str:
+        """
+        Returns a human readable summary of the limits and back offs per host.
+        """
+        return "Rate limiter: " + (
+            "; ".join(
+                f"{name}: {host.requests} requests, {host.throttled} throttled, "
+                f"{host.backoffs} back offs, {host.rate:.2f} requests/s and "
+                f"{int(host.concurrency_limit)} concurrent now, "
+                f"waited {host.waited_seconds:.1f}s"
+                for name, host in self.hosts.items()
+            )
+            or "no requests"
+        )
@@ -0,0 +1,136 @@
+"""
+This module contains tests for the on-disk page cache.
+"""
+
+import tempfile
+import unittest
+from benchmarks.fixture_server import serve_directory
+from extractor.corpus import FIXTURES_DIR
+from metrics.metrics import METRICS, MetricsRegistry
+from .cache import CacheStats, PageCache, canonical_url, page_type
+from .http_fetcher import HttpFetcher
+from .rate_limiter import RateLimiter
+
+DETAIL_URL = (
+    "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-siska-stanovanje_6823456/"
+)
+LISTING_URL = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+
+
+# pylint: disable=too-few-public-methods
+class FakeClock:
+    """
+    Clock advanced by hand.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPageCache(unittest.TestCase):
+    """
+    Test class for the on-disk page cache.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.clock = FakeClock()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _cache(self, max_mb: int = 1) -> PageCache:
+        return PageCache(
+            self.directory.name, max_mb, {"listing": 10, "detail": 60}, self.clock
+        )
+
+    def test_canonical_url(self) -> None:
+        """
+        Test if spellings of the same page share a canonical URL.
+        """
+        self.assertEqual(
+            canonical_url("HTTPS://WWW.Nepremicnine.net/oglasi-prodaja/a?b=2&a=1#top"),
+            "https://www.nepremicnine.net/oglasi-prodaja/a/?a=1&b=2",
+        )
+        self.assertEqual(page_type(DETAIL_URL), "detail")
+        self.assertEqual(page_type(LISTING_URL), "listing")
+
+    def test_ttl_per_page_type(self) -> None:
+        """
+        Test if listing pages expire sooner than detail pages.
+        """
+        cache = self._cache()
+        cache.put(LISTING_URL, "listing")
+        cache.put(DETAIL_URL, "detail")
+        self.clock.now += 30 * 60
+        self.assertIsNone(cache.get(LISTING_URL))
+        self.assertEqual(cache.get(DETAIL_URL), "detail")
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+
+    def test_stats_of_all_processes(self) -> None:
+        """
+        Test if the events of worker processes merged into METRICS are in
+        the run totals.
+        """
+        METRICS.reset()
+        try:
+            cache = self._cache()
+            cache.put(DETAIL_URL, "detail")
+            cache.get(DETAIL_URL)
+            worker = MetricsRegistry()
+            worker.inc("page_cache_events_total", 2, event="hits")
+            METRICS.merge(worker)
+            stats = CacheStats.from_metrics(METRICS)
+            self.assertEqual((stats.hits, stats.misses, stats.stored), (3, 0, 1))
+            self.assertIn("3 hits", stats.summary())
+        finally:
+            METRICS.reset()
+
+    def test_cache_is_reused_by_later_runs(self) -> None:
+        """
+        Test if a new cache on the same directory serves the stored pages.
+        """
+        self._cache().put_response(DETAIL_URL, "detail", {"ETag": '"v1"'})
+        cached = self._cache().lookup(DETAIL_URL.rstrip("/"))
+        self.assertIsNotNone(cached)
+        assert cached is not None
+        self.assertEqual((cached.content, cached.etag), ("detail", '"v1"'))
+
+    def test_least_recently_used_pages_are_evicted(self) -> None:
+        """
+        Test if the cache stays under its size bound by evicting unused pages.
+        """
+        cache = self._cache(max_mb=1)
+        page = "x" * (400 * 1024)
+        cache.put(f"{LISTING_URL}?page=1", page)
+        self.clock.now += 1
+        cache.put(f"{LISTING_URL}?page=2", page)
+        self.clock.now += 1
+        cache.get(f"{LISTING_URL}?page=1")
+        self.clock.now += 1
+        cache.put(f"{LISTING_URL}?page=3", page)
+        self.assertIsNone(cache.lookup(f"{LISTING_URL}?page=2"))
+        self.assertIsNotNone(cache.lookup(f"{LISTING_URL}?page=1"))
+        self.assertEqual(cache.stats.evicted, 1)
+
+    def test_conditional_revalidation(self) -> None:
+        """
+        Test if a stale page is revalidated with If-Modified-Since.
+        """
+        cache = self._cache()
+        with serve_directory(FIXTURES_DIR) as base_url, HttpFetcher(
+            rate_limiter=RateLimiter(0, 0), cache=cache
+        ) as fetcher:
+            url = f"{base_url}/listing_ljubljana_mesto.html"
+            content = fetcher.fetch(url)
+            self.clock.now += 60 * 60
+            self.assertIsNone(cache.get(url))
+            self.assertEqual(fetcher.fetch(url), content)
+        self.assertEqual((cache.stats.stored, cache.stats.revalidated), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
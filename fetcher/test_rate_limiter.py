@@ -0,0 +1,128 @@
+"""
+This module contains tests for the per-host rate limiter.
+"""
+
+import asyncio
+import unittest
+from metrics.metrics import METRICS
+from .rate_limiter import RateLimiter
+
+URL = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+
+
+# pylint: disable=too-few-public-methods
+class FakeClock:
+    """
+    Clock advanced by hand.
+    """
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Test class for the per-host rate limiter.
+    """
+
+    def test_token_bucket_spaces_requests(self) -> None:
+        """
+        Test if requests reserved at the same time are queued one interval apart.
+        """
+        host = RateLimiter(500, 2000, clock=FakeClock()).host(URL)
+        self.assertEqual([host.reserve() for _ in range(3)], [0.0, 2.0, 4.0])
+
+    def test_load_time_counts_towards_the_interval(self) -> None:
+        """
+        Test if only the rest of the interval is waited after a slow page.
+        """
+        clock = FakeClock()
+        host = RateLimiter(2000, 2000, clock=clock).host(URL)
+        host.reserve()
+        clock.now += 1.5
+        self.assertAlmostEqual(host.reserve(), 0.5)
+
+    def test_healthy_responses_increase_the_rate(self) -> None:
+        """
+        Test if the rate grows additively up to one request per delay_min_ms.
+        """
+        limiter = RateLimiter(500, 2000, max_concurrency=3, clock=FakeClock())
+        for _ in range(100):
+            limiter.record(URL, 200, 0.3)
+        host = limiter.host(URL)
+        self.assertEqual(host.rate, 2.0)
+        self.assertEqual(host.concurrency_limit, 3.0)
+
+    def test_throttling_halves_the_limits(self) -> None:
+        """
+        Test if a 429 halves the rate and concurrency and counts a back off.
+        """
+        clock = FakeClock()
+        limiter = RateLimiter(500, 500, max_concurrency=4, clock=clock)
+        host = limiter.host(URL)
+        host.concurrency_limit = 4.0
+        limiter.record(URL, 429, 0.3)
+        self.assertEqual((host.rate, host.concurrency_limit), (1.0, 2.0))
+        # Requests in flight during the same interval do not back off again
+        limiter.record(URL, 503, 0.3)
+        self.assertEqual((host.backoffs, host.throttled), (1, 2))
+        clock.now += 5
+        limiter.record(URL, None, 0.3)
+        clock.now += 5
+        limiter.record(URL, 200, 30.0)
+        self.assertEqual(host.backoffs, 3)
+        self.assertEqual(host.concurrency_limit, 1.0)
+
+    def test_limits_are_exported(self) -> None:
+        """
+        Test if the limits and back offs of every host are in METRICS.
+        """
+        METRICS.reset()
+        try:
+            limiter = RateLimiter(500, 500, max_concurrency=4, clock=FakeClock())
+            limiter.host(URL).concurrency_limit = 4.0
+            limiter.record(URL, 429, 0.3)
+            host = (("host", "www.nepremicnine.net"),)
+            self.assertEqual(
+                METRICS.gauges[("rate_limit_requests_per_second", host)], 1.0
+            )
+            self.assertEqual(METRICS.gauges[("rate_limit_concurrency", host)], 2)
+            self.assertEqual(METRICS.counters[("rate_limit_backoffs_total", host)], 1)
+        finally:
+            METRICS.reset()
+
+    def test_hosts_are_limited_separately(self) -> None:
+        """
+        Test if a back off on one host does not slow down another.
+        """
+        limiter = RateLimiter(1000, 1000, clock=FakeClock())
+        limiter.record(URL, 429, 0.3)
+        self.assertEqual(limiter.host("https://consent.cookiebot.com/").rate, 1.0)
+        self.assertIn("1 back offs", limiter.summary())
+
+    def test_slot_bounds_concurrency(self) -> None:
+        """
+        Test if no more async requests are in flight than the concurrency limit.
+        """
+        limiter = RateLimiter(0, 0, max_concurrency=2)
+        limiter.host(URL).concurrency_limit = 2.0
+        in_flight = []
+
+        async def request() -> None:
+            async with limiter.slot(URL):
+                in_flight.append(limiter.host(URL).in_flight)
+                await asyncio.sleep(0.01)
+
+        async def run() -> None:
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(max(in_flight), 2)
+        self.assertEqual(limiter.host(URL).in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+"""
+Module for writing files atomically, so a reader or a crash never sees a
+partly written file.
+"""
+
+import os
+from contextlib import contextmanager, suppress
+from typing import IO, Any, Iterator
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", fsync: bool = False) -> Iterator[IO[Any]]:
+    """
+    Opens a temporary file next to `path` for writing in `mode` and replaces
+    `path` with it at once when the block exits. Worker processes may write
+    the same path, so the temporary file is named after the process. With
+    `fsync` the content is flushed to the disk before the replace. When the
+    block raises, `path` is left as it was.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    encoding = None if "b" in mode else "UTF8"
+    try:
+        with open(temporary_path, mode, encoding=encoding) as file:
+            yield file
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, path)
@@ -0,0 +1,62 @@
+"""
+This module contains tests for the atomic file writes.
+"""
+
+import os
+import tempfile
+import unittest
+from .atomic import atomic_write
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """
+    Test class for replacing a file at once.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.directory.name, "file.txt")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_file_is_replaced(self) -> None:
+        """
+        Test if the content replaces the file and no temporary file is left.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            file.write("old")
+        with atomic_write(self.path, fsync=True) as file:
+            file.write("new")
+            with open(self.path, encoding="UTF8") as old_file:
+                self.assertEqual(old_file.read(), "old")
+        with open(self.path, encoding="UTF8") as file:
+            self.assertEqual(file.read(), "new")
+        self.assertEqual(os.listdir(self.directory.name), ["file.txt"])
+
+    def test_binary_mode(self) -> None:
+        """
+        Test if bytes are written in a binary mode.
+        """
+        with atomic_write(self.path, "wb") as file:
+            file.write(b"<html></html>")
+        with open(self.path, "rb") as file:
+            self.assertEqual(file.read(), b"<html></html>")
+
+    def test_failed_write_keeps_the_file(self) -> None:
+        """
+        Test if a block that raises leaves the file as it was.
+        """
+        with open(self.path, "w", encoding="UTF8") as file:
+            file.write("old")
+        with self.assertRaises(ValueError):
+            with atomic_write(self.path) as file:
+                file.write("partial")
+                raise ValueError("serialization failed")
+        with open(self.path, encoding="UTF8") as file:
+            self.assertEqual(file.read(), "old")
+        self.assertEqual(os.listdir(self.directory.name), ["file.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,14 +6,129 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
 import ssl
-from typing import List
+from typing import Any, List
 
-from constants.objects import ExtractedEntry
+from constants.objects import EntryChange, EntryDiff, ExtractedEntry
 
+FIELD_LABELS = {
+    "price": "Cena",
+    "location": "Lokacija",
+    "square_footage": "Velikost",
+    "built_year": "Leto izgradnje",
+    "author": "Avtor",
+}
 
-def create_email_body(entries: List[ExtractedEntry]) -> MIMEMultipart:
+
+def _format_price(price: float) -> str:
+    return f"{int(round(price, 0)):,} €".replace(",", ".")
+
+
+def _format_field(name: str, value: Any) -> str:
+    if name == "price":
+        return _format_price(value)
+    if name == "square_footage":
+        return f"{value} m2"
+    return str(value)
+
+
+def _entries_table(title: str, entries: List[ExtractedEntry]) -> str:
+    html = f"""
+        <h2>{title}</h2>
+        <table>
+            <tr>
+                <th>Link</th>
+                <th>Lokacija</th>
+                <th>Leto izgradnje</th>
+                <th>Velikost</th>
+                <th>Cena</th>
+                <th>Cena/m2 (*0.95)</th>
+                <th>Avtor</th>
+            </tr>"""
+
+    for entry in entries:
+        price_per_m2_formatted = f"{entry.price_per_m2:,}".replace(",", ".")
+
+        html += f"""
+            <tr>
+                <td><a href="{entry.link}">{entry.link}</a></td>
+                <td>{entry.location}</td>
+                <td>{entry.built_year}</td>
+                <td>{entry.square_footage} m2</td>
+                <td>{_format_price(entry.price)}</td>
+                <td>{price_per_m2_formatted} €/m2</td>
+                <td>{entry.author}</td>
+            </tr>
+        """
+
+    return html + """
+        </table>"""
+
+
+def _price_changes_table(title: str, changes: List[EntryChange]) -> str:
+    html = f"""
+        <h2>{title}</h2>
+        <table>
+            <tr>
+                <th>Link</th>
+                <th>Lokacija</th>
+                <th>Stara cena</th>
+                <th>Nova cena</th>
+                <th>Sprememba</th>
+                <th>Cena/m2 (*0.95)</th>
+            </tr>"""
+
+    for old, new, _ in changes:
+        percent = (new.price - old.price) / old.price * 100 if old.price else 0.0
+        price_per_m2_formatted = f"{new.price_per_m2:,}".replace(",", ".")
+
+        html += f"""
+            <tr>
+                <td><a href="{new.link}">{new.link}</a></td>
+                <td>{new.location}</td>
+                <td>{_format_price(old.price)}</td>
+                <td>{_format_price(new.price)}</td>
+                <td>{percent:+.1f} %</td>
+                <td>{price_per_m2_formatted} €/m2</td>
+            </tr>
+        """
+
+    return html + """
+        </table>"""
+
+
+def _field_changes_table(title: str, changes: List[EntryChange]) -> str:
+    html = f"""
+        <h2>{title}</h2>
+        <table>
+            <tr>
+                <th>Link</th>
+                <th>Lokacija</th>
+                <th>Spremembe</th>
+            </tr>"""
+
+    for old, new, fields in changes:
+        differences = "<br>".join(
+            f"{FIELD_LABELS[name]}: {_format_field(name, getattr(old, name))} → "
+            f"{_format_field(name, getattr(new, name))}"
+            for name in fields
+        )
+
+        html += f"""
+            <tr>
+                <td><a href="{new.link}">{new.link}</a></td>
+                <td>{new.location}</td>
+                <td>{differences}</td>
+            </tr>
+        """
+
+    return html + """
+        </table>"""
+
+
+def create_email_body(diff: EntryDiff) -> MIMEMultipart:
     """
-    Creates the email body with the given parameters.
+    Creates the email body with a section for the new, price changed,
+    otherwise changed and delisted listings of `diff`.
     """
     body = MIMEMultipart("alternative")
     html_body = """<html>
@@ -66,37 +181,16 @@ def create_email_body(entries: List[ExtractedEntry]) -> MIMEMultipart:
     <body>
         <h1>Za vašo poizvedbo je prišlo do sprememb!</h1>"""
 
-    html_body += """
-        <h2>Najdene nepremičnine:</h2>
-        <table>
-            <tr>
-                <th>Link</th>
-                <th>Lokacija</th>
-                <th>Leto izgradnje</th>
-                <th>Velikost</th>
-                <th>Cena</th>
-                <th>Cena/m2 (*0.95)</th>
-                <th>Avtor</th>
-            </tr>"""
-
-    for entry in entries:
-        price_formatted = f"{int(round(entry.price, 0)):,}".replace(",", ".")
-        price_per_m2_formatted = f"{entry.price_per_m2:,}".replace(",", ".")
-
-        html_body += f"""
-            <tr>
-                <td><a href="{entry.link}">{entry.link}</a></td>
-                <td>{entry.location}</td>
-                <td>{entry.built_year}</td>
-                <td>{entry.square_footage} m2</td>
-                <td>{price_formatted} €</td>
-                <td>{price_per_m2_formatted} €/m2</td>
-                <td>{entry.author}</td>
-            </tr>
-        """
+    if diff.new:
+        html_body += _entries_table("Najdene nepremičnine:", diff.new)
+    if diff.price_changed:
+        html_body += _price_changes_table("Spremenjene cene:", diff.price_changed)
+    if diff.field_changed:
+        html_body += _field_changes_table("Spremenjeni podatki:", diff.field_changed)
+    if diff.delisted:
+        html_body += _entries_table("Umaknjeni oglasi:", diff.delisted)
 
     html_body += """
-        </table>
     </body>
     </html>"""
 
@@ -1,62 +1,62 @@
-# """
-# This script is used to test the email_generator module.
-# """
-
-# import os
-# from dotenv import load_dotenv
-
-# from email_generator import create_email_body, send_email
-# from scraper import ExtractedEntry
-# from url.url import URL
-
-# load_dotenv()
-
-
-# url = URL(
-#     type_of_offer="prodaja",
-#     region="ljubljana-mesto",
-#     type_of_property="stanovanje",
-#     size_from=50,
-#     size_to=100,
-#     price_from=100000,
-#     price_to=200000,
-# )
-# entries = [
-#     ExtractedEntry(
-#         link="https://www.nepremicnine.net/oglasi-prodaja/",
-#         origin_url="https://www.nepremicnine.net/oglasi-prodaja/",
-#         built_year=2020,
-#         location="LJ. BEŽIGRAD, MUCHEJEVA",
-#         square_footage=61,
-#         price=185000,
-#     ),
-#     ExtractedEntry(
-#         link="https://www.nepremicnine.net/oglasi-prodaja/",
-#         location="LJ. BEŽIGRAD, FUŽINE",
-#         square_footage=62,
-#         price=195000,
-#         built_year=2021,
-#         origin_url="https://www.nepremicnine.net/oglasi-prodaja/",
-#     ),
-#     ExtractedEntry(
-#         link="https://www.nepremicnine.net/oglasi-prodaja/",
-#         location="LJ. BEŽIGRAD, NOVE STOŽICE",
-#         square_footage=65,
-#         price=199999,
-#         built_year=2019,
-#         origin_url="https://www.nepremicnine.net/oglasi-prodaja/",
-#     ),
-# ]
-
-# print(f"Found {len(entries)} entries: {entries}")
-
-# if entries:
-#     email_body = create_email_body(entries)
-#     send_email(
-#         os.environ["MAIL_FROM"],
-#         os.environ["MAIL_FROM_PASSWORD"],
-#         [os.environ["MAIL_TO"]],
-#         os.environ["SMTP_SERVER"],
-#         int(os.environ["SMTP_PORT"]),
-#         email_body,
-#     )
+"""
+This module contains tests for the email of the run's changes.
+"""
+
+import unittest
+from constants.objects import EntryChange, EntryDiff
+from constants.testing import make_entry
+from .email_generator import create_email_body
+
+
+def _html(diff: EntryDiff) -> str:
+    for part in create_email_body(diff).walk():
+        payload = part.get_payload(decode=True)
+        if isinstance(payload, bytes):
+            return payload.decode("UTF8")
+    return ""
+
+
+class TestEmailGenerator(unittest.TestCase):
+    """
+    Test class for the email of the run's changes.
+    """
+
+    def test_email_sections(self) -> None:
+        """
+        Test if every kind of change gets its own section in the email.
+        """
+        diff = EntryDiff(
+            new=[make_entry(1)],
+            price_changed=[
+                EntryChange(make_entry(2), make_entry(2, price=190000.0), ("price",))
+            ],
+            field_changed=[
+                EntryChange(
+                    make_entry(3), make_entry(3, built_year=1980), ("built_year",)
+                )
+            ],
+            delisted=[make_entry(4)],
+        )
+        html = _html(diff)
+        for section in (
+            "Najdene nepremičnine:",
+            "Spremenjene cene:",
+            "Spremenjeni podatki:",
+            "Umaknjeni oglasi:",
+        ):
+            self.assertIn(section, html)
+        self.assertIn("200.000 €", html)
+        self.assertIn("-5.0 %", html)
+        self.assertIn("Leto izgradnje: 1975 → 1980", html)
+
+    def test_empty_sections_are_left_out(self) -> None:
+        """
+        Test if only the kinds of changes the run found are in the email.
+        """
+        html = _html(EntryDiff([make_entry(1)], [], [], []))
+        self.assertIn("Najdene nepremičnine:", html)
+        self.assertNotIn("Umaknjeni oglasi:", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
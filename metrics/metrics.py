@@ -0,0 +1,257 @@
+"""
+Module for collecting the counters and latency histograms of a run and
+exporting them as a Prometheus node-exporter textfile and a JSON summary.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from constants.constants import METRICS_BUCKETS_SECONDS, METRICS_PREFIX
+from file_utils.atomic import atomic_write
+
+Labels = Tuple[Tuple[str, str], ...]
+MetricKey = Tuple[str, Labels]
+
+METRIC_HELP = {
+    "pages_fetched_total": "Pages downloaded, by source (browser, http).",
+    "fetch_failures_total": "Page downloads that failed or were blocked, by source.",
+    "bytes_downloaded_total": "Bytes downloaded, by source.",
+    "entries_found_total": "Entries collected by all queries.",
+    "new_entries_total": "Collected listings not in the listing store yet.",
+    "listing_changes_total": "Known listings that changed, by change (price, "
+    "fields, delisted).",
+    "page_loads_saved_total": "Listing page loads saved by --plan-queries.",
+    "rate_limit_requests_per_second": "Current request rate limit, by host.",
+    "rate_limit_concurrency": "Current limit of requests in flight, by host.",
+    "rate_limit_backoffs_total": "Times the rate limiter backed off, by host.",
+    "page_cache_events_total": "Page cache hits, misses, revalidations, stores "
+    "and evictions, by event.",
+    "stage_duration_seconds": "Duration of the scraper stages, by stage.",
+    "run_duration_seconds": "Duration of the last run.",
+    "run_failed": "1 if the last run failed with an error, 0 if it finished.",
+    "last_run_timestamp_seconds": "Unix time the last run finished.",
+}
+
+
+class Histogram:
+    """
+    Latency histogram with cumulative `buckets` upper bounds, as in Prometheus.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = METRICS_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Records a single observation.
+        """
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        """
+        Adds the observations of `other`, which has the same buckets.
+        """
+        self.bucket_counts = [
+            own + theirs for own, theirs in zip(self.bucket_counts, other.bucket_counts)
+        ]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the `quantile` observation.
+        """
+        rank = quantile * self.count
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            if count >= rank:
+                return bound
+        return self.max
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms of a single run, keyed by metric name and
+    labels. Registries of worker processes are merged into the main one.
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[MetricKey, float] = {}
+        self.gauges: Dict[MetricKey, float] = {}
+        self.histograms: Dict[MetricKey, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Increases the counter `name` by `value`.
+        """
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels: str) -> float:
+        """
+        Returns the value of the counter `name`, 0 if it was never increased.
+        """
+        return self.counters.get((name, _labels(labels)), 0)
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """
+        Sets the gauge `name` to `value`.
+        """
+        self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Records `value` in the histogram `name`.
+        """
+        key = (name, _labels(labels))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        self.histograms[key].observe(value)
+
+    def record_fetch(self, source: str, status: Optional[int]) -> None:
+        """
+        Counts a page download from `source`, as a failure if it did not
+        complete (`status` None) or returned an error status.
+        """
+        self.inc("pages_fetched_total", source=source)
+        # Always exported, so alerts on the failure rate see a zero
+        failed = status is None or status >= 400
+        self.inc("fetch_failures_total", 1 if failed else 0, source=source)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """
+        Records the duration of the with block as `stage`, also when it raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                "stage_duration_seconds", time.perf_counter() - started, stage=stage
+            )
+
+    def merge(self, other: "MetricsRegistry") -> None:
+        """
+        Adds the counters and histograms of `other`, its gauges win.
+        """
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.gauges.update(other.gauges)
+        for key, histogram in other.histograms.items():
+            if key not in self.histograms:
+                self.histograms[key] = Histogram(histogram.buckets)
+            self.histograms[key].merge(histogram)
+
+    def reset(self) -> None:
+        """
+        Drops all collected metrics.
+        """
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+        typed_metrics: List[Tuple[str, Dict[MetricKey, Any]]] = [
+            ("counter", self.counters),
+            ("gauge", self.gauges),
+            ("histogram", self.histograms),
+        ]
+        for metric_type, metrics in typed_metrics:
+            for name in sorted({name for name, _ in metrics}):
+                full_name = f"{METRICS_PREFIX}_{name}"
+                lines.append(f"# HELP {full_name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+                for (metric_name, labels), value in sorted(metrics.items()):
+                    if metric_name != name:
+                        continue
+                    if isinstance(value, Histogram):
+                        lines.extend(self._histogram_lines(full_name, labels, value))
+                    else:
+                        lines.append(
+                            f"{full_name}{_format_labels(labels)} {value:.17g}"
+                        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _histogram_lines(
+        full_name: str, labels: Labels, histogram: Histogram
+    ) -> List[str]:
+        lines = [
+            f"{full_name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} "
+            f"{count}"
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts)
+        ]
+        lines.append(
+            f"{full_name}_bucket{_format_labels(labels + (('le', '+Inf'),))} "
+            f"{histogram.count}"
+        )
+        lines.append(f"{full_name}_sum{_format_labels(labels)} {histogram.sum:.17g}")
+        lines.append(f"{full_name}_count{_format_labels(labels)} {histogram.count}")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns a JSON serializable summary of the metrics.
+        """
+        return {
+            "counters": {
+                f"{name}{_format_labels(labels)}": value
+                for (name, labels), value in sorted(self.counters.items())
+            },
+            "gauges": {
+                f"{name}{_format_labels(labels)}": value
+                for (name, labels), value in sorted(self.gauges.items())
+            },
+            "histograms": {
+                f"{name}{_format_labels(labels)}": {
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "avg": round(histogram.sum / histogram.count, 6),
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "max": round(histogram.max, 6),
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            },
+        }
+
+    def write(self, textfile_path: str, json_path: str) -> None:
+        """
+        Writes the Prometheus textfile and the JSON summary.
+        """
+        # node-exporter may read the textfile at any time, so it is replaced at once
+        with atomic_write(textfile_path) as file:
+            file.write(self.to_prometheus())
+        with atomic_write(json_path) as file:
+            file.write(json.dumps(self.to_dict(), indent=4) + "\n")
+
+
+# Registry of the current process, filled by the instrumented stages
+METRICS = MetricsRegistry()
@@ -0,0 +1,84 @@
+"""
+This module contains tests for the run metrics.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from .metrics import MetricsRegistry
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test class for the run metrics registry.
+    """
+
+    def setUp(self) -> None:
+        self.metrics = MetricsRegistry()
+
+    def test_prometheus_textfile(self) -> None:
+        """
+        Test if counters and histograms are written in the exposition format.
+        """
+        self.metrics.record_fetch("http", 200)
+        self.metrics.record_fetch("http", None)
+        self.metrics.observe("stage_duration_seconds", 0.2, stage="navigation")
+        self.metrics.observe("stage_duration_seconds", 3.0, stage="navigation")
+        lines = self.metrics.to_prometheus().splitlines()
+        self.assertIn("# TYPE nepremicnine_scraper_pages_fetched_total counter", lines)
+        self.assertIn(
+            'nepremicnine_scraper_pages_fetched_total{source="http"} 2', lines
+        )
+        self.assertIn(
+            'nepremicnine_scraper_fetch_failures_total{source="http"} 1', lines
+        )
+        prefix = "nepremicnine_scraper_stage_duration_seconds"
+        self.assertIn(f'{prefix}_bucket{{stage="navigation",le="0.1"}} 0', lines)
+        self.assertIn(f'{prefix}_bucket{{stage="navigation",le="0.25"}} 1', lines)
+        self.assertIn(f'{prefix}_bucket{{stage="navigation",le="+Inf"}} 2', lines)
+        self.assertIn(f'{prefix}_count{{stage="navigation"}} 2', lines)
+
+    def test_timer_and_merge(self) -> None:
+        """
+        Test if timed stages are recorded and worker registries are added up.
+        """
+        with self.assertRaises(ValueError), self.metrics.timer("extraction"):
+            raise ValueError("failed stage")
+        worker = MetricsRegistry()
+        worker.observe("stage_duration_seconds", 0.5, stage="extraction")
+        worker.inc("new_entries_total", 4)
+        self.metrics.merge(worker)
+        summary = self.metrics.to_dict()
+        self.assertEqual(
+            summary["histograms"]['stage_duration_seconds{stage="extraction"}'][
+                "count"
+            ],
+            2,
+        )
+        self.assertEqual(summary["counters"]["new_entries_total"], 4)
+
+    def test_write(self) -> None:
+        """
+        Test if the textfile and the JSON summary are written.
+        """
+        self.metrics.set("run_duration_seconds", 12.5)
+        with tempfile.TemporaryDirectory() as directory:
+            textfile = os.path.join(directory, "scraper.prom")
+            json_file = os.path.join(directory, "metrics.json")
+            self.metrics.write(textfile, json_file)
+            with open(textfile, "r", encoding="UTF8") as file:
+                self.assertIn(
+                    "nepremicnine_scraper_run_duration_seconds 12.5", file.read()
+                )
+            with open(json_file, "r", encoding="UTF8") as file:
+                self.assertEqual(
+                    json.load(file)["gauges"]["run_duration_seconds"], 12.5
+                )
+            self.assertEqual(
+                sorted(os.listdir(directory)), ["metrics.json", "scraper.prom"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Module for profiling a whole run with cProfile and a stack sampler.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Iterator, List, Optional
+
+from constants.constants import (
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+    PROFILE_STACKS_FILE,
+    PROFILE_STATS_FILE,
+)
+from logger.logger import setup_logger
+
+logger = setup_logger("profiler")
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """
+    Samples the stack of the thread that started it every `interval` seconds
+    from a background thread, and counts the collapsed stacks. The result
+    can be rendered by flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._target_thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Starts sampling the current thread.
+        """
+        self._target_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops sampling.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self._target_thread_id or 0
+            )
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Writes the sampled stacks in the collapsed ("a;b;c count") format.
+        """
+        with open(path, "w", encoding="UTF8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_run(directory: str, top: int = 25) -> Iterator[None]:
+    """
+    Profiles the with block with cProfile and a StackSampler, writes the
+    pstats and collapsed stack files to `directory` and logs the `top`
+    functions by cumulative time.
+    """
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        stats_path = os.path.join(directory, PROFILE_STATS_FILE)
+        profiler.dump_stats(stats_path)
+        sampler.write_collapsed(os.path.join(directory, PROFILE_STACKS_FILE))
+
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+        logger.info("Profile written to %s:\n%s", directory, report.getvalue())
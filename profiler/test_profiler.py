@@ -0,0 +1,102 @@
+"""
+This module contains tests for the profiling mode.
+"""
+
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from typing import Any, Optional
+from browser.tracing import SlowPageTraces
+from constants.constants import PROFILE_STACKS_FILE, PROFILE_STATS_FILE
+from .profiler import profile_run
+
+
+def busy_loop(seconds: float) -> int:
+    """
+    Keeps the CPU busy for `seconds`.
+    """
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class FakeTracing:
+    """
+    Stand-in for the tracing of a Playwright browser context, writes the trace
+    file it is asked for.
+    """
+
+    def start(self, **_: Any) -> None:
+        """
+        Starts tracing.
+        """
+
+    def stop(self, path: Optional[str] = None) -> None:
+        """
+        Stops tracing and writes the trace to `path`, if given.
+        """
+        if path is not None:
+            with open(path, "wb") as file:
+                file.write(b"trace")
+
+
+class FakeContext:  # pylint: disable=too-few-public-methods
+    """
+    Stand-in for a Playwright browser context.
+    """
+
+    def __init__(self) -> None:
+        self.tracing = FakeTracing()
+
+
+class TestProfiler(unittest.TestCase):
+    """
+    Test class for the profiling mode.
+    """
+
+    def test_profile_run_writes_stats_and_stacks(self) -> None:
+        """
+        Test if the profiled block shows up in the pstats and collapsed stacks.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with profile_run(directory):
+                busy_loop(0.2)
+            stats = pstats.Stats(os.path.join(directory, PROFILE_STATS_FILE))
+            profiled = {name for _, _, name in stats.stats}  # type: ignore[attr-defined]
+            self.assertIn("busy_loop", profiled)
+            with open(
+                os.path.join(directory, PROFILE_STACKS_FILE), encoding="UTF8"
+            ) as file:
+                lines = file.read().splitlines()
+            self.assertTrue(lines)
+            self.assertTrue(
+                any("busy_loop (test_profiler.py" in line for line in lines)
+            )
+            for line in lines:
+                _, count = line.rsplit(" ", 1)
+                self.assertGreater(int(count), 0)
+
+    def test_only_slowest_traces_are_kept(self) -> None:
+        """
+        Test if only the traces of the slowest pages are kept on disk.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            traces = SlowPageTraces(directory, keep=2)
+            for index, seconds in enumerate([0.5, 2.0, 0.1, 3.0, 1.0]):
+                context: Any = FakeContext()
+                traces.start(context)
+                traces.stop(context, f"https://example.com/oglas_{index}/", seconds)
+            self.assertEqual([2.0, 3.0], sorted(seconds for seconds, _ in traces.kept))
+            files = sorted(os.listdir(directory))
+            self.assertEqual(2, len(files))
+            self.assertTrue(files[0].startswith("trace_0002000ms_"))
+            self.assertTrue(files[1].startswith("trace_0003000ms_"))
+            self.assertTrue(files[1].endswith("_oglas_3.zip"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Module for recording the responses of a run, so the run can be replayed offline.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Mapping, NamedTuple, Optional
+
+from fetcher.cache import canonical_url
+from file_utils.atomic import atomic_write
+from logger.logger import setup_logger
+
+logger = setup_logger("replay")
+
+
+class RecordedResponse(NamedTuple):
+    """
+    A single recorded response of the site.
+    """
+
+    url: str
+    status: int
+    content_type: str
+    body: str
+
+
+class ResponseArchive:
+    """
+    Directory of recorded responses, one JSON file per canonical URL. The
+    archive is written by a --record run and served by a --replay run, which
+    also keeps its store, cookie consent and email in the directory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(canonical_url(url).encode()).hexdigest()
+        return os.path.join(self.directory, f"{key}.json")
+
+    def record(
+        self, url: str, status: int, headers: Mapping[str, str], body: str
+    ) -> None:
+        """
+        Stores the response of `url`, replacing an earlier recording.
+        """
+        lower_headers = {name.lower(): value for name, value in headers.items()}
+        response = RecordedResponse(
+            url, status, lower_headers.get("content-type", "text/html"), body
+        )
+        path = self._path(url)
+        with atomic_write(path) as file:
+            json.dump(response._asdict(), file, ensure_ascii=False)
+        logger.debug("Recorded %s (status %d).", url, status)
+
+    def lookup(self, url: str) -> Optional[RecordedResponse]:
+        """
+        Returns the recorded response of `url`, or None if it was not recorded.
+        """
+        try:
+            with open(self._path(url), "r", encoding="UTF8") as file:
+                return RecordedResponse(**json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def snapshot(self, file_path: str) -> None:
+        """
+        Copies `file_path` (e.g. the config.yaml file) into the archive,
+        so a replay starts from the same state as the recorded run.
+        """
+        if os.path.exists(file_path):
+            shutil.copyfile(
+                file_path, os.path.join(self.directory, os.path.basename(file_path))
+            )
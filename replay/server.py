@@ -0,0 +1,91 @@
+"""
+Module for serving a recorded ResponseArchive from a local stand-in server.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import BaseRequestHandler
+from typing import Any, Callable, Iterator
+
+from constants.constants import SITE_URL, SITE_URL_ENV
+from logger.logger import setup_logger
+from replay.archive import ResponseArchive
+
+logger = setup_logger("replay")
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with the recorded response of the same path on the site,
+    or with a 404 if that page was not recorded.
+    """
+
+    archive: ResponseArchive
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Serves the recorded response of the requested path.
+        """
+        recorded = self.archive.lookup(f"{SITE_URL}{self.path}")
+        if recorded is None:
+            logger.warning("No recorded response for %s.", self.path)
+            self.send_error(404, "Not recorded")
+            return
+        body = recorded.body.encode("UTF8")
+        media_type = recorded.content_type.split(";", 1)[0]
+        self.send_response(recorded.status)
+        self.send_header("Content-Type", f"{media_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=W0622
+        pass
+
+
+@contextmanager
+def serve_local(handler: Callable[..., BaseRequestHandler]) -> Iterator[str]:
+    """
+    Runs a server with `handler` on a free local port and yields the base URL.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def serve_archive(archive: ResponseArchive) -> Iterator[str]:
+    """
+    Serves `archive` on a free local port and yields the base URL.
+    """
+    handler = type("ArchiveHandler", (ReplayHandler,), {"archive": archive})
+    with serve_local(handler) as base_url:
+        yield base_url
+
+
+@contextmanager
+def replay_site(archive: ResponseArchive) -> Iterator[str]:
+    """
+    Serves `archive` and points all site requests of this process, and of the
+    worker processes it starts, at it. Yields the base URL of the server.
+    """
+    previous = os.environ.get(SITE_URL_ENV)
+    with serve_archive(archive) as base_url:
+        os.environ[SITE_URL_ENV] = base_url
+        logger.info(
+            "Replaying the responses in %s from %s.", archive.directory, base_url
+        )
+        try:
+            yield base_url
+        finally:
+            if previous is None:
+                del os.environ[SITE_URL_ENV]
+            else:
+                os.environ[SITE_URL_ENV] = previous
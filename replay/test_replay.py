@@ -0,0 +1,107 @@
+"""
+This module contains tests for recording and replaying the responses of a run.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from benchmarks.fixture_server import serve_directory
+from constants.constants import REPLAY_EMAIL_FILE, SITE_URL, SITE_URL_ENV
+from constants.objects import EntryDiff
+from extractor.corpus import FIXTURES_DIR, read_fixture
+from extractor.parsing import extract_links
+from fetcher.http_fetcher import HttpFetcher
+from fetcher.rate_limiter import RateLimiter
+from mail_utils.email_generator import create_email_body
+from scraper import replay_settings, run_engine, write_replay_email
+from url.url import URL, request_url
+from .archive import ResponseArchive
+from .server import replay_site
+
+LISTING_PAGE = "listing_ljubljana_mesto.html"
+
+
+class TestReplay(unittest.TestCase):
+    """
+    Test class for the response archive and the replay server.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.archive = ResponseArchive(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_request_url(self) -> None:
+        """
+        Test if only site URLs are pointed at the stand-in server.
+        """
+        with mock.patch.dict(os.environ, {SITE_URL_ENV: "http://127.0.0.1:8000/"}):
+            self.assertEqual(
+                request_url(f"{SITE_URL}/oglasi-prodaja/?s=1"),
+                "http://127.0.0.1:8000/oglasi-prodaja/?s=1",
+            )
+            self.assertEqual(
+                request_url("https://example.com/a"), "https://example.com/a"
+            )
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertEqual(request_url(f"{SITE_URL}/a"), f"{SITE_URL}/a")
+
+    def test_record_and_replay(self) -> None:
+        """
+        Test if a recorded response is replayed, and unrecorded pages are not.
+        """
+        url = f"{SITE_URL}/{LISTING_PAGE}"
+        with serve_directory(FIXTURES_DIR) as base_url, mock.patch.dict(
+            os.environ, {SITE_URL_ENV: base_url}
+        ), HttpFetcher(rate_limiter=RateLimiter(0, 0), archive=self.archive) as fetcher:
+            recorded = fetcher.fetch(url)
+        self.assertIsNotNone(recorded)
+
+        with replay_site(self.archive), HttpFetcher(
+            rate_limiter=RateLimiter(0, 0)
+        ) as fetcher:
+            self.assertEqual(fetcher.fetch(url), recorded)
+            self.assertIsNone(fetcher.fetch(f"{SITE_URL}/not-recorded/"))
+        self.assertNotIn(SITE_URL_ENV, os.environ)
+
+    def test_replayed_pipeline(self) -> None:
+        """
+        Test if a whole run is replayed from the archive without network.
+        """
+        url = URL("prodaja", "ljubljana-mesto", "stanovanje")
+        listing = read_fixture(LISTING_PAGE)
+        self.archive.record(str(url), 200, {}, listing)
+        for link in extract_links(listing):
+            listing_id = link.rstrip("/").rsplit("_", 1)[1]
+            self.archive.record(
+                link, 200, {}, read_fixture(f"detail_{listing_id}.html")
+            )
+
+        settings = replay_settings({})
+        with replay_site(self.archive):
+            results = run_engine({"query": url}, settings, "sync", "http")
+
+        expected_entries = json.loads(read_fixture("expected_entries.json"))
+        entries = sorted(results["query"].entries, key=lambda entry: entry.link)
+        self.assertEqual(len(entries), 3)
+        for entry in entries:
+            listing_id = entry.link.rstrip("/").rsplit("_", 1)[1]
+            expected = expected_entries[f"detail_{listing_id}.html"]
+            self.assertEqual(entry.price, expected["price"])
+            self.assertEqual(entry.origin_url, str(url))
+        email_path = os.path.join(self.directory.name, REPLAY_EMAIL_FILE)
+        write_replay_email(
+            create_email_body(EntryDiff(entries, [], [], [])), email_path
+        )
+        with open(email_path, "r", encoding="UTF8") as file:
+            html = file.read()
+        self.assertIn(entries[0].link, html)
+        self.assertIn(entries[0].location, html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""
+Module for checkpointing a run, so an interrupted run can be resumed.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, NamedTuple, Tuple
+
+from constants.objects import ExtractedEntry
+from logger.logger import setup_logger
+from runner.dedup import QueryResult, QueryResults
+from url.url import URL
+
+logger = setup_logger("checkpoint")
+
+
+class ResumedRun(NamedTuple):
+    """
+    What an interrupted run finished: the results of its finished queries
+    (with the URL they ran on) and every entry it fetched, by link.
+    """
+
+    queries: QueryResults
+    query_urls: Dict[str, str]
+    entries: Dict[str, ExtractedEntry]
+
+
+class RunCheckpoint:
+    """
+    Checkpoint of the current run in the JSON lines file at `path`. Every
+    fetched entry and every finished query is appended as one record with a
+    single write, so records of several worker processes do not interleave
+    and a crash loses at most the line being written. Only the path is kept,
+    so the checkpoint can be passed to the worker processes of --processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _append(self, records: Iterable[Dict[str, Any]]) -> None:
+        data = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        ).encode("UTF8")
+        descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, data)
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def record_entry(self, entry: ExtractedEntry) -> None:
+        """
+        Records a fetched entry.
+        """
+        self._append([{"entry": entry.to_dict()}])
+
+    def record_query(self, query_name: str, url: str, result: QueryResult) -> None:
+        """
+        Records that the query `query_name` on `url` finished with `result`.
+        """
+        self._append(
+            [
+                {
+                    "query": query_name,
+                    "url": url,
+                    "entries": [entry.to_dict() for entry in result.entries],
+                    "failed_links": sorted(result.failed_links),
+                    "links": result.links,
+                }
+            ]
+        )
+
+    def load(self) -> ResumedRun:
+        """
+        Reads what the interrupted run finished. A line cut short by a crash
+        while appending is skipped.
+        """
+        resumed = ResumedRun({}, {}, {})
+        if not os.path.exists(self.path):
+            return resumed
+        with open(self.path, "r", encoding="UTF8") as file:
+            for number, line in enumerate(file, start=1):
+                try:
+                    record = json.loads(line)
+                    if "query" in record:
+                        entries = [
+                            ExtractedEntry.from_dict(item) for item in record["entries"]
+                        ]
+                        resumed.queries[record["query"]] = QueryResult(
+                            entries,
+                            frozenset(record.get("failed_links", ())),
+                            record.get("links", len(entries)),
+                        )
+                        resumed.query_urls[record["query"]] = record["url"]
+                        resumed.entries.update((entry.link, entry) for entry in entries)
+                    else:
+                        entry = ExtractedEntry.from_dict(record["entry"])
+                        resumed.entries[entry.link] = entry
+                except (ValueError, TypeError, KeyError):
+                    logger.warning(
+                        "Skipping the unreadable line %d of %s.", number, self.path
+                    )
+        logger.info(
+            "Resuming %d finished queries and %d fetched entries from %s.",
+            len(resumed.queries),
+            len(resumed.entries),
+            self.path,
+        )
+        return resumed
+
+    def clear(self) -> None:
+        """
+        Removes the checkpoint, once the results of the run are stored or
+        before a new run starts.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def split_finished_queries(
+    resumed: ResumedRun, queries: Dict[str, URL]
+) -> Tuple[Dict[str, URL], QueryResults]:
+    """
+    Splits `queries` into the ones still to run and the results of the ones
+    the `resumed` run finished. A query whose URL changed since is run again.
+    """
+    finished = {
+        query_name: result
+        for query_name, result in resumed.queries.items()
+        if query_name in queries
+        and resumed.query_urls[query_name] == str(queries[query_name])
+    }
+    logger.info(
+        "Skipping the finished queries %s, serving %d entries fetched by the "
+        "interrupted run.",
+        list(finished),
+        len(resumed.entries),
+    )
+    remaining = {
+        query_name: url
+        for query_name, url in queries.items()
+        if query_name not in finished
+    }
+    return remaining, finished
@@ -0,0 +1,67 @@
+"""
+Module for fetching every listing once, even when several queries matched it.
+"""
+
+from typing import Collection, Dict, FrozenSet, Iterable, List, NamedTuple, Set
+
+from constants.objects import ExtractedEntry
+from logger.logger import setup_logger
+
+logger = setup_logger("dedup")
+
+
+class QueryResult(NamedTuple):
+    """
+    What a query found: the `entries` of its listings, the `failed_links`
+    whose detail page could not be fetched, which have no entry, and the
+    number of `links` on the listing page it was loaded from. Only that first
+    page is read, so a full one may have left out listings.
+    """
+
+    entries: List[ExtractedEntry]
+    failed_links: FrozenSet[str] = frozenset()
+    links: int = 0
+
+
+QueryResults = Dict[str, QueryResult]
+
+
+def merge_links(links_by_query: Dict[str, Set[str]]) -> Set[str]:
+    """
+    Returns the unique links found by all queries.
+    """
+    unique_links: Set[str] = set().union(*links_by_query.values())
+    total_links = sum(len(links) for links in links_by_query.values())
+    logger.info(
+        "Found %d links across %d queries, %d of them unique.",
+        total_links,
+        len(links_by_query),
+        len(unique_links),
+    )
+    return unique_links
+
+
+def fan_out(
+    links_by_query: Dict[str, Set[str]],
+    origin_urls: Dict[str, str],
+    entries: Iterable[ExtractedEntry],
+    failed_links: Collection[str] = (),
+) -> QueryResults:
+    """
+    Assigns the fetched entries back to every query that matched their link,
+    attributed to that query's origin URL, and the `failed_links` to every
+    query that matched them.
+    """
+    entries_by_link = {entry.link: entry for entry in entries}
+    return {
+        query_name: QueryResult(
+            [
+                entries_by_link[link].with_origin_url(origin_urls[query_name])
+                for link in links
+                if link in entries_by_link
+            ],
+            frozenset(link for link in links if link in failed_links),
+            len(links),
+        )
+        for query_name, links in links_by_query.items()
+    }
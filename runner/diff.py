@@ -0,0 +1,110 @@
+"""
+Module for comparing the listings of a run with the stored ones, by listing.
+"""
+
+from typing import Any, Dict, Iterable, List, Union
+
+from constants.objects import EntryChange, EntryDiff, ExtractedEntry
+from extractor.parsing import listing_id
+from logger.logger import setup_logger
+
+logger = setup_logger("diff")
+
+# Fields whose change is reported, besides the price. The query a listing is
+# attributed to (origin_url) and the derived price per m2 are not compared.
+COMPARED_FIELDS = ("location", "square_footage", "built_year", "author")
+
+ListingKey = Union[int, str]
+
+
+def listing_key(link: str) -> ListingKey:
+    """
+    Returns the key a listing is matched by across runs: the listing id from
+    its link, or the link itself if it has no id.
+    """
+    key = listing_id(link)
+    return link if key is None else key
+
+
+def index_by_listing(
+    entries: Iterable[ExtractedEntry],
+) -> Dict[ListingKey, ExtractedEntry]:
+    """
+    Builds the listing key -> entry map of `entries`, one entry per listing
+    even if several queries found it: the one of the first origin URL, so the
+    choice does not depend on the order of `entries`.
+    """
+    index: Dict[ListingKey, ExtractedEntry] = {}
+    for entry in sorted(entries, key=lambda entry: (entry.origin_url, entry.link)):
+        index.setdefault(listing_key(entry.link), entry)
+    return index
+
+
+def _changed(old: Any, new: Any) -> bool:
+    # A size or price the extraction did not find (-1.0) is not a change
+    if isinstance(old, float) and isinstance(new, float) and min(old, new) < 0:
+        return False
+    return bool(old != new)
+
+
+def _sorted(entries: Iterable[ExtractedEntry]) -> List[ExtractedEntry]:
+    return sorted(entries, key=lambda entry: entry.link)
+
+
+# pylint: disable=too-many-locals
+def diff_entries(
+    stored: Iterable[ExtractedEntry],
+    collected: Iterable[ExtractedEntry],
+    origin_urls: Iterable[str],
+    kept: Iterable[ExtractedEntry] = (),
+) -> EntryDiff:
+    """
+    Classifies the `collected` listings against the `stored` ones as new,
+    price changed or otherwise changed, and the stored listings of the queries
+    at `origin_urls` that were not collected again as delisted. Stored
+    listings of other queries (e.g. removed from the config) are ignored, as
+    is a price or size missing from either side. The `kept` stored entries,
+    of queries or detail pages that failed, are neither compared nor delisted.
+    """
+    stored = list(stored)
+    stored_by_key = index_by_listing(stored)
+    # A listing is compared with what the same query stored, if it did
+    stored_by_origin = {(entry.link, entry.origin_url): entry for entry in stored}
+    collected_by_key = index_by_listing(collected)
+    new: List[ExtractedEntry] = []
+    price_changed: List[EntryChange] = []
+    field_changed: List[EntryChange] = []
+    for key, entry in collected_by_key.items():
+        old = stored_by_origin.get(
+            (entry.link, entry.origin_url), stored_by_key.get(key)
+        )
+        if old is None:
+            new.append(entry)
+            continue
+        fields = tuple(
+            name
+            for name in COMPARED_FIELDS
+            if _changed(getattr(old, name), getattr(entry, name))
+        )
+        if _changed(old.price, entry.price):
+            price_changed.append(EntryChange(old, entry, ("price",) + fields))
+        elif fields:
+            field_changed.append(EntryChange(old, entry, fields))
+
+    queried = set(origin_urls)
+    kept_keys = {listing_key(entry.link) for entry in kept}
+    delisted = {
+        key: entry
+        for entry in stored
+        if entry.origin_url in queried
+        and (key := listing_key(entry.link)) not in collected_by_key
+        and key not in kept_keys
+    }
+    diff = EntryDiff(
+        new=_sorted(new),
+        price_changed=sorted(price_changed, key=lambda change: change.new.link),
+        field_changed=sorted(field_changed, key=lambda change: change.new.link),
+        delisted=_sorted(delisted.values()),
+    )
+    logger.info("Compared with the store: %s.", diff.summary())
+    return diff
@@ -0,0 +1,104 @@
+"""
+Module for serving already known listings from the store instead of fetching them.
+"""
+
+import random
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
+
+from constants.objects import ExtractedEntry
+from extractor.card_extractor import CardFields, entry_from_card
+from logger.logger import setup_logger
+
+logger = setup_logger("incremental")
+
+
+def index_by_link(entries: Iterable[ExtractedEntry]) -> Dict[str, ExtractedEntry]:
+    """
+    Builds the link -> entry map of the known entries.
+    """
+    return {entry.link: entry for entry in entries}
+
+
+def split_known_links(
+    links: Iterable[str],
+    known_entries: Dict[str, ExtractedEntry],
+    origin_url: str,
+    revalidate_percent: int = 0,
+    fresh_links: Container[str] = (),
+) -> Tuple[List[ExtractedEntry], Set[str]]:
+    """
+    Splits `links` into entries served from `known_entries` (attributed to
+    `origin_url`) and links that still have to be fetched. A random
+    `revalidate_percent` of the known links is fetched again anyway, except
+    for the `fresh_links` this run fetched already.
+    """
+    served: List[ExtractedEntry] = []
+    to_fetch: Set[str] = set()
+    for link in links:
+        known = known_entries.get(link)
+        if known is None or (
+            link not in fresh_links and random.randrange(100) < revalidate_percent
+        ):
+            to_fetch.add(link)
+        else:
+            served.append(known.with_origin_url(origin_url))
+    return served, to_fetch
+
+
+def split_card_links(
+    links: Iterable[str],
+    cards: Dict[str, CardFields],
+    known_entries: Dict[str, ExtractedEntry],
+    origin_url: str,
+) -> Tuple[List[ExtractedEntry], Set[str]]:
+    """
+    Splits `links` into known entries refreshed from their search result card
+    and links whose detail page still has to be opened: new listings and
+    listings whose card is missing or incomplete.
+    """
+    served: List[ExtractedEntry] = []
+    to_fetch: Set[str] = set()
+    for link in links:
+        known = known_entries.get(link)
+        card = cards.get(link)
+        entry = (
+            entry_from_card(card, known, origin_url)
+            if known is not None and card is not None
+            else None
+        )
+        if entry is None:
+            to_fetch.add(link)
+        else:
+            served.append(entry)
+    return served, to_fetch
+
+
+# pylint: disable=too-many-arguments
+def serve_links(
+    links: Iterable[str],
+    known_entries: Dict[str, ExtractedEntry],
+    origin_url: str,
+    revalidate_percent: int = 0,
+    cards: Optional[Dict[str, CardFields]] = None,
+    fresh_links: Container[str] = (),
+) -> Tuple[List[ExtractedEntry], Set[str]]:
+    """
+    Splits `links` into entries served without opening their detail page,
+    from their search result card (if `cards` are collected) or from
+    `known_entries`, and links that still have to be fetched. The
+    `fresh_links` are never revalidated.
+    """
+    from_cards: List[ExtractedEntry] = []
+    if cards is not None:
+        from_cards, links = split_card_links(links, cards, known_entries, origin_url)
+    known, to_fetch = split_known_links(
+        links, known_entries, origin_url, revalidate_percent, fresh_links
+    )
+    logger.info(
+        "Serving %d entries from search result cards and %d known entries "
+        "from the store, fetching %d links.",
+        len(from_cards),
+        len(known),
+        len(to_fetch),
+    )
+    return from_cards + known, to_fetch
@@ -0,0 +1,39 @@
+"""
+Module for the options of a run that both scraping engines pass down to their
+scrapers.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional
+
+from browser.tracing import SlowPageTraces
+from constants.objects import ExtractedEntry
+from fetcher.cache import PageCache
+from replay.archive import ResponseArchive
+from runner.checkpoint import RunCheckpoint
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass(frozen=True)
+class ScrapeOptions:
+    """
+    Options of a run shared by every query. Links found in `known_entries`
+    are served from there instead of being fetched, except for a random
+    `revalidate_percent` of them that are not in `fresh_links` (fetched by
+    this run already, e.g. before it was interrupted). With `use_cards` their
+    price and size are refreshed from the search result cards. The cookie
+    consent is kept in `consent_path` for later runs. Pages found fresh in
+    `cache` are not downloaded again. Responses are recorded in `archive`, the
+    Playwright traces of the slowest pages are kept by `traces` and every
+    fetched entry and finished query is recorded in `checkpoint`.
+    """
+
+    known_entries: Optional[Dict[str, ExtractedEntry]] = None
+    revalidate_percent: int = 0
+    fresh_links: FrozenSet[str] = frozenset()
+    use_cards: bool = False
+    consent_path: Optional[str] = None
+    cache: Optional[PageCache] = None
+    archive: Optional[ResponseArchive] = None
+    traces: Optional[SlowPageTraces] = None
+    checkpoint: Optional[RunCheckpoint] = None
@@ -0,0 +1,249 @@
+"""
+Module for planning the listing page loads of the config queries: queries of
+the same kind and region whose ranges can be covered by one broader query are
+fetched once and their results are assigned back by local filtering.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from constants.objects import ExtractedEntry
+from logger.logger import setup_logger
+from runner.dedup import QueryResult, QueryResults
+from url.url import URL
+
+logger = setup_logger("planner")
+
+# (from, to) attributes of the URL ranges a query filters on, None is open
+RANGE_ATTRIBUTES = (
+    ("size_from", "size_to"),
+    ("year_from", "year_to"),
+    ("price_from", "price_to"),
+    ("price_from_m2", "price_to_m2"),
+)
+
+Range = Tuple[Optional[int], Optional[int]]
+Ranges = Tuple[Range, ...]
+
+
+def _ranges(url: URL) -> Ranges:
+    return tuple(
+        (getattr(url, start), getattr(url, end)) for start, end in RANGE_ATTRIBUTES
+    )
+
+
+def _group_key(url: URL) -> Tuple[str, str, str, Tuple[str, ...]]:
+    return (
+        url.type_of_offer,
+        url.region,
+        url.type_of_property,
+        tuple(url.sub_regions or ()),
+    )
+
+
+def _contains(outer: Range, inner: Range) -> bool:
+    low_ok = outer[0] is None or (inner[0] is not None and outer[0] <= inner[0])
+    high_ok = outer[1] is None or (inner[1] is not None and outer[1] >= inner[1])
+    return low_ok and high_ok
+
+
+def _overlaps(first: Range, second: Range) -> bool:
+    return (first[0] is None or second[1] is None or first[0] <= second[1]) and (
+        second[0] is None or first[1] is None or second[0] <= first[1]
+    )
+
+
+def _hull(first: Range, second: Range) -> Range:
+    low = None if first[0] is None or second[0] is None else min(first[0], second[0])
+    high = None if first[1] is None or second[1] is None else max(first[1], second[1])
+    return low, high
+
+
+def covers_exactly(first: Ranges, second: Ranges) -> bool:
+    """
+    Returns True if the smallest query covering both ranges matches only
+    listings of either of them: one contains the other, or they differ in a
+    single range and overlap in it. Any other cover would fetch the detail
+    pages of listings no query asked for.
+    """
+    if all(map(_contains, first, second)) or all(map(_contains, second, first)):
+        return True
+    differing = [pair for pair in zip(first, second) if pair[0] != pair[1]]
+    return len(differing) == 1 and _overlaps(*differing[0])
+
+
+def covering_url(url: URL, ranges: Ranges) -> URL:
+    """
+    Returns the query of the same kind and region as `url` with `ranges`.
+    """
+    bounds = {
+        attribute: value
+        for attributes, values in zip(RANGE_ATTRIBUTES, ranges)
+        for attribute, value in zip(attributes, values)
+    }
+    return URL(
+        url.type_of_offer,
+        url.region,
+        url.type_of_property,
+        sub_regions=url.sub_regions,
+        **bounds,
+    )
+
+
+def matches(url: URL, entry: ExtractedEntry) -> bool:
+    """
+    Returns True if `entry` falls into the ranges of the query at `url`, both
+    ends included. An entry without the value a range filters on does not,
+    a size or price the extraction did not find (-1.0) counts as missing.
+    """
+    square_footage = entry.square_footage if entry.square_footage > 0 else None
+    price = entry.price if entry.price >= 0 else None
+    values = (
+        square_footage,
+        entry.built_year,
+        price,
+        price / square_footage if price is not None and square_footage else None,
+    )
+    for (low, high), value in zip(_ranges(url), values):
+        if low is None and high is None:
+            continue
+        if value is None:
+            return False
+        if (low is not None and value < low) or (high is not None and value > high):
+            return False
+    return True
+
+
+class QueryPlan(NamedTuple):
+    """
+    Listing page loads of the config `queries`: every fetch in `fetches` is
+    loaded once and covers the queries listed for it in `members`.
+    """
+
+    queries: Dict[str, URL]
+    fetches: Dict[str, URL]
+    members: Dict[str, List[str]]
+
+    def saved_page_loads(self) -> int:
+        """
+        Returns the number of listing page loads the plan saves.
+        """
+        return len(self.queries) - len(self.fetches)
+
+    def summary(self) -> str:
+        """
+        Returns the report of the plan: the merged fetches and what they saved.
+        """
+        lines = [
+            f"Query plan: {len(self.fetches)} listing page loads for "
+            f"{len(self.queries)} queries, saving {self.saved_page_loads()}."
+        ]
+        for fetch_name, query_names in self.members.items():
+            if len(query_names) > 1:
+                lines.append(
+                    f"  [{fetch_name}] on {self.fetches[fetch_name]} covers "
+                    f"{', '.join(query_names)}"
+                )
+        return "\n".join(lines)
+
+
+def _merge_pair(clusters: List[List[str]], cluster_ranges: List[Ranges]) -> bool:
+    # Merges the first two clusters covered exactly by their hull, if any
+    for first, first_ranges in enumerate(cluster_ranges):
+        for second in range(first + 1, len(clusters)):
+            if covers_exactly(first_ranges, cluster_ranges[second]):
+                clusters[first].extend(clusters.pop(second))
+                cluster_ranges[first] = tuple(
+                    map(_hull, first_ranges, cluster_ranges.pop(second))
+                )
+                return True
+    return False
+
+
+def plan_queries(queries: Dict[str, URL]) -> QueryPlan:
+    """
+    Merges the queries of the same kind, region and subregion that can be
+    covered exactly by one broader query (see covers_exactly), until no two
+    fetches can be merged. Queries that are not merged are fetched as they are.
+    """
+    groups: Dict[Tuple[str, str, str, Tuple[str, ...]], List[List[str]]] = {}
+    ranges: Dict[str, Ranges] = {}
+    for query_name, url in queries.items():
+        clusters = groups.setdefault(_group_key(url), [])
+        clusters.append([query_name])
+        ranges[query_name] = _ranges(url)
+
+    fetches: Dict[str, URL] = {}
+    members: Dict[str, List[str]] = {}
+    for clusters in groups.values():
+        cluster_ranges = [ranges[cluster[0]] for cluster in clusters]
+        while _merge_pair(clusters, cluster_ranges):
+            pass
+        for cluster, hull in zip(clusters, cluster_ranges):
+            if len(cluster) == 1:
+                fetches[cluster[0]] = queries[cluster[0]]
+            else:
+                fetches["+".join(cluster)] = covering_url(queries[cluster[0]], hull)
+            members["+".join(cluster)] = cluster
+    return QueryPlan(queries, fetches, members)
+
+
+def split_full_fetches(
+    plan: QueryPlan, results: QueryResults, page_size: int
+) -> QueryPlan:
+    """
+    Returns the `plan` with every merged fetch whose listing page was full
+    (had `page_size` links, fetched or not) replaced by the queries it covers.
+    Only the first page of results is read, so the broader query may have left
+    out listings of its queries, which would then be reported as delisted.
+    """
+    fetches: Dict[str, URL] = {}
+    members: Dict[str, List[str]] = {}
+    for fetch_name, query_names in plan.members.items():
+        result = results.get(fetch_name)
+        if len(query_names) > 1 and result is not None and result.links >= page_size:
+            logger.warning(
+                "The listing page of [%s] is full, loading %s on their own.",
+                fetch_name,
+                ", ".join(query_names),
+            )
+            for query_name in query_names:
+                fetches[query_name] = plan.queries[query_name]
+                members[query_name] = [query_name]
+        else:
+            fetches[fetch_name] = plan.fetches[fetch_name]
+            members[fetch_name] = query_names
+    return QueryPlan(plan.queries, fetches, members)
+
+
+def assign_results(plan: QueryPlan, results: QueryResults) -> QueryResults:
+    """
+    Assigns the entries of every fetch of the `plan` back to the queries it
+    covers, filtered by their ranges and attributed to their URL, in config
+    order. The links of the fetch that failed have no entry to filter by, so
+    every query it covers gets them, as well as the number of links on its
+    listing page. Queries of a fetch that failed are left out of the result.
+    """
+    assigned: QueryResults = {}
+    for fetch_name, query_names in plan.members.items():
+        if fetch_name not in results:
+            continue
+        result = results[fetch_name]
+        for query_name in query_names:
+            url = plan.queries[query_name]
+            assigned[query_name] = QueryResult(
+                [
+                    entry.with_origin_url(str(url))
+                    for entry in result.entries
+                    if len(query_names) == 1 or matches(url, entry)
+                ],
+                result.failed_links,
+                result.links,
+            )
+        if len(query_names) > 1:
+            logger.info(
+                "Assigned the %d entries of [%s] to %s.",
+                len(result.entries),
+                fetch_name,
+                {name: len(assigned[name].entries) for name in query_names},
+            )
+    return {name: assigned[name] for name in plan.queries if name in assigned}
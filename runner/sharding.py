@@ -0,0 +1,88 @@
+"""
+Module for running the config queries in several worker processes.
+"""
+
+import multiprocessing
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Callable, Dict, List, Tuple
+
+from logger.logger import setup_logger
+from metrics.metrics import METRICS
+from runner.dedup import QueryResults
+from url.url import URL
+
+logger = setup_logger("sharding")
+
+ShardWorker = Callable[[Dict[str, URL]], QueryResults]
+
+
+def shard_queries(queries: Dict[str, URL], shards: int) -> List[Dict[str, URL]]:
+    """
+    Splits the queries round-robin (in config order) into at most `shards` shards.
+    """
+    shard_count = max(1, min(shards, len(queries)))
+    result: List[Dict[str, URL]] = [{} for _ in range(shard_count)]
+    for index, (query_name, url) in enumerate(queries.items()):
+        result[index % shard_count][query_name] = url
+    return result
+
+
+def _run_shard(worker: ShardWorker, shard: Dict[str, URL], conn: Connection) -> None:
+    """
+    Entry point of a worker process, sends ("ok", (results, metrics)) or
+    ("error", traceback).
+    """
+    try:
+        results = worker(shard)
+        conn.send(("ok", (results, METRICS)))
+    except Exception:  # pylint: disable=broad-except
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_sharded(
+    queries: Dict[str, URL], worker: ShardWorker, processes: int
+) -> QueryResults:
+    """
+    Runs `worker` on every shard of `queries` in its own process. Results are
+    merged back in config order. Queries of a shard whose worker failed or
+    crashed are left out of the result, the other shards are not affected.
+    The run metrics of the workers are merged into METRICS.
+    """
+    context = multiprocessing.get_context("spawn")
+    running: List[Tuple[Dict[str, URL], BaseProcess, Connection]] = []
+    for shard in shard_queries(queries, processes):
+        parent_conn, child_conn = context.Pipe(duplex=False)
+        process: BaseProcess = context.Process(
+            target=_run_shard, args=(worker, shard, child_conn)
+        )
+        process.start()
+        child_conn.close()
+        running.append((shard, process, parent_conn))
+
+    merged: QueryResults = {}
+    for shard, process, conn in running:
+        try:
+            status, payload = conn.recv()
+        except EOFError:
+            status, payload = "error", "worker exited without sending results"
+        finally:
+            conn.close()
+        process.join()
+
+        if status == "ok":
+            results, worker_metrics = payload
+            merged.update(results)
+            METRICS.merge(worker_metrics)
+        else:
+            logger.error(
+                "Worker for queries %s failed (exit code %s): %s",
+                list(shard),
+                process.exitcode,
+                payload,
+            )
+
+    return {name: merged[name] for name in queries if name in merged}
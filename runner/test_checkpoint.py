@@ -0,0 +1,94 @@
+"""
+This module contains tests for the checkpoint of an interrupted run.
+"""
+
+import os
+import tempfile
+import unittest
+from constants.testing import make_entry
+from url.url import URL
+from .checkpoint import RunCheckpoint, split_finished_queries
+from .dedup import QueryResult
+
+QUERY_A = URL("prodaja", "ljubljana-mesto", "stanovanje")
+QUERY_B = URL("prodaja", "ljubljana-okolica", "stanovanje")
+
+
+class TestRunCheckpoint(unittest.TestCase):
+    """
+    Test class for the checkpoint of an interrupted run.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.directory.name, "run_checkpoint.jsonl")
+        self.checkpoint = RunCheckpoint(self.path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_load_returns_fetched_entries_and_finished_queries(self) -> None:
+        """
+        Test if the entries and queries recorded by a run are read back.
+        """
+        self.checkpoint.record_entry(make_entry(1))
+        self.checkpoint.record_entry(make_entry(2))
+        result = QueryResult(
+            [make_entry(1), make_entry(3)], frozenset({make_entry(4).link}), 3
+        )
+        self.checkpoint.record_query("a", str(QUERY_A), result)
+
+        resumed = RunCheckpoint(self.path).load()
+        self.assertEqual(resumed.queries, {"a": result})
+        self.assertEqual(resumed.query_urls, {"a": str(QUERY_A)})
+        self.assertEqual(
+            set(resumed.entries), {make_entry(number).link for number in (1, 2, 3)}
+        )
+
+    def test_load_skips_line_cut_short_by_a_crash(self) -> None:
+        """
+        Test if a record cut short while appending is skipped and later
+        records are still read.
+        """
+        self.checkpoint.record_entry(make_entry(1))
+        with open(self.path, "a", encoding="UTF8") as file:
+            file.write('{"entry": {"location": "LJ", "squ\n')
+        self.checkpoint.record_entry(make_entry(2))
+
+        with self.assertLogs("checkpoint", "WARNING"):
+            resumed = self.checkpoint.load()
+        self.assertEqual(
+            resumed.entries,
+            {entry.link: entry for entry in (make_entry(1), make_entry(2))},
+        )
+
+    def test_load_and_clear_without_checkpoint(self) -> None:
+        """
+        Test if a missing checkpoint resumes nothing and clearing it twice works.
+        """
+        self.assertEqual(self.checkpoint.load(), ({}, {}, {}))
+        self.checkpoint.record_entry(make_entry(1))
+        self.checkpoint.clear()
+        self.checkpoint.clear()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_split_finished_queries(self) -> None:
+        """
+        Test if only queries finished on the same URL are skipped.
+        """
+        moved = URL("prodaja", "gorenjska", "stanovanje")
+        self.checkpoint.record_query("a", str(QUERY_A), QueryResult([make_entry(1)]))
+        self.checkpoint.record_query(
+            "b", str(QUERY_B), QueryResult([make_entry(2, str(QUERY_B))])
+        )
+        self.checkpoint.record_query("removed", str(QUERY_B), QueryResult([]))
+
+        remaining, finished = split_finished_queries(
+            self.checkpoint.load(), {"a": QUERY_A, "b": moved, "c": QUERY_B}
+        )
+        self.assertEqual(remaining, {"b": moved, "c": QUERY_B})
+        self.assertEqual(finished, {"a": QueryResult([make_entry(1)])})
+
+
+if __name__ == "__main__":
+    unittest.main()
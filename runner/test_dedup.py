@@ -0,0 +1,58 @@
+"""
+This module contains tests for the cross-query link deduplication.
+"""
+
+import unittest
+from constants.testing import make_entry
+from .dedup import QueryResult, fan_out, merge_links
+
+
+class TestDedup(unittest.TestCase):
+    """
+    Test class for the cross-query link deduplication.
+    """
+
+    def test_merge_links(self) -> None:
+        """
+        Test if overlapping links of several queries are merged.
+        """
+        links = merge_links({"siska1": {"a", "b"}, "siska2": {"b", "c"}, "vic1": set()})
+        self.assertEqual(links, {"a", "b", "c"})
+
+    def test_fan_out_keeps_query_attribution(self) -> None:
+        """
+        Test if an entry fetched once is assigned to every query that matched it.
+        """
+        results = fan_out(
+            {"siska1": {"a", "b"}, "siska2": {"b"}},
+            {"siska1": "url1", "siska2": "url2"},
+            [make_entry("a", "url1"), make_entry("b", "url1")],
+        )
+        self.assertEqual(
+            set(results["siska1"].entries),
+            {make_entry("a", "url1"), make_entry("b", "url1")},
+        )
+        self.assertEqual(results["siska2"].entries, [make_entry("b", "url2")])
+
+    def test_fan_out_skips_missing_entries(self) -> None:
+        """
+        Test if links whose entry could not be fetched are left out and
+        reported as failed to the queries that matched them.
+        """
+        results = fan_out(
+            {"vic1": {"a", "b"}, "vic2": {"b"}},
+            {"vic1": "url1", "vic2": "url2"},
+            [make_entry("b", "url1")],
+            {"a"},
+        )
+        self.assertEqual(
+            results,
+            {
+                "vic1": QueryResult([make_entry("b", "url1")], frozenset({"a"}), 2),
+                "vic2": QueryResult([make_entry("b", "url2")], links=1),
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
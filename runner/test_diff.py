@@ -0,0 +1,128 @@
+"""
+This module contains tests for the link keyed diff of the run's listings.
+"""
+
+import unittest
+from constants.testing import make_entry
+from .diff import diff_entries, listing_key
+
+QUERY_A = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+QUERY_B = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-okolica/stanovanje/"
+QUERY_REMOVED = "https://www.nepremicnine.net/oglasi-oddaja/ljubljana-mesto/"
+
+
+class TestDiff(unittest.TestCase):
+    """
+    Test class for the link keyed diff of the run's listings.
+    """
+
+    def test_listing_key(self) -> None:
+        """
+        Test if listings are keyed by their id, or their link without one.
+        """
+        self.assertEqual(listing_key(make_entry(6812345).link), 6812345)
+        self.assertEqual(
+            listing_key("https://example.com/a/"), "https://example.com/a/"
+        )
+
+    def test_classification(self) -> None:
+        """
+        Test if listings are classified as new, price changed, field changed
+        or delisted.
+        """
+        stored = [
+            make_entry(1),
+            make_entry(2),
+            make_entry(3),
+            make_entry(4),
+            make_entry(5, QUERY_B),
+            make_entry(6, QUERY_REMOVED),
+        ]
+        collected = [
+            make_entry(1),
+            make_entry(2, price=185000.0, square_footage=56.0),
+            make_entry(3, author="ABC Nepremičnine d.o.o."),
+            make_entry(7),
+            # A known listing found by another query is not new
+            make_entry(1, QUERY_B),
+        ]
+        diff = diff_entries(stored, collected, [QUERY_A, QUERY_B])
+        self.assertEqual(diff.new, [make_entry(7)])
+        self.assertEqual(len(diff.price_changed), 1)
+        self.assertEqual(diff.price_changed[0].old, make_entry(2))
+        self.assertEqual(diff.price_changed[0].fields, ("price", "square_footage"))
+        self.assertEqual(len(diff.field_changed), 1)
+        self.assertEqual(diff.field_changed[0].fields, ("author",))
+        # Listings of queries that were not run are not delisted
+        self.assertEqual(diff.delisted, [make_entry(4), make_entry(5, QUERY_B)])
+
+    def test_no_changes(self) -> None:
+        """
+        Test if an unchanged run has an empty diff.
+        """
+        entries = [make_entry(1), make_entry(2, QUERY_B)]
+        diff = diff_entries(entries, entries, [QUERY_A, QUERY_B])
+        self.assertFalse(diff)
+        self.assertEqual(
+            diff.summary(),
+            "0 new, 0 with a changed price, 0 with other changes, 0 delisted",
+        )
+
+    def test_missing_values_are_not_changes(self) -> None:
+        """
+        Test if a price or size the extraction did not find (-1.0) is not
+        reported as a change, on either side.
+        """
+        stored = [make_entry(1), make_entry(2, price=-1.0), make_entry(3)]
+        collected = [
+            make_entry(1, price=-1.0),
+            make_entry(2, price=185000.0),
+            make_entry(3, square_footage=-1.0, built_year=1980),
+        ]
+        diff = diff_entries(stored, collected, [QUERY_A])
+        self.assertEqual(diff.price_changed, [])
+        self.assertEqual(len(diff.field_changed), 1)
+        self.assertEqual(diff.field_changed[0].fields, ("built_year",))
+
+    def test_kept_entries_are_not_delisted(self) -> None:
+        """
+        Test if stored entries kept for a failed detail page are neither
+        delisted nor compared.
+        """
+        stored = [make_entry(1), make_entry(2), make_entry(3)]
+        diff = diff_entries(stored, [make_entry(1)], [QUERY_A], kept=[make_entry(2)])
+        self.assertEqual(diff.delisted, [make_entry(3)])
+        self.assertEqual(diff.new, [])
+
+    def test_listing_found_by_several_queries(self) -> None:
+        """
+        Test if a listing stored and collected for several queries is compared
+        with the same stored entry whatever the order of the entries.
+        """
+        stored = [make_entry(1, price=190000.0), make_entry(1, QUERY_B)]
+        collected = [make_entry(1), make_entry(1, QUERY_B)]
+        for ordered in (stored, stored[::-1]):
+            for found in (collected, collected[::-1]):
+                diff = diff_entries(ordered, found, [QUERY_A, QUERY_B])
+                self.assertEqual(len(diff.price_changed), 1)
+                self.assertEqual(diff.price_changed[0].old.price, 190000.0)
+
+    def test_collected_entry_wins_over_kept_one(self) -> None:
+        """
+        Test if a listing collected by one query and kept from the store for
+        another is compared by the collected entry.
+        """
+        stored = [make_entry(1), make_entry(1, QUERY_B)]
+        diff = diff_entries(
+            stored,
+            [make_entry(1, QUERY_B, price=185000.0)],
+            [QUERY_A, QUERY_B],
+            kept=[make_entry(1)],
+        )
+        self.assertEqual(len(diff.price_changed), 1)
+        self.assertEqual(diff.price_changed[0].new.price, 185000.0)
+        self.assertEqual(diff.delisted, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
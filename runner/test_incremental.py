@@ -0,0 +1,84 @@
+"""
+This module contains tests for serving known listings from the store.
+"""
+
+import unittest
+from typing import Dict
+from constants.testing import make_entry
+from extractor.card_extractor import CardFields
+from .incremental import index_by_link, split_card_links, split_known_links
+
+ORIGIN = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+
+
+class TestIncremental(unittest.TestCase):
+    """
+    Test class for serving known listings from the store.
+    """
+
+    def test_only_unseen_links_are_fetched(self) -> None:
+        """
+        Test if known links are served and unseen links are fetched.
+        """
+        known = index_by_link([make_entry("a"), make_entry("b")])
+        served, to_fetch = split_known_links(["a", "b", "c"], known, ORIGIN)
+        self.assertEqual(to_fetch, {"c"})
+        self.assertEqual(set(served), {make_entry("a"), make_entry("b")})
+
+    def test_served_entries_keep_query_attribution(self) -> None:
+        """
+        Test if a link known from another query is attributed to this query.
+        """
+        known = index_by_link([make_entry("a", origin_url="other")])
+        served, _ = split_known_links(["a"], known, ORIGIN)
+        self.assertEqual(served, [make_entry("a")])
+
+    def test_revalidation_fetches_known_links(self) -> None:
+        """
+        Test if revalidating every link fetches all known links again.
+        """
+        known = index_by_link([make_entry("a"), make_entry("b")])
+        served, to_fetch = split_known_links(["a", "b"], known, ORIGIN, 100)
+        self.assertEqual(served, [])
+        self.assertEqual(to_fetch, {"a", "b"})
+
+    def test_fresh_links_are_not_revalidated(self) -> None:
+        """
+        Test if links this run fetched already are served even when every
+        known link is revalidated.
+        """
+        known = index_by_link([make_entry("a"), make_entry("b")])
+        served, to_fetch = split_known_links(
+            ["a", "b"], known, ORIGIN, 100, fresh_links={"a"}
+        )
+        self.assertEqual(served, [make_entry("a")])
+        self.assertEqual(to_fetch, {"b"})
+
+    def test_cards_refresh_known_links(self) -> None:
+        """
+        Test if known links with a complete card are served from the card.
+        """
+        known = index_by_link([make_entry("a"), make_entry("b")])
+        cards: Dict[str, CardFields] = {
+            "a": {
+                "link": "a",
+                "location": "LJ.",
+                "price": "140.000,00 €",
+                "description": None,
+                "features": ["50,00 m2"],
+            },
+            "b": {
+                "link": "b",
+                "location": "LJ.",
+                "price": None,
+                "description": None,
+                "features": [],
+            },
+        }
+        served, to_fetch = split_card_links(["a", "b", "c"], cards, known, ORIGIN)
+        self.assertEqual(to_fetch, {"b", "c"})
+        self.assertEqual([entry.price for entry in served], [140000.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
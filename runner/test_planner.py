@@ -0,0 +1,205 @@
+"""
+This module contains tests for the query planner.
+"""
+
+import unittest
+from typing import Any
+from constants.testing import make_entry
+from url.url import URL
+from .dedup import QueryResult
+from .planner import assign_results, matches, plan_queries, split_full_fetches
+
+
+def _url(region: str = "ljubljana-mesto", **ranges: Any) -> URL:
+    return URL("prodaja", region, "stanovanje", **ranges)
+
+
+class TestPlanner(unittest.TestCase):
+    """
+    Test class for the query planner.
+    """
+
+    def test_overlapping_size_ranges_are_merged(self) -> None:
+        """
+        Test if queries differing only in an overlapping range are fetched once.
+        """
+        plan = plan_queries(
+            {
+                "small": _url(size_from=30, size_to=50),
+                "medium": _url(size_from=45, size_to=80),
+                "large": _url(size_from=60),
+            }
+        )
+        self.assertEqual(list(plan.fetches), ["small+medium+large"])
+        self.assertEqual(
+            str(plan.fetches["small+medium+large"]), str(_url(size_from=30))
+        )
+        self.assertEqual(plan.saved_page_loads(), 2)
+        self.assertIn("saving 2", plan.summary())
+
+    def test_contained_query_is_merged(self) -> None:
+        """
+        Test if a query inside another one in every range is served by it.
+        """
+        plan = plan_queries(
+            {
+                "all": _url(price_to=300000),
+                "new": _url(year_from=2010, size_from=40, price_to=250000),
+            }
+        )
+        self.assertEqual(plan.members, {"all+new": ["all", "new"]})
+        self.assertEqual(str(plan.fetches["all+new"]), str(_url(price_to=300000)))
+
+    def test_queries_not_covered_exactly_are_kept(self) -> None:
+        """
+        Test if disjoint ranges, ranges differing in two filters and other
+        regions are fetched on their own, under their own name and URL.
+        """
+        queries = {
+            "small": _url(size_from=30, size_to=40),
+            "large": _url(size_from=60, size_to=80),
+            "old": _url(size_from=35, size_to=45, year_to=1970),
+            "price": _url(price_from=100000),
+            "price_m2": _url(price_from_m2=2000),
+            "okolica": _url("ljubljana-okolica", size_from=30, size_to=40),
+        }
+        plan = plan_queries(queries)
+        self.assertEqual(plan.fetches, queries)
+        self.assertEqual(plan.saved_page_loads(), 0)
+
+    def test_matches(self) -> None:
+        """
+        Test if the ranges of a query are checked with both ends included.
+        """
+        url = _url(size_from=40, size_to=60, price_to_m2=3000)
+        self.assertTrue(
+            matches(
+                url, make_entry(1, square_footage=40.0, price=120000.0, built_year=2000)
+            )
+        )
+        self.assertTrue(
+            matches(
+                url, make_entry(2, square_footage=60.0, price=180000.0, built_year=2000)
+            )
+        )
+        self.assertFalse(
+            matches(
+                url, make_entry(3, square_footage=61.0, price=100000.0, built_year=2000)
+            )
+        )
+        self.assertFalse(
+            matches(
+                url, make_entry(4, square_footage=50.0, price=160000.0, built_year=2000)
+            )
+        )
+        self.assertFalse(
+            matches(
+                _url(year_to=1990),
+                make_entry(5, square_footage=50.0, price=100000.0, built_year=2000),
+            )
+        )
+
+    def test_matches_missing_size_or_price(self) -> None:
+        """
+        Test if a size or price the extraction did not find is not in range.
+        """
+        self.assertFalse(
+            matches(
+                _url(price_to=300000),
+                make_entry(1, square_footage=50.0, price=-1.0, built_year=2000),
+            )
+        )
+        self.assertFalse(
+            matches(
+                _url(size_to=60),
+                make_entry(2, square_footage=-1.0, price=100000.0, built_year=2000),
+            )
+        )
+        self.assertFalse(
+            matches(
+                _url(price_to_m2=3000),
+                make_entry(3, square_footage=-1.0, price=-1.0, built_year=2000),
+            )
+        )
+        self.assertTrue(
+            matches(
+                _url(size_to=60),
+                make_entry(4, square_footage=50.0, price=-1.0, built_year=2000),
+            )
+        )
+
+    def test_assign_results(self) -> None:
+        """
+        Test if the entries of a merged fetch are assigned to the queries
+        whose ranges they fall into, attributed to their URLs, and the
+        queries of a failed fetch are left out.
+        """
+        queries = {
+            "small": _url(size_from=30, size_to=50),
+            "large": _url(size_from=45),
+            "okolica": _url("ljubljana-okolica"),
+        }
+        plan = plan_queries(queries)
+        entries = [
+            make_entry(1, square_footage=35.0, price=100000.0, built_year=2000),
+            make_entry(2, square_footage=48.0, price=120000.0, built_year=2000),
+        ]
+        failed = frozenset(
+            {make_entry(3, square_footage=40.0, price=90000.0, built_year=2000).link}
+        )
+        assigned = assign_results(
+            plan, {"small+large": QueryResult(entries, failed, 3)}
+        )
+
+        self.assertEqual(list(assigned), ["small", "large"])
+        self.assertEqual(
+            [entry.link for entry in assigned["small"].entries],
+            [entry.link for entry in entries],
+        )
+        large = assigned["large"]
+        self.assertEqual([entry.link for entry in large.entries], [entries[1].link])
+        self.assertEqual(large.entries[0].origin_url, str(queries["large"]))
+        self.assertEqual(large.failed_links, failed)
+        self.assertEqual(large.links, 3)
+
+    def test_split_full_fetches(self) -> None:
+        """
+        Test if a merged fetch whose listing page is full is replaced by the
+        queries it covers, also when a detail page failed, and the other
+        fetches are kept.
+        """
+        plan = plan_queries(
+            {
+                "small": _url(size_from=30, size_to=50),
+                "large": _url(size_from=45),
+                "cheap": _url("ljubljana-okolica", price_to=100000),
+                "new": _url("ljubljana-okolica", year_from=2010, price_to=90000),
+            }
+        )
+        results = {
+            "small+large": QueryResult(
+                [make_entry(1, square_footage=35.0, price=100000.0, built_year=2000)],
+                frozenset(
+                    {
+                        make_entry(
+                            2, square_footage=48.0, price=0.0, built_year=2000
+                        ).link
+                    }
+                ),
+                2,
+            ),
+            "cheap+new": QueryResult(
+                [make_entry(3, square_footage=50.0, price=80000.0, built_year=2000)],
+                links=1,
+            ),
+        }
+        unmerged = split_full_fetches(plan, results, 2)
+
+        self.assertEqual(list(unmerged.fetches), ["small", "large", "cheap+new"])
+        self.assertEqual(str(unmerged.fetches["large"]), str(_url(size_from=45)))
+        self.assertEqual(unmerged.members["small"], ["small"])
+        self.assertEqual(unmerged.members["cheap+new"], ["cheap", "new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
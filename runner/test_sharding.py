@@ -0,0 +1,93 @@
+"""
+This module contains tests for the query sharding.
+"""
+
+import os
+import unittest
+from typing import Dict
+
+from constants.testing import make_entry
+from metrics.metrics import METRICS
+from url.url import URL
+from .dedup import QueryResult, QueryResults
+from .sharding import run_sharded, shard_queries
+
+
+def _fake_worker(queries: Dict[str, URL]) -> QueryResults:
+    """
+    Worker returning one entry per query, failing on purpose for some queries.
+    """
+    if "raises" in queries:
+        raise RuntimeError("scraper failed")
+    if "crashes" in queries:
+        os._exit(1)  # pylint: disable=protected-access
+    METRICS.inc("pages_fetched_total", len(queries), source="http")
+    return {
+        name: QueryResult(
+            [
+                make_entry(
+                    f"https://www.nepremicnine.net/oglasi-prodaja/{name}_1/",
+                    str(url),
+                    location=name,
+                )
+            ]
+        )
+        for name, url in queries.items()
+    }
+
+
+def _queries(*names: str) -> Dict[str, URL]:
+    return {
+        name: URL(
+            type_of_offer="prodaja",
+            region="ljubljana-mesto",
+            type_of_property="stanovanje",
+        )
+        for name in names
+    }
+
+
+class TestSharding(unittest.TestCase):
+    """
+    Test class for the query sharding.
+    """
+
+    def test_shard_queries_round_robin(self) -> None:
+        """
+        Test if queries are split round-robin and never into empty shards.
+        """
+        shards = shard_queries(_queries("a", "b", "c", "d", "e"), 2)
+        self.assertEqual(
+            [list(shard) for shard in shards], [["a", "c", "e"], ["b", "d"]]
+        )
+        self.assertEqual(len(shard_queries(_queries("a"), 4)), 1)
+
+    def test_results_are_merged_in_config_order(self) -> None:
+        """
+        Test if results are merged back in config order.
+        """
+        results = run_sharded(_queries("a", "b", "c"), _fake_worker, 2)
+        self.assertEqual(list(results), ["a", "b", "c"])
+        self.assertEqual(results["b"].entries[0].location, "b")
+
+    def test_worker_metrics_are_merged(self) -> None:
+        """
+        Test if the run metrics of all workers end up in the main process.
+        """
+        METRICS.reset()
+        run_sharded(_queries("a", "b", "c"), _fake_worker, 2)
+        self.assertEqual(
+            METRICS.counters[("pages_fetched_total", (("source", "http"),))], 3
+        )
+        METRICS.reset()
+
+    def test_failing_worker_does_not_abort_others(self) -> None:
+        """
+        Test if a raising or crashing worker only drops its own queries.
+        """
+        results = run_sharded(_queries("a", "raises", "b", "crashes"), _fake_worker, 4)
+        self.assertEqual(list(results), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
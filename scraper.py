@@ -4,19 +4,84 @@ Scraper is responsible for scraping the website and extracting the relevant info
 
 #!/usr/bin/python
 
+import argparse
 import os
-import re
-import random
-import json
-from typing import List, Optional, Set
+import sys
+import time
+from contextlib import ExitStack
+from dataclasses import replace
+from email.mime.multipart import MIMEMultipart
+from functools import partial
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, Page
-
-from constants.objects import ExtractedEntry, ExtractedEntryEncoder
+from playwright.sync_api import Page, Response
+
+from browser.async_engine import run_async_engine
+from browser.consent import ConsentStore
+from browser.interception import ResourceBlocker
+from browser.pool import BrowserPool
+from browser.readiness import (
+    DETAIL_READY_TIMEOUTS_MS,
+    LISTING_READY_TIMEOUTS_MS,
+    wait_until_ready,
+)
+from browser.tracing import SlowPageTraces
+from constants.constants import (
+    ALLOWED_REGIONS,
+    CACHE_DIRECTORY,
+    CHECKPOINT_FILE,
+    DEFAULT_ALLOWED_DOMAINS,
+    CONSENT_STATE_FILE,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CACHE_TTL_DETAIL_MINUTES,
+    DEFAULT_CACHE_TTL_LISTING_MINUTES,
+    DEFAULT_BROWSER_MAX_PAGES,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_DELAY_MAX_MS,
+    DEFAULT_DELAY_MIN_MS,
+    DEFAULT_PROFILE_TRACES,
+    JOURNAL_FILE,
+    LEGACY_STORE_FILE,
+    LISTING_PAGE_SIZE,
+    METRICS_JSON_FILE,
+    METRICS_TEXTFILE,
+    PROFILE_STACKS_FILE,
+    PROFILE_STATS_FILE,
+    PRICE_HISTORY_FILE,
+    REPLAY_EMAIL_FILE,
+    STORE_FILE,
+)
+from constants.objects import ExtractedEntry
+from extractor.card_extractor import CardFields, extract_cards
+from extractor.html_extractor import extract_fields
+from extractor.page_script import EXTRACT_FIELDS_SCRIPT, fields_from_result
+from extractor.parsing import entry_from_fields, extract_links, fields_complete
+from fetcher.cache import CacheStats, PageCache
+from fetcher.http_fetcher import HttpFetcher
+from fetcher.rate_limiter import RateLimiter
+from file_utils.atomic import atomic_write
 from logger.logger import setup_logger
 from config.parser import ConfigParser
 from mail_utils.email_generator import create_email_body, send_email
+from metrics.metrics import METRICS
+from profiler.profiler import profile_run
+from replay.archive import ResponseArchive
+from replay.server import replay_site
+from runner.dedup import QueryResult, QueryResults, fan_out, merge_links
+from runner.diff import diff_entries
+from runner.checkpoint import RunCheckpoint, split_finished_queries
+from runner.incremental import index_by_link, serve_links
+from runner.options import ScrapeOptions
+from runner.planner import assign_results, plan_queries, split_full_fetches
+from runner.sharding import ShardWorker, run_sharded
+from store.journal import ListingJournal
+from store.listing_store import ListingStore
+from store.price_history import PriceHistory
+from url.url import URL
+
+# Either backend of the --store option
+Store = Union[ListingStore, ListingJournal]
 
 # Load .env file
 load_dotenv()
@@ -26,283 +91,824 @@ logger = setup_logger("scraper")
 # pylint: disable=W1203
 
 
-# pylint: disable=too-few-public-methods
-class Scraper:
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+class EntryFetcher:
     """
-    Scraper class for extracting information from a website.
+    Fetches the entries of detail page links, for any query. The entries are
+    attributed to `origin_url`, none (empty) for the links of several queries,
+    which fan_out then assigns to every query that found them.
     """
 
-    def __init__(self, start_url: str):
-        self.start_url = start_url
-
-    def _setup_browser(self) -> tuple:
+    def __init__(
+        self,
+        pool: BrowserPool,
+        fetcher: Optional[HttpFetcher] = None,
+        options: ScrapeOptions = ScrapeOptions(),
+        cards: Optional[Dict[str, CardFields]] = None,
+        origin_url: str = "",
+    ):
+        self.pool = pool
+        self.fetcher = fetcher
+        self.known_entries = (
+            options.known_entries if options.known_entries is not None else {}
+        )
+        self.revalidate_percent = options.revalidate_percent
+        self.fresh_links = options.fresh_links
+        self.cards = cards
+        self.cache = options.cache
+        self.checkpoint = options.checkpoint
+        self.origin_url = origin_url
+
+    def _fetch_entries(self, links: Set[str]) -> Tuple[List[ExtractedEntry], Set[str]]:
         """
-        Sets up and returns a Playwright browser instance.
+        Fetches entries from the list of links, recording each one in the
+        checkpoint as soon as it is fetched. Returns the entries and the links
+        that failed, which do not affect the other links.
         """
-        playwright = sync_playwright().start()
-        browser = playwright.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        user_agent = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        page.set_extra_http_headers({"User-Agent": user_agent})
-        return playwright, browser, context, page
-
-    def _accept_cookies(self, page: Page) -> None:
+        entries = []
+        failed_links = set()
+        for link in links:
+            try:
+                entry = self._fetch_entry(link)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error(f"Failed to fetch [{link}]: {exc}")
+                failed_links.add(link)
+                continue
+            if self.checkpoint is not None:
+                self.checkpoint.record_entry(entry)
+            entries.append(entry)
+        return entries, failed_links
+
+    def _fetch_entry(self, link: str) -> ExtractedEntry:
         """
-        Accepts cookies if the modal is present.
+        Fetches a single entry from the cache, or over plain HTTP first if a
+        fetcher is configured.
         """
-        try:
-            accept_button_selector = "button#CybotCookiebotDialogBodyButtonAccept"
-            page.wait_for_selector(accept_button_selector, timeout=5000)
-            self._wait_for_timeout(page, 500, 1000)
-            page.click(accept_button_selector)
-            logger.debug("Accepted cookies.")
-        except Exception:  # pylint: disable=broad-except
-            logger.debug("No cookies modal found.")
-
-    def _wait_for_timeout(
-        self, page: Page, seconds_min: int = 2000, seconds_max: int = 5000
-    ) -> None:
+        content = self.cache.get(link) if self.cache is not None else None
+        entry = self._entry_from_html(content, link)
+        if entry is not None:
+            return entry
+        if self.fetcher is not None:
+            entry = self._entry_from_html(self.fetcher.fetch(link), link)
+            if entry is not None:
+                return entry
+            logger.info(f"Falling back to the browser for [{link}]...")
+            self.fetcher.stats.fallbacks += 1
+        return self._fetch_entry_browser(link)
+
+    def _entry_from_html(
+        self, content: Optional[str], link: str
+    ) -> Optional[ExtractedEntry]:
         """
-        Waits for a random amount of time between `seconds_min` and `seconds_max`.
+        Extracts the entry from downloaded HTML, or returns None if there is no
+        content or it misses a field.
         """
-        seconds = random.randint(seconds_min, seconds_max)
-        logger.debug(f"Waiting for {seconds / 1000} seconds before moving on...")
-        page.wait_for_timeout(seconds)
-
-    def _fetch_links(self, url: str) -> Set[str]:
+        if content is None:
+            return None
+        with METRICS.timer("extraction"):
+            fields = extract_fields(content)
+        if not fields_complete(fields):
+            return None
+        return entry_from_fields(fields, link, self.origin_url)
+
+    def _fetch_entry_browser(self, link: str) -> ExtractedEntry:
         """
-        Fetches the page content and extracts all relevant links.
+        Fetches a single entry by rendering its page in the browser.
         """
-        playwright, browser, _, page = self._setup_browser()
-        logger.info(f"Going to page at {url}...")
-        page.goto(url)
+        with self.pool.page() as page:
+            logger.info(f"Going to page at [{link}]...")
+            response = self.pool.goto(page, link, wait_until="domcontentloaded")
 
-        self._accept_cookies(page)
-        self._wait_for_timeout(page, 2500, 4500)
+            wait_until_ready(page, DETAIL_READY_TIMEOUTS_MS)
+            self.pool.consent.accept(page)
 
-        logger.debug("Getting the page content...")
-        content = page.content()
-        browser.close()
-        playwright.stop()
+            entry = self._extract_entry(page, link)
+            if self.cache is not None:
+                self._cache_page(link, page.content(), response)
+            return entry
 
-        logger.debug("Extracting entry links from page...")
-        links = re.findall(
-            r'href="(https://www\.nepremicnine\.net/oglasi-[^/]+/[^/]+-[^/]+_[0-9]+/?)"',
-            content,
-        )
-        return set(links)
-
-    def _fetch_entries(self, links: Set[str]) -> List[ExtractedEntry]:
+    def _cache_page(self, url: str, content: str, response: Optional[Response]) -> None:
         """
-        Fetches entries from the list of links.
+        Stores a page rendered by the browser in the cache, if there is one.
         """
-        entries = []
-        for link in links:
-            playwright, browser, _, page = self._setup_browser()
-            logger.info(f"Going to page at [{link}]...")
-            page.goto(link, wait_until="networkidle")
-
-            self._accept_cookies(page)
-            self._wait_for_timeout(page, 2000, 4000)
-
-            price = self._get_price(page)
-            location = self._get_element_text(page, "#opis .kratek strong")
-            square_footage = self._get_square_footage(page)
-            built_year = self._get_built_year(page)
-            author = self._get_author(page)
-
-            page.close()
-            browser.close()
-            playwright.stop()
-
-            entries.append(
-                ExtractedEntry(
-                    link=link,
-                    price=price,
-                    square_footage=square_footage,
-                    built_year=built_year,
-                    location=location,
-                    origin_url=self.start_url,
-                    author=author,
-                )
-            )
-        return entries
+        if self.cache is not None:
+            headers = response.headers if response is not None else {}
+            self.cache.put_response(url, content, headers)
 
-    def _get_element_text(self, page: Page, selector: str) -> str:
+    def _extract_entry(self, page: Page, link: str) -> ExtractedEntry:
         """
-        Returns the text content of an element or 'N/A' if not found.
+        Extracts the entry from a loaded detail page in a single round trip.
         """
-        element = page.query_selector(selector)
-        return element.inner_text() if element else "N/A"
+        with METRICS.timer("extraction"):
+            fields = fields_from_result(page.evaluate(EXTRACT_FIELDS_SCRIPT))
+        return entry_from_fields(fields, link, self.origin_url)
 
-    def _get_author(self, page: Page) -> Optional[str]:
+    def fetch_entries(self, links: Set[str]) -> Tuple[List[ExtractedEntry], Set[str]]:
         """
-        Extracts the author of the listing from the page.
+        Returns the entries of `links`, serving known links from their search
+        result card or from the store, and the links whose detail page failed.
         """
-        author_element = page.query_selector(".kontakt .prodajalec h2")
-        if author_element is not None:
-            author_element_str = author_element.inner_text().strip()
-            if len(author_element_str) > 0:
-                return author_element_str
-        return None
-
-    def _get_price(self, page: Page) -> float:
-        price_element = page.query_selector(".cena span")
-
-        if not price_element:
-            logger.error("Price element not found on the page")
-            return -1.0
-
-        # Get the text content of the first text node (the primary price)
-        price_str = price_element.evaluate("el => el.childNodes[0].nodeValue").strip()
-
-        # Remove non-numeric characters like 'do', 'cca', etc.
-        price_str = re.sub(r"[^\d,.-]", "", price_str)
+        served, links_to_fetch = serve_links(
+            links,
+            self.known_entries,
+            self.origin_url,
+            self.revalidate_percent,
+            self.cards,
+            self.fresh_links,
+        )
+        entries, failed_links = self._fetch_entries(links_to_fetch)
+        return served + entries, failed_links
 
-        # Clean up the price string
-        price_str = price_str.replace("€", "").strip()
-        price_str = price_str.replace(".", "").replace(",", ".")
 
-        if not price_str:  # Check if price_str is still valid
-            logger.error("Price string is empty after cleanup")
-            return -1.0
+class Scraper(EntryFetcher):
+    """
+    Scraper class for extracting information from a website.
+    """
 
-        # Convert to float and round
-        price_float = round(float(price_str), 0)
-        return price_float
+    def __init__(
+        self,
+        start_url: str,
+        pool: BrowserPool,
+        fetcher: Optional[HttpFetcher] = None,
+        options: ScrapeOptions = ScrapeOptions(),
+        cards: Optional[Dict[str, CardFields]] = None,
+    ):
+        super().__init__(pool, fetcher, options, cards, start_url)
+        self.start_url = start_url
 
-    def _get_square_footage(self, page: Page) -> float:
+    def _fetch_links(self, url: str) -> Set[str]:
         """
-        Extracts square footage from the page.
+        Fetches the page content and extracts all relevant links.
         """
-        # First attempt: Try to get square footage from the attribute list
-        attributes_element = page.query_selector("#atributi")
-        square_footage = -1.0
-        if attributes_element:
-            for element in attributes_element.query_selector_all("li"):
-                if "Velikost" in element.inner_text():
-                    square_footage = element.inner_text().split(":")[1].strip()
-                    square_footage = float(
-                        square_footage.replace("m\n2", "")
-                        .replace("m2", "")
-                        .strip()
-                        .replace(",", ".")
-                    )
-        # Fallback approach: Try to extract square footage from the description
-        if square_footage == -1.0:
-            description_element = page.query_selector("#opis .kratek")
-            if description_element:
-                description = description_element.inner_text()
-                # Regex that handles both comma or period decimal separators before "m2"
-                square_footage_match = re.search(r"([0-9]+(?:[.,][0-9]+)?)\s*m2", description)
-                if square_footage_match:
-                    # Extract the numeric value before "m2" and return it
-                    square_footage = float(square_footage_match.group(1).replace(",", "."))
-        return square_footage
-
-    def _get_built_year(self, page: Page) -> Optional[int]:
+        content = self.cache.get(url) if self.cache is not None else None
+        if content is None and self.fetcher is not None:
+            content = self.fetcher.fetch(url)
+        if content is None:
+            with self.pool.page() as page:
+                logger.info(f"Going to page at {url}...")
+                response = self.pool.goto(page, url, wait_until="domcontentloaded")
+
+                wait_until_ready(page, LISTING_READY_TIMEOUTS_MS)
+                self.pool.consent.accept(page)
+
+                logger.debug("Getting the page content...")
+                content = page.content()
+                self._cache_page(url, content, response)
+
+        if self.cards is not None:
+            self.cards.update(extract_cards(content))
+        logger.debug("Extracting entry links from page...")
+        return extract_links(content)
+
+    def collect_links(self) -> Set[str]:
         """
-        Extracts the built year from the page.
+        Returns the links of all listings matching the query.
         """
-        description_element = page.query_selector("#opis .kratek")
-        if description_element:
-            description = description_element.inner_text()
-            # Update the regex to match "zgrajeno l. <year>"
-            built_year_match = re.search(r"zgrajen[ao] l\. (\d{4})", description)
-            if built_year_match:
-                return int(built_year_match.group(1))
-        return None
-
-    def run(self) -> List[ExtractedEntry]:
+        unique_links = self._fetch_links(self.start_url)
+        logger.info(f"Found {len(unique_links)} unique links: {unique_links}")
+        return unique_links
+
+    def run(self) -> QueryResult:
         """
         Runs the scraper and returns the extracted entries.
         """
-        unique_links = self._fetch_links(self.start_url)
-        logger.info(f"Found {len(unique_links)} unique links: {unique_links}")
-        entries = self._fetch_entries(unique_links)
-        return entries
+        entries, failed_links = self.fetch_entries(self.collect_links())
+        return QueryResult(entries, frozenset(failed_links))
 
 
-def load_entries_from_file(file_path: str) -> Set[ExtractedEntry]:
+def create_blocker(settings: Dict[str, Any]) -> ResourceBlocker:
     """
-    Helper function to load entries from a file.
+    Creates the request interception layer configured in the settings.
     """
-    with open(file_path, "r", encoding="UTF8") as file:
-        entries_data = json.load(file)
-        return {ExtractedEntry(**entry) for entry in entries_data}
+    return ResourceBlocker(
+        blocked_resource_types=settings.get("blocked_resource_types"),
+        allowed_domains=settings.get("allowed_domains"),
+    )
 
 
-def main() -> None:
+def create_rate_limiter(
+    settings: Dict[str, Any], max_concurrency: int = 1
+) -> RateLimiter:
     """
-    Main function executed when the script is run.
+    Creates the rate limiter configured in the settings.
     """
+    return RateLimiter(
+        settings.get("delay_min_ms", DEFAULT_DELAY_MIN_MS),
+        settings.get("delay_max_ms", DEFAULT_DELAY_MAX_MS),
+        max_concurrency,
+    )
+
+
+def create_cache(settings: Dict[str, Any], directory: str) -> PageCache:
+    """
+    Creates the on-disk page cache configured in the settings.
+    """
+    return PageCache(
+        directory,
+        settings.get("cache_max_mb", DEFAULT_CACHE_MAX_MB),
+        {
+            "listing": settings.get(
+                "cache_ttl_listing_minutes", DEFAULT_CACHE_TTL_LISTING_MINUTES
+            ),
+            "detail": settings.get(
+                "cache_ttl_detail_minutes", DEFAULT_CACHE_TTL_DETAIL_MINUTES
+            ),
+        },
+    )
+
+
+def replay_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns the settings of a replayed run: no delays between requests, and
+    the local replay server is allowed by the request interception.
+    """
+    return {
+        **settings,
+        "delay_min_ms": 0,
+        "delay_max_ms": 0,
+        "allowed_domains": [
+            *settings.get("allowed_domains", DEFAULT_ALLOWED_DOMAINS),
+            "127.0.0.1",
+        ],
+    }
+
+
+# pylint: disable=too-many-locals
+def scrape_with_pool(
+    queries: Dict[str, URL],
+    settings: Dict[str, Any],
+    fetch_mode: str = "browser",
+    options: ScrapeOptions = ScrapeOptions(),
+) -> QueryResults:
+    """
+    Runs the sync Scraper for every query on a single shared BrowserPool.
+    Links of all queries are collected first, so every listing is fetched once.
+    In the "http" fetch mode pages are downloaded without the browser, which
+    is only used for pages that come back blocked or incomplete. Queries
+    whose listing page fails are left out of the results. See ScrapeOptions
+    for the `options` of the run.
+    """
+    cards: Optional[Dict[str, CardFields]] = {} if options.use_cards else None
+    rate_limiter = create_rate_limiter(settings)
+    fetcher = (
+        HttpFetcher(
+            rate_limiter=rate_limiter, cache=options.cache, archive=options.archive
+        )
+        if fetch_mode == "http"
+        else None
+    )
+    blocker = create_blocker(settings)
+    with BrowserPool(
+        max_pages=settings.get("browser_max_pages", DEFAULT_BROWSER_MAX_PAGES),
+        max_rss_mb=settings.get("browser_max_rss_mb"),
+        blocker=blocker,
+        rate_limiter=rate_limiter,
+        consent=ConsentStore(options.consent_path),
+        archive=options.archive,
+        traces=options.traces,
+    ) as pool:
+        scrapers = {
+            query_name: Scraper(str(url), pool, fetcher, options, cards)
+            for query_name, url in queries.items()
+        }
+        links_by_query: Dict[str, Set[str]] = {}
+        with METRICS.timer("link_fetch"):
+            for query_name, scraper in scrapers.items():
+                logger.info(
+                    "Collecting links for query [%s] on url [%s]",
+                    query_name,
+                    scraper.start_url,
+                )
+                try:
+                    links_by_query[query_name] = scraper.collect_links()
+                except Exception as exc:  # pylint: disable=broad-except
+                    logger.error(f"Query [{query_name}] failed: {exc}")
+
+        # Entries are attributed to their queries by fan_out
+        with METRICS.timer("detail_fetch"):
+            entries, failed_links = EntryFetcher(
+                pool, fetcher, options, cards
+            ).fetch_entries(merge_links(links_by_query))
+    results = fan_out(
+        links_by_query,
+        {query_name: scraper.start_url for query_name, scraper in scrapers.items()},
+        entries,
+        failed_links,
+    )
+    logger.info(pool.stats.summary())
+    logger.info(rate_limiter.summary())
+    logger.info(f"Request interception: {blocker.totals.summary()}")
+    if fetcher is not None:
+        fetcher.close()
+        logger.info(fetcher.stats.summary())
+    return results
+
+
+def run_engine(
+    queries: Dict[str, URL],
+    settings: Dict[str, Any],
+    engine: str,
+    fetch_mode: str = "browser",
+    options: ScrapeOptions = ScrapeOptions(),
+) -> QueryResults:
+    """
+    Runs the selected scraping engine for the given queries. Every fetched
+    entry and finished query is recorded in the checkpoint of the `options`,
+    if there is one.
+    """
+    if engine == "async":
+        blocker = create_blocker(settings)
+        concurrency = settings.get("concurrency", DEFAULT_CONCURRENCY)
+        rate_limiter = create_rate_limiter(settings, concurrency)
+        results = run_async_engine(queries, concurrency, blocker, rate_limiter, options)
+        logger.info(rate_limiter.summary())
+        logger.info(f"Request interception: {blocker.totals.summary()}")
+    else:
+        results = scrape_with_pool(queries, settings, fetch_mode, options)
+    if options.checkpoint is not None:
+        for query_name, result in results.items():
+            options.checkpoint.record_query(
+                query_name, str(queries[query_name]), result
+            )
+    return results
+
 
+def run_queries(
+    queries: Dict[str, URL], worker: ShardWorker, processes: int
+) -> QueryResults:
+    """
+    Runs `worker` for the `queries`, sharded across `processes` worker
+    processes if there is more than one.
+    """
+    if not queries:
+        return {}
+    if processes > 1:
+        return run_sharded(queries, worker, processes)
+    return worker(queries)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument(
+        "--engine",
+        choices=["sync", "async"],
+        default="sync",
+        help="Scraping engine to use (default: sync). The async engine fetches "
+        "nastavitev.concurrency detail pages at the same time.",
+    )
+    arg_parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of worker processes the queries are sharded across, "
+        "each with its own Playwright instance (default: 1).",
+    )
+    arg_parser.add_argument(
+        "--fetch-mode",
+        choices=["browser", "http"],
+        default="browser",
+        help="How pages are downloaded (default: browser). The http mode uses a "
+        "pooled keep-alive HTTP client and only falls back to the browser for "
+        "blocked or incomplete pages. Only supported by the sync engine.",
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Serve listings already stored in query_results.json from the store "
+        "and only fetch unseen links (plus nastavitev.revalidate_percent percent "
+        "of the known ones).",
+    )
+    arg_parser.add_argument(
+        "--cards",
+        action="store_true",
+        help="Like --incremental, but refresh the price and size of stored listings "
+        "from the search result cards. Detail pages are only opened for new "
+        "listings and for cards that miss a field.",
+    )
+    arg_parser.add_argument(
+        "--store",
+        choices=["sqlite", "journal"],
+        default="sqlite",
+        help=f"Keep the found listings in {STORE_FILE} (default) or, file based, "
+        f"in the append-only {JOURNAL_FILE} journal.",
+    )
+    arg_parser.add_argument(
+        "--compact-store",
+        action="store_true",
+        help="Compact the listing store (rewrite the journal as a snapshot, "
+        "VACUUM the database) and exit without scraping.",
+    )
+    arg_parser.add_argument(
+        "--export-prices",
+        choices=sorted(ALLOWED_REGIONS),
+        metavar="REGION",
+        help=f"Write the price history ({PRICE_HISTORY_FILE}) of every listing in "
+        "REGION (e.g. ljubljana-mesto) to stdout as CSV and exit without scraping.",
+    )
+    arg_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Keep downloaded pages in {CACHE_DIRECTORY}/ and reuse them while they "
+        "are fresh (nastavitev.cache_ttl_listing_minutes / cache_ttl_detail_minutes), "
+        "stale pages are revalidated with ETag/Last-Modified in the http fetch mode.",
+    )
+    arg_parser.add_argument(
+        "--metrics-dir",
+        metavar="DIR",
+        help=f"Write the counters and latency histograms of the run to "
+        f"DIR/{METRICS_TEXTFILE} (for the node-exporter textfile collector) and "
+        f"DIR/{METRICS_JSON_FILE}.",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=f"Profile the run and write DIR/{PROFILE_STATS_FILE} (cProfile, "
+        f"open with pstats or snakeviz) and DIR/{PROFILE_STACKS_FILE} (sampled "
+        "collapsed stacks, for flamegraph.pl or speedscope), plus the Playwright "
+        "traces of the slowest browser pages. Worker processes of --processes "
+        "only contribute traces.",
+    )
+    arg_parser.add_argument(
+        "--profile-traces",
+        type=int,
+        default=DEFAULT_PROFILE_TRACES,
+        metavar="N",
+        help="Number of slowest browser pages whose Playwright trace is kept with "
+        f"--profile (default: {DEFAULT_PROFILE_TRACES}, 0 disables tracing).",
+    )
+    arg_parser.add_argument(
+        "--plan-queries",
+        action="store_true",
+        help="Load the search results of queries that differ only in their ranges "
+        "once, through a broader query covering them exactly, and assign the "
+        "listings back to every query by its ranges.",
+    )
+    arg_parser.add_argument(
+        "--explain-plan",
+        action="store_true",
+        help="Print the plan of --plan-queries for config.yaml and the listing page "
+        "loads it saves, and exit without scraping.",
+    )
+    arg_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Resume an interrupted run from its checkpoint ({CHECKPOINT_FILE}): "
+        "queries it finished are not run again and listings it fetched are not "
+        "fetched again. Without it the checkpoint of an interrupted run is discarded.",
+    )
+    archive_group = arg_parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record every response of the site in DIR, together with a copy of "
+        "config.yaml and query_results.json, so the run can be replayed.",
+    )
+    archive_group.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Replay a run recorded with --record from a local server, without "
+        "network. The store is read from DIR and not updated, and the email is "
+        f"written to DIR/{REPLAY_EMAIL_FILE} instead of being sent.",
+    )
+    args = arg_parser.parse_args(argv)
+    if args.fetch_mode == "http" and args.engine != "sync":
+        arg_parser.error("--fetch-mode http is only supported by the sync engine")
+    if args.resume and args.replay is not None:
+        arg_parser.error("--resume is not supported with --replay")
+    return args
+
+
+def send_results(
+    settings: Dict[str, Any],
+    mail_from_password: Optional[str],
+    email_body: MIMEMultipart,
+) -> None:
+    """
+    Sends the email with the changes found by the run.
+    """
+    logger.info("Sending mail to %s...", settings["mail_to"])
+    with METRICS.timer("send_email"):
+        send_email(
+            mail_from=settings["mail_from"],
+            mail_from_password=mail_from_password or "",
+            mail_to=settings["mail_to"],
+            smtp_server=settings["smtp_server"],
+            smtp_port=settings["smtp_port"],
+            body=email_body,
+        )
+
+
+def write_replay_email(email_body: MIMEMultipart, email_path: str) -> None:
+    """
+    Writes the HTML of the email of a replayed run to `email_path`.
+    """
+    logger.info("Writing the mail of the replayed run to %s...", email_path)
+    with atomic_write(email_path, "wb") as email_file:
+        for part in email_body.walk():
+            payload = part.get_payload(decode=True)
+            if part.get_content_type() == "text/html" and isinstance(payload, bytes):
+                email_file.write(payload)
+
+
+def open_store(data_dir: str, backend: str) -> Store:
+    """
+    Opens the listing store of the `backend` kind in `data_dir`, importing the
+    query_results.json file of older versions on first use.
+    """
+    store: Store = (
+        ListingJournal(os.path.join(data_dir, JOURNAL_FILE))
+        if backend == "journal"
+        else ListingStore(os.path.join(data_dir, STORE_FILE))
+    )
+    store.migrate_from_json(os.path.join(data_dir, LEGACY_STORE_FILE))
+    return store
+
+
+def store_results(
+    store: Store,
+    data_dir: str,
+    collected: Set[ExtractedEntry],
+    kept: Set[ExtractedEntry],
+    stored: Set[ExtractedEntry],
+) -> None:
+    """
+    Makes the `collected` and `kept` entries the content of the `store`,
+    writing the collected ones that are not `stored` yet, and records the
+    prices of the collected ones in the price history in `data_dir`.
+    """
+    with METRICS.timer("results_write"):
+        store.replace(collected | kept, changed=collected - stored)
+        with PriceHistory(os.path.join(data_dir, PRICE_HISTORY_FILE)) as history:
+            history.record(collected)
+
+
+def run_scraper(args: argparse.Namespace) -> None:
+    """
+    Runs the scraper for the parsed command line arguments.
+    """
     # Check if the MAIL_FROM_PASSWORD environment variable is set
     logger.info("Checking if the MAIL_FROM_PASSWORD environment variable is set...")
     mail_from_password = os.getenv("MAIL_FROM_PASSWORD")
-    if not mail_from_password:
+    if not mail_from_password and args.replay is None:
         logger.error("Please set the MAIL_FROM_PASSWORD environment variable.")
         return
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    query_results_path = os.path.join(script_dir, "query_results.json")
-
-    # Read query_results.json if it exists
-    logger.info("Reading existing entries from query_results.json if it exists...")
-    existing_entries: Set[ExtractedEntry] = set()  # Added type annotation
-    if os.path.exists(query_results_path):
-        existing_entries = load_entries_from_file(query_results_path)
+    # A replayed run reads its config and store from the archive directory
+    data_dir = args.replay if args.replay is not None else script_dir
+    with open_store(data_dir, args.store) as store:
+        archive = ResponseArchive(args.record) if args.record is not None else None
+        if archive is not None:
+            store.backup(os.path.join(archive.directory, os.path.basename(store.path)))
+            archive.snapshot(os.path.join(data_dir, "config.yaml"))
+        scrape_and_report(args, data_dir, store, archive, mail_from_password)
+
+
+# pylint: disable=too-many-locals, too-many-statements, too-many-branches
+def scrape_and_report(
+    args: argparse.Namespace,
+    data_dir: str,
+    store: Store,
+    archive: Optional[ResponseArchive],
+    mail_from_password: Optional[str],
+) -> None:
+    """
+    Runs the queries of the config in `data_dir`, compares the collected
+    entries with the `store` and reports the new ones.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(data_dir, "config.yaml")
+    consent_path = os.path.join(data_dir, CONSENT_STATE_FILE)
+    traces = (
+        SlowPageTraces(args.profile, args.profile_traces)
+        if args.profile is not None and args.profile_traces > 0
+        else None
+    )
 
     # Parse the config file
     logger.info("Parsing the config file...")
-    parser = ConfigParser(os.path.join(script_dir, "config.yaml"))
-    parsed_config = parser.parse_config()
+    parser = ConfigParser(config_path)
+    with METRICS.timer("config_parse"):
+        parsed_config = parser.parse_config()
 
     # Run the scraper for each query in the config file
     logger.info("Running the scraper for each query in the config file...")
+    settings = parser.config["nastavitev"]
+    if args.replay is not None:
+        settings = replay_settings(settings)
+    cache = (
+        create_cache(settings, os.path.join(script_dir, CACHE_DIRECTORY))
+        if args.cache
+        else None
+    )
+    known_entries = (
+        index_by_link(store.entries()) if args.incremental or args.cards else None
+    )
+    # A replayed run is not checkpointed, it does not update the store either
+    checkpoint = (
+        RunCheckpoint(os.path.join(data_dir, CHECKPOINT_FILE))
+        if args.replay is None
+        else None
+    )
+    # With --plan-queries the queries covered by a broader one are not loaded
+    plan = plan_queries(parsed_config) if args.plan_queries else None
+    queries = parsed_config if plan is None else plan.fetches
+    if plan is not None:
+        logger.info(plan.summary())
+    resumed = None
+    resumed_results: QueryResults = {}
+    fresh_links: FrozenSet[str] = frozenset()
+    if checkpoint is not None and args.resume:
+        resumed = checkpoint.load()
+        queries, resumed_results = split_finished_queries(resumed, queries)
+        # Entries the interrupted run fetched are served, not revalidated
+        known_entries = {**(known_entries or {}), **resumed.entries}
+        fresh_links = frozenset(resumed.entries)
+    elif checkpoint is not None:
+        checkpoint.clear()
+
+    options = ScrapeOptions(
+        known_entries=known_entries,
+        revalidate_percent=settings.get("revalidate_percent", 0),
+        fresh_links=fresh_links,
+        use_cards=args.cards,
+        consent_path=consent_path,
+        cache=cache,
+        archive=archive,
+        traces=traces,
+        checkpoint=checkpoint,
+    )
+    worker = partial(
+        run_engine,
+        settings=settings,
+        engine=args.engine,
+        fetch_mode=args.fetch_mode,
+        options=options,
+    )
+    query_results = {
+        **resumed_results,
+        **run_queries(queries, worker, args.processes),
+    }
+    if plan is not None:
+        # A merged query whose listing page is full may have missed listings,
+        # its queries are run on their own with the entries it fetched known
+        unmerged = split_full_fetches(plan, query_results, LISTING_PAGE_SIZE)
+        fallback = {
+            name: url
+            for name, url in unmerged.fetches.items()
+            if name not in plan.fetches
+        }
+        if resumed is not None:
+            fallback, finished = split_finished_queries(resumed, fallback)
+            query_results.update(finished)
+        fetched = index_by_link(
+            entry for result in query_results.values() for entry in result.entries
+        )
+        query_results.update(
+            run_queries(
+                fallback,
+                partial(
+                    worker,
+                    options=replace(
+                        options,
+                        known_entries={**(known_entries or {}), **fetched},
+                        fresh_links=fresh_links | frozenset(fetched),
+                    ),
+                ),
+                args.processes,
+            )
+        )
+        METRICS.inc(
+            "page_loads_saved_total",
+            max(len(plan.queries) - len(plan.fetches) - len(fallback), 0),
+        )
+        query_results = assign_results(unmerged, query_results)
+
     collected_entries: Set[ExtractedEntry] = set()  # Added type annotation
+    # Stored entries of what failed, kept so they are not reported as delisted
+    # and then as new again
+    kept_entries: Set[ExtractedEntry] = set()
     for query_name, url in parsed_config.items():
-        logger.info("Running scraper for query [%s] on url [%s]", query_name, url)
-        scraper = Scraper(str(url))
-        entries = scraper.run()
-        logger.info(f"Found {len(entries)} entries: ")
-        for entry in entries:
+        if query_name not in query_results:
+            logger.error(f"Query [{query_name}] failed, keeping its stored entries.")
+            kept_entries.update(store.entries_for_origin(str(url)))
+            continue
+        result = query_results[query_name]
+        logger.info(f"Found {len(result.entries)} entries for query [{query_name}]: ")
+        for entry in result.entries:
             logger.info(entry)
             collected_entries.add(entry)
+        if result.failed_links:
+            logger.error(
+                f"{len(result.failed_links)} detail pages of query [{query_name}] "
+                "failed, keeping their stored entries."
+            )
+            kept_entries.update(
+                entry
+                for entry in store.entries_for_links(result.failed_links)
+                if entry.origin_url == str(url)
+            )
+        if result.links >= LISTING_PAGE_SIZE:
+            # Only the first page is read, listings that moved to the next
+            # one are not delisted
+            logger.warning(
+                f"The listing page of query [{query_name}] is full, keeping its "
+                "stored entries that were not found."
+            )
+            found_links = {entry.link for entry in result.entries}
+            kept_entries.update(
+                entry
+                for entry in store.entries_for_origin(str(url))
+                if entry.link not in found_links
+            )
 
-    # Compare the collected entries with the existing ones
-    new_entries = collected_entries - existing_entries
-    logger.info(f"Found {len(new_entries)} new entries.")
-
-    # Send an email if there are new entries found
-    if new_entries:
-        logger.info("Sending mail to %s...", parser.config["nastavitev"]["mail_to"])
-        email_body = create_email_body(entries=list(new_entries))
-        send_email(
-            mail_from=parser.config["nastavitev"]["mail_from"],
-            mail_from_password=mail_from_password,
-            mail_to=parser.config["nastavitev"]["mail_to"],
-            smtp_server=parser.config["nastavitev"]["smtp_server"],
-            smtp_port=parser.config["nastavitev"]["smtp_port"],
-            body=email_body,
+    # Compare the collected entries with the stored ones of the same listings
+    # and of the same queries, which are delisted if they were not found again
+    origin_urls = [str(url) for url in parsed_config.values()]
+    with METRICS.timer("diff"):
+        stored_entries = store.entries_for_links(
+            entry.link for entry in collected_entries
         )
-
-        # Update the query_results.json file with the new entries
-        with open(query_results_path, "w", encoding="UTF8") as file:
-            json.dump(
-                list(collected_entries),
-                file,
-                cls=ExtractedEntryEncoder,
-                indent=4,
-                ensure_ascii=False,
-            )
+        for origin_url in origin_urls:
+            stored_entries |= store.entries_for_origin(origin_url)
+        diff = diff_entries(
+            stored_entries, collected_entries, origin_urls, kept_entries
+        )
+    METRICS.inc("entries_found_total", len(collected_entries))
+    METRICS.inc("new_entries_total", len(diff.new))
+    METRICS.inc("listing_changes_total", len(diff.price_changed), change="price")
+    METRICS.inc("listing_changes_total", len(diff.field_changed), change="fields")
+    METRICS.inc("listing_changes_total", len(diff.delisted), change="delisted")
+
+    # Send an email if there are changes
+    if diff:
+        with METRICS.timer("email_render"):
+            email_body = create_email_body(diff)
+        if args.replay is not None:
+            write_replay_email(email_body, os.path.join(data_dir, REPLAY_EMAIL_FILE))
+        else:
+            send_results(parser.config["nastavitev"], mail_from_password, email_body)
+
+    # Update the store after the mail, so the changes are reported again if
+    # sending it failed
+    if args.replay is None:
+        store_results(store, data_dir, collected_entries, kept_entries, stored_entries)
+        if checkpoint is not None:
+            checkpoint.clear()
 
     logger.info("My job is finished, exiting now...")
 
 
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Main function executed when the script is run.
+    """
+    args = parse_args(argv)
+    if args.export_prices is not None:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        with PriceHistory(os.path.join(script_dir, PRICE_HISTORY_FILE)) as history:
+            exported = history.export_region(args.export_prices, sys.stdout)
+        logger.info("Exported %d price points of %s.", exported, args.export_prices)
+        return
+    if args.explain_plan:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        parser = ConfigParser(os.path.join(script_dir, "config.yaml"))
+        sys.stdout.write(plan_queries(parser.parse_config()).summary() + "\n")
+        return
+    if args.compact_store:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        with open_store(script_dir, args.store) as store:
+            store.compact()
+        return
+    started = time.perf_counter()
+    failed = True
+    try:
+        with ExitStack() as stack:
+            if args.profile is not None:
+                stack.enter_context(profile_run(args.profile))
+            if args.replay is not None:
+                stack.enter_context(replay_site(ResponseArchive(args.replay)))
+            run_scraper(args)
+        failed = False
+    finally:
+        if args.cache:
+            # Counted in METRICS, so the pages of all worker processes are in it
+            logger.info(CacheStats.from_metrics(METRICS).summary())
+        # Written for a failed run too, so alerts see the failure
+        if args.metrics_dir is not None:
+            METRICS.set("run_failed", 1 if failed else 0)
+            METRICS.set("run_duration_seconds", time.perf_counter() - started)
+            METRICS.set("last_run_timestamp_seconds", time.time())
+            os.makedirs(args.metrics_dir, exist_ok=True)
+            METRICS.write(
+                os.path.join(args.metrics_dir, METRICS_TEXTFILE),
+                os.path.join(args.metrics_dir, METRICS_JSON_FILE),
+            )
+            logger.info("Wrote the run metrics to %s.", args.metrics_dir)
+
+
 if __name__ == "__main__":
     main()
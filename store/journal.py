@@ -0,0 +1,239 @@
+"""
+Module for the file based listing store: an append-only JSON lines journal.
+"""
+
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from constants.constants import JOURNAL_COMPACT_MIN_LINES, JOURNAL_COMPACT_RATIO
+from constants.objects import ExtractedEntry
+from file_utils.atomic import atomic_write
+from logger.logger import setup_logger
+from store.listing_store import load_entries_from_file
+
+logger = setup_logger("journal")
+
+EntryKey = Tuple[str, str]
+
+
+def _key(entry: ExtractedEntry) -> EntryKey:
+    return entry.link, entry.origin_url
+
+
+def _put_line(entry: ExtractedEntry) -> str:
+    return json.dumps({"put": entry.to_dict()}, ensure_ascii=False) + "\n"
+
+
+def _delete_line(key: EntryKey) -> str:
+    return json.dumps({"delete": list(key)}, ensure_ascii=False) + "\n"
+
+
+def read_journal(path: str) -> Iterator[Tuple[EntryKey, Optional[ExtractedEntry]]]:
+    """
+    Streams the records of the journal at `path` line by line, as the key of
+    the listing and query with the stored entry, or None if it was deleted.
+    A line cut short by a crash while appending is skipped.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="UTF8") as file:
+        for number, line in enumerate(file, start=1):
+            try:
+                record = json.loads(line)
+                if "put" in record:
+                    entry = ExtractedEntry.from_dict(record["put"])
+                    yield _key(entry), entry
+                else:
+                    link, origin_url = record["delete"]
+                    yield (link, origin_url), None
+            except (ValueError, TypeError, KeyError):
+                logger.warning("Skipping the unreadable line %d of %s.", number, path)
+
+
+def _pop(index: Dict[str, Dict[str, ExtractedEntry]], outer: str, inner: str) -> None:
+    entries = index.get(outer)
+    if entries is not None:
+        entries.pop(inner, None)
+        if not entries:
+            del index[outer]
+
+
+class ListingJournal:
+    """
+    File based counterpart of the ListingStore: every new, changed or removed
+    entry is appended to the JSON lines journal at `path` as one record, so a
+    run writes only its changes. The journal is folded into an in-memory index
+    of the current entries by link and by query on the first read, appends
+    update it, so it is read once per open. It is not written by another
+    process while open. `compact` rewrites the journal as a snapshot of the
+    current entries, it runs on its own once the journal holds more than
+    JOURNAL_COMPACT_RATIO records per current entry.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._loaded = False
+        self._by_link: Dict[str, Dict[str, ExtractedEntry]] = {}
+        self._by_origin: Dict[str, Dict[str, ExtractedEntry]] = {}
+        self._records = 0
+
+    def close(self) -> None:
+        """
+        Drops the in-memory index, the journal is opened for every write.
+        """
+        self._loaded = False
+        self._by_link = {}
+        self._by_origin = {}
+
+    def __enter__(self) -> "ListingJournal":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _index(self) -> Dict[str, Dict[str, ExtractedEntry]]:
+        # Replays the journal into the link -> query -> entry index once
+        if not self._loaded:
+            self.close()
+            self._records = 0
+            for key, entry in read_journal(self.path):
+                self._records += 1
+                self._apply(key, entry)
+            self._loaded = True
+        return self._by_link
+
+    def _apply(self, key: EntryKey, entry: Optional[ExtractedEntry]) -> None:
+        link, origin_url = key
+        if entry is None:
+            _pop(self._by_link, link, origin_url)
+            _pop(self._by_origin, origin_url, link)
+        else:
+            self._by_link.setdefault(link, {})[origin_url] = entry
+            self._by_origin.setdefault(origin_url, {})[link] = entry
+
+    def count(self) -> int:
+        """
+        Returns the number of stored entries.
+        """
+        return sum(len(by_origin) for by_origin in self._index().values())
+
+    def _write(self, lines: Iterable[str]) -> None:
+        with open(self.path, "a+b") as file:
+            # Ends a line cut short by a crash, so only that record is lost
+            if file.tell():
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+            file.writelines(line.encode("UTF8") for line in lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Writes the entries of the query_results.json file at `json_path` as
+        the first snapshot of a new journal and renames the file to
+        `<json_path>.migrated`. Returns the number of imported entries, 0 if
+        there was nothing to migrate.
+        """
+        if not os.path.exists(json_path) or os.path.exists(self.path):
+            return 0
+        entries = load_entries_from_file(json_path)
+        self._write(_put_line(entry) for entry in entries)
+        self.close()
+        os.replace(json_path, f"{json_path}.migrated")
+        logger.info(
+            "Migrated %d entries from %s to %s.", len(entries), json_path, self.path
+        )
+        return len(entries)
+
+    def entries(self) -> Set[ExtractedEntry]:
+        """
+        Returns all stored entries.
+        """
+        return {
+            entry
+            for by_origin in self._index().values()
+            for entry in by_origin.values()
+        }
+
+    def entries_for_links(self, links: Iterable[str]) -> Set[ExtractedEntry]:
+        """
+        Returns the stored entries of `links`, for every query that found them.
+        """
+        index = self._index()
+        return {entry for link in set(links) for entry in index.get(link, {}).values()}
+
+    def entries_for_origin(self, origin_url: str) -> Set[ExtractedEntry]:
+        """
+        Returns the stored entries of the query at `origin_url`.
+        """
+        self._index()
+        return set(self._by_origin.get(origin_url, {}).values())
+
+    def replace(
+        self,
+        entries: Iterable[ExtractedEntry],
+        changed: Optional[Iterable[ExtractedEntry]] = None,
+    ) -> None:
+        """
+        Makes `entries` the content of the store by appending the `changed`
+        entries (all of `entries` if not given) and a delete record for every
+        stored listing and query not in `entries`.
+        """
+        entries = list(entries)
+        kept = {_key(entry) for entry in entries}
+        removed = [
+            (link, origin_url)
+            for link, by_origin in self._index().items()
+            for origin_url in by_origin
+            if (link, origin_url) not in kept
+        ]
+        written = entries if changed is None else list(changed)
+        self._write(
+            [_put_line(entry) for entry in written]
+            + [_delete_line(key) for key in removed]
+        )
+        for entry in written:
+            self._apply(_key(entry), entry)
+        for key in removed:
+            self._apply(key, None)
+        logger.info(
+            "Appended %d entries to the journal, removed %d old ones.",
+            len(written),
+            len(removed),
+        )
+        self._records += len(written) + len(removed)
+        if self._records >= JOURNAL_COMPACT_MIN_LINES and (
+            self._records > JOURNAL_COMPACT_RATIO * (len(kept) or 1)
+        ):
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rewrites the journal as a snapshot with one record per stored entry.
+        The snapshot replaces the journal at once, so a crash leaves either.
+        """
+        current = [
+            entry
+            for by_origin in self._index().values()
+            for entry in by_origin.values()
+        ]
+        records = self._records
+        with atomic_write(self.path, fsync=True) as file:
+            file.writelines(_put_line(entry) for entry in current)
+        self._records = len(current)
+        logger.info(
+            "Compacted the journal %s from %d to %d records.",
+            self.path,
+            records,
+            len(current),
+        )
+
+    def backup(self, path: str) -> None:
+        """
+        Copies the journal to `path`.
+        """
+        if os.path.exists(self.path):
+            shutil.copyfile(self.path, path)
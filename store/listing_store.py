@@ -0,0 +1,215 @@
+"""
+Module for the SQLite store of the listings collected by previous runs.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Iterable, Iterator, List, Optional, Set, Tuple
+
+from constants.constants import STORE_LOOKUP_CHUNK
+from constants.objects import ENTRY_FIELDS, ExtractedEntry
+from extractor.parsing import listing_id
+from logger.logger import setup_logger
+
+logger = setup_logger("store")
+
+# In the order of the ExtractedEntry arguments, so rows are passed as they are
+COLUMNS = ENTRY_FIELDS
+KEY_COLUMNS = ("link", "origin_url")
+UPDATED_COLUMNS = [column for column in COLUMNS if column not in KEY_COLUMNS]
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    link TEXT NOT NULL,
+    origin_url TEXT NOT NULL,
+    listing_id INTEGER,
+    location TEXT NOT NULL,
+    square_footage REAL NOT NULL,
+    price REAL NOT NULL,
+    built_year INTEGER,
+    price_per_m2 INTEGER NOT NULL,
+    author TEXT,
+    PRIMARY KEY (link, origin_url)
+);
+CREATE INDEX IF NOT EXISTS entries_listing_id ON entries (listing_id);
+CREATE INDEX IF NOT EXISTS entries_origin_url ON entries (origin_url);
+"""
+SELECT_ENTRIES = f"SELECT {', '.join(COLUMNS)} FROM entries"
+UPSERT_ENTRY = f"""
+INSERT INTO entries (listing_id, {', '.join(COLUMNS)})
+VALUES (?, {', '.join('?' for _ in COLUMNS)})
+ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET
+{', '.join(f'{column} = excluded.{column}' for column in UPDATED_COLUMNS)}
+"""
+
+
+def load_entries_from_file(file_path: str) -> Set[ExtractedEntry]:
+    """
+    Helper function to load entries from a JSON file.
+    """
+    with open(file_path, "r", encoding="UTF8") as file:
+        entries_data = json.load(file)
+        return {ExtractedEntry.from_dict(entry) for entry in entries_data}
+
+
+def _row(entry: ExtractedEntry) -> Tuple[Any, ...]:
+    return (listing_id(entry.link),) + tuple(getattr(entry, name) for name in COLUMNS)
+
+
+def _entry(row: Tuple[Any, ...]) -> ExtractedEntry:
+    return ExtractedEntry(*row)
+
+
+def _chunks(values: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(values), STORE_LOOKUP_CHUNK):
+        yield values[start : start + STORE_LOOKUP_CHUNK]
+
+
+class ListingStore:
+    """
+    Listings collected by previous runs, one row per listing and query, in a
+    SQLite database at `path`. Lookups go through the indexes on the link,
+    listing id and query URL, and a run only writes the rows that changed.
+    The database runs in WAL mode, so it can be read while a run writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode a commit survives a crash of the process with NORMAL too
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def __enter__(self) -> "ListingStore":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def count(self) -> int:
+        """
+        Returns the number of stored rows.
+        """
+        return int(
+            self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        )
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Imports the entries of the query_results.json file at `json_path` into
+        an empty store and renames the file to `<json_path>.migrated`. Returns
+        the number of imported entries, 0 if there was nothing to migrate.
+        """
+        if not os.path.exists(json_path) or self.count():
+            return 0
+        entries = load_entries_from_file(json_path)
+        self.upsert(entries)
+        os.replace(json_path, f"{json_path}.migrated")
+        logger.info(
+            "Migrated %d entries from %s to %s.", len(entries), json_path, self.path
+        )
+        return len(entries)
+
+    def entries(self) -> Set[ExtractedEntry]:
+        """
+        Returns all stored entries.
+        """
+        return {_entry(row) for row in self.connection.execute(SELECT_ENTRIES)}
+
+    def entries_for_links(self, links: Iterable[str]) -> Set[ExtractedEntry]:
+        """
+        Returns the stored entries of `links`, for every query that found them.
+        """
+        found: Set[ExtractedEntry] = set()
+        for chunk in _chunks(sorted(set(links))):
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                f"{SELECT_ENTRIES} WHERE link IN ({placeholders})", chunk
+            )
+            found.update(_entry(row) for row in rows)
+        return found
+
+    def entries_for_listing(self, listing: int) -> Set[ExtractedEntry]:
+        """
+        Returns the stored entries of the listing with the id `listing`.
+        """
+        rows = self.connection.execute(
+            f"{SELECT_ENTRIES} WHERE listing_id = ?", (listing,)
+        )
+        return {_entry(row) for row in rows}
+
+    def entries_for_origin(self, origin_url: str) -> Set[ExtractedEntry]:
+        """
+        Returns the stored entries of the query at `origin_url`.
+        """
+        rows = self.connection.execute(
+            f"{SELECT_ENTRIES} WHERE origin_url = ?", (origin_url,)
+        )
+        return {_entry(row) for row in rows}
+
+    def upsert(self, entries: Iterable[ExtractedEntry]) -> None:
+        """
+        Inserts `entries`, replacing the stored row of the same listing and
+        query, in a single transaction.
+        """
+        with self.connection:
+            self.connection.executemany(
+                UPSERT_ENTRY, (_row(entry) for entry in entries)
+            )
+
+    def replace(
+        self,
+        entries: Iterable[ExtractedEntry],
+        changed: Optional[Iterable[ExtractedEntry]] = None,
+    ) -> None:
+        """
+        Makes `entries` the content of the store in a single transaction. Only
+        the `changed` entries are written (all of `entries` if not given), the
+        rows of listings and queries not in `entries` are deleted.
+        """
+        entries = list(entries)
+        with self.connection:
+            self.connection.executemany(
+                UPSERT_ENTRY,
+                (_row(entry) for entry in (entries if changed is None else changed)),
+            )
+            self.connection.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS kept "
+                "(link TEXT, origin_url TEXT, PRIMARY KEY (link, origin_url))"
+            )
+            self.connection.execute("DELETE FROM kept")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO kept VALUES (?, ?)",
+                ((entry.link, entry.origin_url) for entry in entries),
+            )
+            deleted = self.connection.execute(
+                "DELETE FROM entries WHERE NOT EXISTS (SELECT 1 FROM kept "
+                "WHERE kept.link = entries.link "
+                "AND kept.origin_url = entries.origin_url)"
+            ).rowcount
+        logger.info("Stored the entries of the run, removed %d old ones.", deleted)
+
+    def compact(self) -> None:
+        """
+        Rebuilds the database without the space of deleted rows and folds the
+        WAL back into it.
+        """
+        self.connection.execute("VACUUM")
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info("Compacted the listing store %s.", self.path)
+
+    def backup(self, path: str) -> None:
+        """
+        Writes a consistent copy of the store to `path`, also while it is
+        being written.
+        """
+        with sqlite3.connect(path) as target:
+            self.connection.backup(target)
+        target.close()
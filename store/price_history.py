@@ -0,0 +1,184 @@
+"""
+Module for the price history of every listing, kept in SQLite.
+"""
+
+import csv
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+
+from constants.constants import STORE_LOOKUP_CHUNK
+from constants.objects import ExtractedEntry
+from extractor.parsing import listing_id
+from logger.logger import setup_logger
+from url.url import region_from_url
+
+logger = setup_logger("price_history")
+
+# Points are clustered by listing and time (WITHOUT ROWID), so the history of
+# a listing is a single range scan. `listings` keeps the last point of every
+# listing, so a run compares its prices without scanning the history.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    listing_id INTEGER NOT NULL,
+    recorded_at INTEGER NOT NULL,
+    price REAL NOT NULL,
+    price_per_m2 INTEGER NOT NULL,
+    PRIMARY KEY (listing_id, recorded_at)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS listings (
+    listing_id INTEGER PRIMARY KEY,
+    region TEXT,
+    price REAL NOT NULL,
+    price_per_m2 INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS listings_region ON listings (region);
+"""
+EXPORT_COLUMNS = ["listing_id", "recorded_at", "price", "price_per_m2"]
+
+
+class PricePoint(NamedTuple):
+    """
+    Price of a listing from `recorded_at` (unix time) on.
+    """
+
+    listing_id: int
+    recorded_at: int
+    price: float
+    price_per_m2: int
+
+
+class PriceHistory:
+    """
+    Price history of every listing in a SQLite database at `path`. A point is
+    recorded only when the price or the price per m2 of a listing changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+    def __enter__(self) -> "PriceHistory":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def _last_points(self, listing_ids: List[int]) -> Dict[int, Any]:
+        last: Dict[int, Any] = {}
+        for start in range(0, len(listing_ids), STORE_LOOKUP_CHUNK):
+            chunk = listing_ids[start : start + STORE_LOOKUP_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.connection.execute(
+                "SELECT listing_id, price, price_per_m2 FROM listings "
+                f"WHERE listing_id IN ({placeholders})",
+                chunk,
+            )
+            last.update((row[0], row[1:]) for row in rows)
+        return last
+
+    def record(
+        self, entries: Iterable[ExtractedEntry], recorded_at: Optional[int] = None
+    ) -> int:
+        """
+        Records the prices of `entries` seen at `recorded_at` (now if not
+        given) for the listings whose price changed since their last point,
+        and returns the number of recorded points. Entries whose price or size
+        the extraction did not find (-1.0) are skipped.
+        """
+        recorded_at = int(time.time()) if recorded_at is None else recorded_at
+        by_listing: Dict[int, ExtractedEntry] = {}
+        for entry in entries:
+            if entry.price < 0 or entry.square_footage < 0:
+                continue
+            key = listing_id(entry.link)
+            if key is not None:
+                by_listing[key] = entry
+        last = self._last_points(sorted(by_listing))
+        changed = [
+            (key, entry)
+            for key, entry in by_listing.items()
+            if last.get(key) != (entry.price, entry.price_per_m2)
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?)",
+                (
+                    (key, recorded_at, entry.price, entry.price_per_m2)
+                    for key, entry in changed
+                ),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        key,
+                        region_from_url(entry.origin_url),
+                        entry.price,
+                        entry.price_per_m2,
+                    )
+                    for key, entry in changed
+                ),
+            )
+        logger.info(
+            "Recorded %d price changes of %d listings.", len(changed), len(by_listing)
+        )
+        return len(changed)
+
+    def history(
+        self, listing: int, start: Optional[int] = None, end: Optional[int] = None
+    ) -> List[PricePoint]:
+        """
+        Returns the price points of the listing with the id `listing` recorded
+        from `start` to `end` (unix time, both included), oldest first.
+        """
+        conditions = ["listing_id = ?"]
+        parameters = [listing]
+        if start is not None:
+            conditions.append("recorded_at >= ?")
+            parameters.append(start)
+        if end is not None:
+            conditions.append("recorded_at <= ?")
+            parameters.append(end)
+        rows = self.connection.execute(
+            "SELECT listing_id, recorded_at, price, price_per_m2 FROM prices "
+            f"WHERE {' AND '.join(conditions)} ORDER BY recorded_at",
+            parameters,
+        )
+        return [PricePoint(*row) for row in rows]
+
+    def region_history(self, region: str) -> Iterator[PricePoint]:
+        """
+        Streams the price points of every listing in `region` (as in the query
+        URL, e.g. "ljubljana-mesto"), by listing and time.
+        """
+        rows = self.connection.execute(
+            "SELECT prices.listing_id, recorded_at, prices.price, prices.price_per_m2 "
+            "FROM listings JOIN prices USING (listing_id) "
+            "WHERE listings.region = ? ORDER BY prices.listing_id, recorded_at",
+            (region,),
+        )
+        for row in rows:
+            yield PricePoint(*row)
+
+    def export_region(self, region: str, file: TextIO) -> int:
+        """
+        Writes the price points of every listing in `region` to `file` as CSV
+        and returns the number of written points.
+        """
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_COLUMNS)
+        count = 0
+        for point in self.region_history(region):
+            writer.writerow(point)
+            count += 1
+        return count
@@ -0,0 +1,125 @@
+"""
+This module contains tests for the JSON lines listing journal.
+"""
+
+import json
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+from constants.objects import ExtractedEntryEncoder
+from constants.testing import make_entry
+from .journal import ListingJournal, read_journal
+from .test_listing_store import QUERY_A, QUERY_B
+
+
+class TestListingJournal(unittest.TestCase):
+    """
+    Test class for the JSON lines listing journal.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.directory.name, "query_results.jsonl")
+        self.journal = ListingJournal(self.path)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _lines(self) -> int:
+        with open(self.path, "r", encoding="UTF8") as file:
+            return sum(1 for _ in file)
+
+    def test_replace_appends_only_changes(self) -> None:
+        """
+        Test if a run appends its changed and removed entries only.
+        """
+        self.journal.replace([make_entry(1), make_entry(2), make_entry(3, QUERY_B)])
+        self.assertEqual(self._lines(), 3)
+        changed = make_entry(2, price=180000.0)
+        self.journal.replace([make_entry(1), changed], changed=[changed])
+        self.assertEqual(self._lines(), 5)
+        self.assertEqual(self.journal.entries(), {make_entry(1), changed})
+        self.assertEqual(
+            self.journal.entries_for_links([make_entry(2).link, make_entry(3).link]),
+            {changed},
+        )
+        self.assertEqual(self.journal.entries_for_origin(QUERY_B), set())
+        self.assertEqual(
+            self.journal.entries_for_origin(QUERY_A), {make_entry(1), changed}
+        )
+
+    def test_streaming_load_and_truncated_line(self) -> None:
+        """
+        Test if the journal is read lazily and a line cut short is skipped.
+        """
+        self.journal.replace([make_entry(1), make_entry(2)])
+        self.assertIsInstance(read_journal(self.path), types.GeneratorType)
+        with open(self.path, "a", encoding="UTF8") as file:
+            file.write('{"put": {"location": "LJ. CEN')
+        self.assertEqual(self.journal.entries(), {make_entry(1), make_entry(2)})
+        self.journal.replace(
+            [make_entry(1), make_entry(2), make_entry(3)], changed=[make_entry(3)]
+        )
+        self.assertEqual(
+            self.journal.entries(), {make_entry(1), make_entry(2), make_entry(3)}
+        )
+
+    def test_journal_is_read_once(self) -> None:
+        """
+        Test if reads and appends are served by the index folded on the first
+        read, and a new journal object sees the same entries.
+        """
+        self.journal.replace([make_entry(1), make_entry(2, QUERY_B)])
+        changed = make_entry(1, price=150000.0)
+        with mock.patch("store.journal.read_journal", wraps=read_journal) as reads:
+            self.assertEqual(self.journal.count(), 2)
+            self.journal.replace(
+                [changed, make_entry(3)], changed=[changed, make_entry(3)]
+            )
+            self.assertEqual(self.journal.entries_for_links([changed.link]), {changed})
+            self.assertEqual(self.journal.entries_for_origin(QUERY_B), set())
+            self.assertEqual(self.journal.count(), 2)
+        self.assertEqual(reads.call_count, 0)
+        self.assertEqual(ListingJournal(self.path).entries(), {changed, make_entry(3)})
+
+    def test_compact(self) -> None:
+        """
+        Test if compaction leaves one record per stored entry.
+        """
+        self.journal.replace([make_entry(1), make_entry(2)])
+        for price in range(5):
+            changed = make_entry(1, price=100000.0 + price)
+            self.journal.replace([changed, make_entry(2)], changed=[changed])
+        self.journal.compact()
+        self.assertEqual(self._lines(), 2)
+        self.assertEqual(self.journal.entries(), {changed, make_entry(2)})
+        self.assertEqual(os.listdir(self.directory.name), ["query_results.jsonl"])
+
+    def test_automatic_compaction(self) -> None:
+        """
+        Test if the journal is compacted once it holds too many records.
+        """
+        with mock.patch("store.journal.JOURNAL_COMPACT_MIN_LINES", 4):
+            for price in range(4):
+                self.journal.replace([make_entry(1, price=price)])
+            self.assertEqual(self._lines(), 4)
+            self.journal.replace([make_entry(1, price=4.0)])
+        self.assertEqual(self._lines(), 1)
+        self.assertEqual(self.journal.entries(), {make_entry(1, price=4.0)})
+
+    def test_migrate_from_json(self) -> None:
+        """
+        Test if query_results.json becomes the first snapshot of the journal.
+        """
+        json_path = os.path.join(self.directory.name, "query_results.json")
+        with open(json_path, "w", encoding="UTF8") as file:
+            json.dump([make_entry(1), make_entry(2)], file, cls=ExtractedEntryEncoder)
+        self.assertEqual(self.journal.migrate_from_json(json_path), 2)
+        self.assertTrue(os.path.exists(f"{json_path}.migrated"))
+        self.assertEqual(self.journal.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+This module contains tests for the SQLite listing store.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from constants.objects import ExtractedEntryEncoder
+from constants.testing import make_entry
+from .listing_store import ListingStore
+
+QUERY_A = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-mesto/stanovanje/"
+QUERY_B = "https://www.nepremicnine.net/oglasi-prodaja/ljubljana-okolica/stanovanje/"
+
+
+class TestListingStore(unittest.TestCase):
+    """
+    Test class for the SQLite listing store.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.directory.name, "query_results.sqlite3")
+        self.store = ListingStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_migrate_from_json(self) -> None:
+        """
+        Test if query_results.json is imported once and renamed.
+        """
+        json_path = os.path.join(self.directory.name, "query_results.json")
+        entries = {
+            make_entry(1, author="ABC Nepremičnine d.o.o."),
+            make_entry(2, built_year=None),
+            make_entry(2, QUERY_B),
+        }
+        with open(json_path, "w", encoding="UTF8") as file:
+            json.dump(list(entries), file, cls=ExtractedEntryEncoder, indent=4)
+        self.assertEqual(self.store.migrate_from_json(json_path), 3)
+        self.assertFalse(os.path.exists(json_path))
+        self.assertTrue(os.path.exists(f"{json_path}.migrated"))
+        self.assertEqual(self.store.entries(), entries)
+        self.assertEqual(self.store.migrate_from_json(json_path), 0)
+
+    def test_lookups(self) -> None:
+        """
+        Test if entries are found by link, listing id and query.
+        """
+        self.store.upsert(
+            [make_entry(1), make_entry(2), make_entry(2, QUERY_B), make_entry(3)]
+        )
+        self.assertEqual(
+            self.store.entries_for_links([make_entry(2).link, make_entry(9).link]),
+            {make_entry(2), make_entry(2, QUERY_B)},
+        )
+        self.assertEqual(self.store.entries_for_listing(3), {make_entry(3)})
+        self.assertEqual(
+            self.store.entries_for_origin(QUERY_B), {make_entry(2, QUERY_B)}
+        )
+        many_links = [make_entry(number).link for number in range(1200)]
+        self.assertEqual(len(self.store.entries_for_links(many_links)), 4)
+
+    def test_replace_writes_changes_and_removes_old_entries(self) -> None:
+        """
+        Test if replace updates changed entries and deletes the missing ones.
+        """
+        self.store.upsert([make_entry(1), make_entry(2), make_entry(3, QUERY_B)])
+        changed = make_entry(2, price=180000.0)
+        self.store.replace(
+            [make_entry(1), changed, make_entry(4)], [changed, make_entry(4)]
+        )
+        self.assertEqual(self.store.entries(), {make_entry(1), changed, make_entry(4)})
+        self.assertEqual(self.store.count(), 3)
+
+    def test_wal_mode_and_backup(self) -> None:
+        """
+        Test if the database runs in WAL mode and a backup can be opened.
+        """
+        self.store.upsert([make_entry(1)])
+        mode = self.store.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        backup_path = os.path.join(self.directory.name, "backup.sqlite3")
+        self.store.backup(backup_path)
+        with ListingStore(backup_path) as backup:
+            self.assertEqual(backup.entries(), {make_entry(1)})
+        reader = sqlite3.connect(self.path)
+        self.assertEqual(
+            reader.execute("SELECT COUNT(*) FROM entries").fetchone(), (1,)
+        )
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
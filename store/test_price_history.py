@@ -0,0 +1,85 @@
+"""
+This module contains tests for the price history of the listings.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from constants.objects import ExtractedEntry
+from constants.testing import make_entry
+from .price_history import PriceHistory, PricePoint
+from .test_listing_store import QUERY_B
+
+
+class TestPriceHistory(unittest.TestCase):
+    """
+    Test class for the price history of the listings.
+    """
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.history = PriceHistory(
+            os.path.join(self.directory.name, "price_history.sqlite3")
+        )
+
+    def tearDown(self) -> None:
+        self.history.close()
+        self.directory.cleanup()
+
+    def test_records_only_changes(self) -> None:
+        """
+        Test if a point is recorded only when the price of a listing changes.
+        """
+        self.assertEqual(self.history.record([make_entry(1), make_entry(2)], 1000), 2)
+        # The same listing found by a second query is recorded once
+        self.assertEqual(
+            self.history.record([make_entry(1), make_entry(1, QUERY_B)], 2000), 0
+        )
+        self.assertEqual(self.history.record([make_entry(1, price=190000.0)], 3000), 1)
+        self.assertEqual(self.history.record([make_entry(1, price=190000.0)], 4000), 0)
+        self.assertEqual(self.history.record([make_entry(1, price=185000.0)], 5000), 1)
+        self.assertEqual(
+            [point.price for point in self.history.history(1)],
+            [200000.0, 190000.0, 185000.0],
+        )
+        self.assertEqual(
+            self.history.history(1, start=2000, end=4000),
+            [PricePoint(1, 3000, 190000.0, make_entry(1, price=190000.0).price_per_m2)],
+        )
+        self.assertEqual(len(self.history.history(2)), 1)
+
+    def test_missing_price_or_size_is_skipped(self) -> None:
+        """
+        Test if entries without a price or size (-1.0) are not recorded.
+        """
+        self.history.record([make_entry(1)], 1000)
+        no_size = ExtractedEntry.from_dict(
+            {**make_entry(2).to_dict(), "square_footage": -1.0}
+        )
+        missing = [make_entry(1, price=-1.0), no_size]
+        self.assertEqual(self.history.record(missing, 2000), 0)
+        self.assertEqual(self.history.record([make_entry(1)], 3000), 0)
+        self.assertEqual(self.history.history(2), [])
+
+    def test_export_region(self) -> None:
+        """
+        Test if the points of a region are exported as CSV.
+        """
+        other_region = QUERY_B.replace("ljubljana-okolica", "gorenjska")
+        self.history.record([make_entry(1), make_entry(2, other_region)], 1000)
+        self.history.record([make_entry(1, price=150000.0)], 2000)
+        output = io.StringIO()
+        self.assertEqual(self.history.export_region("ljubljana-mesto", output), 2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "listing_id,recorded_at,price,price_per_m2")
+        self.assertTrue(lines[1].startswith("1,1000,200000.0,"))
+        self.assertTrue(lines[2].startswith("1,2000,150000.0,"))
+        self.assertEqual(
+            [point.listing_id for point in self.history.region_history("gorenjska")],
+            [2],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
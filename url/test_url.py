@@ -3,7 +3,7 @@ This module contains tests for the URL class.
 """
 
 import unittest
-from .url import URL
+from .url import URL, region_from_url
 
 
 class TestURL(unittest.TestCase):
@@ -297,6 +297,26 @@ class TestURL(unittest.TestCase):
         )
         self.assertEqual(str(url), expected_url)
 
+    def test_region_from_url(self) -> None:
+        """
+        Test if the region is read back from a search URL.
+        """
+        url = URL(
+            type_of_offer="prodaja",
+            region="gorenjska",
+            type_of_property="hisa",
+            size_from=80,
+        )
+        self.assertEqual(region_from_url(str(url)), "gorenjska")
+        self.assertIsNone(
+            region_from_url("https://www.nepremicnine.net/oglasi-prodaja/")
+        )
+        self.assertIsNone(
+            region_from_url(
+                "https://www.nepremicnine.net/oglasi-prodaja/lj-stanovanje_6812345/"
+            )
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
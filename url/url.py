@@ -4,15 +4,42 @@ Module for building the URL for the scraper
 
 # mypy: ignore-errors
 
+import os
 from typing import List, Tuple
+from urllib.parse import urlsplit
 from constants.constants import (
     ALLOWED_BROKERAGE,
     ALLOWED_REGIONS,
     ALLOWED_PROPERTY_TYPES,
     ALLOWED_SUBREGIONS,
+    SITE_URL,
+    SITE_URL_ENV,
 )
 
 
+def request_url(url: str) -> str:
+    """
+    Returns the address `url` is requested from. Site URLs are pointed at the
+    origin in the SITE_URL_ENV environment variable, if it is set.
+    """
+    origin = os.getenv(SITE_URL_ENV)
+    if origin and url.startswith(SITE_URL):
+        return origin.rstrip("/") + url[len(SITE_URL) :]
+    return url
+
+
+def region_from_url(url: str) -> str | None:
+    """
+    Returns the region of the search results page at `url` (e.g.
+    "ljubljana-mesto"), or None if it is not a search URL of a region.
+    """
+    segments = urlsplit(url).path.strip("/").split("/")
+    if len(segments) > 1 and segments[0].startswith("oglasi-"):
+        if segments[1] in ALLOWED_REGIONS:
+            return segments[1]
+    return None
+
+
 # pylint: disable=too-many-instance-attributes, too-many-arguments, too-few-public-methods
 class URL:
     """
@@ -93,12 +120,12 @@ class URL:
         if self.sub_regions is not None:
             sub_regions_str = ",".join(self.sub_regions)
             return (
-                f"https://www.nepremicnine.net/oglasi-{self.type_of_offer}/{self.region}/"
+                f"{SITE_URL}/oglasi-{self.type_of_offer}/{self.region}/"
                 f"{sub_regions_str}/{self.type_of_property}"
             )
 
         return (
-            f"https://www.nepremicnine.net/oglasi-{self.type_of_offer}"
+            f"{SITE_URL}/oglasi-{self.type_of_offer}"
             f"/{self.region}/{self.type_of_property}"
         )
 